@@ -0,0 +1,99 @@
+"""Synthetic EnrichedPaper corpora for benchmarking the API's PaperStore."""
+import json
+import os
+from datetime import date, timedelta
+
+import numpy as np
+
+from data_contracts.paper import EnrichedPaper, PaperSummary
+from shared.embedding_store import EmbeddingStore
+
+DIM = 384
+TOPICS = [f"topic-{i}" for i in range(200)]
+CATEGORIES = ["cs.AI", "cs.CL", "cs.CV", "cs.LG", "cs.IR", "cs.NE", "stat.ML", "math.OC"]
+# Embeddings are drawn around this many centers, so IVF lists are not all alike.
+_CLUSTERS = 256
+_BLOCK = 10_000
+
+
+def vocabulary(size: int = 5000, seed: int = 0) -> list[str]:
+    """Pronounceable pseudo-words; a Zipf draw over them gives text BM25 can rank."""
+    rng = np.random.default_rng(seed)
+    consonants, vowels = list("bcdfghklmnprstvz"), list("aeiou")
+    words = set()
+    while len(words) < size:
+        n = int(rng.integers(2, 5))
+        words.add("".join(rng.choice(consonants) + rng.choice(vowels) for _ in range(n)))
+    return sorted(words)
+
+
+def _sentence(rng: np.random.Generator, words: list[str], n: int) -> str:
+    ranks = np.minimum(rng.zipf(1.3, n), len(words)) - 1
+    return " ".join(words[r] for r in ranks)
+
+
+def synthetic_paper(i: int, rng: np.random.Generator, words: list[str]) -> EnrichedPaper:
+    return EnrichedPaper(
+        paper_id=f"synth.{i:07d}",
+        title=_sentence(rng, words, 8).capitalize(),
+        authors=[f"Author {int(a)}" for a in rng.integers(0, 50_000, int(rng.integers(1, 6)))],
+        abstract=_sentence(rng, words, 150),
+        categories=list(rng.choice(CATEGORIES, int(rng.integers(1, 3)), replace=False)),
+        published=(date(2015, 1, 1) + timedelta(days=int(rng.integers(0, 3650)))).isoformat(),
+        clean_text=_sentence(rng, words, 600),
+        summary=PaperSummary(
+            research_question=_sentence(rng, words, 15),
+            methodology=_sentence(rng, words, 25),
+            key_findings=[_sentence(rng, words, 12) for _ in range(3)],
+            contributions=_sentence(rng, words, 20),
+            limitations=_sentence(rng, words, 12),
+        ),
+        topics=list(rng.choice(TOPICS, int(rng.integers(1, 5)), replace=False)),
+    )
+
+
+def synthetic_embeddings(n: int, rng: np.random.Generator, centers: np.ndarray) -> np.ndarray:
+    assign = rng.integers(0, len(centers), n)
+    vectors = centers[assign] + 0.5 / np.sqrt(centers.shape[1]) * rng.standard_normal((n, centers.shape[1]))
+    return vectors.astype(np.float32)
+
+
+def generate_corpus(data_dir: str, n: int, dim: int = DIM, seed: int = 0,
+                    json_embeddings: bool = True) -> None:
+    """Write ``n`` enriched papers and their embeddings the way the enricher does.
+
+    Papers land in ``data_dir/enriched_papers`` and vectors in the embedding store
+    at ``data_dir/embeddings``. With ``json_embeddings`` each JSON also carries its
+    vector, as enricher output does, so load times include parsing it.
+    """
+    enriched_dir = os.path.join(data_dir, "enriched_papers")
+    os.makedirs(enriched_dir, exist_ok=True)
+    store = EmbeddingStore(os.path.join(data_dir, "embeddings"))
+    rng = np.random.default_rng(seed)
+    words = vocabulary(seed=seed)
+    centers = rng.standard_normal((_CLUSTERS, dim)).astype(np.float32)
+    centers /= np.linalg.norm(centers, axis=1, keepdims=True)
+
+    for lo in range(0, n, _BLOCK):
+        papers = [synthetic_paper(i, rng, words) for i in range(lo, min(n, lo + _BLOCK))]
+        vectors = synthetic_embeddings(len(papers), rng, centers)
+        store.append_many([p.paper_id for p in papers], vectors)
+        for i, (paper, vector) in enumerate(zip(papers, vectors), start=lo):
+            data = paper.model_dump(mode="json")
+            if json_embeddings:
+                data["embedding"] = [round(float(v), 6) for v in vector]
+            # Named after a PDF, like extractor output, not after the paper_id.
+            with open(os.path.join(enriched_dir, f"synthetic_paper_{i:07d}.json"), "w", encoding="utf-8") as f:
+                json.dump(data, f)
+
+
+def corpus_size(data_dir: str) -> int:
+    """Papers already generated under ``data_dir`` (0 if none)."""
+    return len(EmbeddingStore(os.path.join(data_dir, "embeddings")).read_ids())
+
+
+def sample_queries(n: int, seed: int = 1) -> list[str]:
+    """Two to four word queries drawn from the corpus vocabulary."""
+    rng = np.random.default_rng(seed)
+    words = vocabulary()
+    return [_sentence(rng, words, int(rng.integers(2, 5))) for _ in range(n)]
@@ -0,0 +1,255 @@
+"""End-to-end HTTP load test of the API, fully offline.
+
+    python -m benchmarks.load_test --size 10000 --concurrency 32 --duration 30
+
+Starts ``benchmarks.offline_app`` under uvicorn on a synthetic corpus (the
+embedding model replaced by a stub encoder). With ``--backend azure-stub`` the
+app searches through Azure AI Search pointed at a local stand-in service.
+Closed-loop clients then drive ``/papers/``, ``/papers/{id}`` and
+``/papers/search`` in the ``--mix`` proportions, and latency percentiles,
+throughput, errors and shed requests (429/503) are reported per endpoint.
+Pass ``--url`` to load an already running server instead.
+
+The client runs on the same machine as the server, so leave it cores: the
+reported ceiling is for the server sharing the box with the load generator.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Optional, Sequence
+
+import httpx
+import numpy as np
+
+from benchmarks.corpus import corpus_size, generate_corpus, sample_queries
+from benchmarks.stub_search_service import StubSearchService, load_documents
+
+logger = logging.getLogger(__name__)
+
+ENDPOINTS = ("list", "detail", "search")
+# Statuses the API answers with when it sheds load (queue full or timed out).
+_SHED_STATUSES = (429, 503)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(data_dir: str, workers: int, env_overrides: dict[str, str]) -> tuple[subprocess.Popen, str]:
+    port = _free_port()
+    env = dict(os.environ, DATA_DIR=data_dir, EMBEDDINGS_DIR=os.path.join(data_dir, "embeddings"),
+               API_WATCH_INTERVAL="0", AZURE_SEARCH_ENDPOINT="", AZURE_SEARCH_API_KEY="", **env_overrides)
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "benchmarks.offline_app:app", "--host", "127.0.0.1",
+         "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+        env=env,
+    )
+    return process, f"http://127.0.0.1:{port}"
+
+
+def wait_ready(base_url: str, timeout: float, process: Optional[subprocess.Popen] = None) -> float:
+    """Poll ``/ready``; returns seconds until the API reported ready."""
+    start = time.monotonic()
+    while time.monotonic() - start < timeout:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(f"API server exited with code {process.returncode}")
+        try:
+            if httpx.get(f"{base_url}/ready", timeout=2).status_code == 200:
+                return time.monotonic() - start
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.25)
+    raise TimeoutError(f"API at {base_url} not ready after {timeout:.0f}s")
+
+
+def parse_mix(mix: str) -> dict[str, float]:
+    """``"list=1,detail=3,search=6"`` -> endpoint weights."""
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        if name not in ENDPOINTS:
+            raise ValueError(f"Unknown endpoint '{name}' in --mix; expected one of {ENDPOINTS}")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+async def drive(base_url: str, mix: dict[str, float], concurrency: int, duration: float,
+                paper_ids: list[str], queries: list[str], top_k: int = 10, seed: int = 0,
+                search_path: str = "/papers/search") -> dict[str, list[tuple[float, int]]]:
+    """Run ``concurrency`` closed-loop clients for ``duration`` seconds.
+
+    Returns ``(seconds, status)`` per request and endpoint; status ``0`` marks a
+    transport error or timeout.
+    """
+    names, weights = list(mix), list(mix.values())
+    records: dict[str, list[tuple[float, int]]] = {name: [] for name in names}
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=30, limits=limits) as client:
+        deadline = time.monotonic() + duration
+
+        async def client_loop(worker: int) -> None:
+            rng = random.Random(seed * 10_007 + worker)
+            while time.monotonic() < deadline:
+                name = rng.choices(names, weights)[0]
+                if name == "list":
+                    url, params = "/papers/", {"limit": 50}
+                elif name == "detail":
+                    url, params = f"/papers/{rng.choice(paper_ids)}", None
+                else:
+                    url, params = search_path, {"q": rng.choice(queries), "top_k": top_k}
+                start = time.perf_counter()
+                try:
+                    status = (await client.get(url, params=params)).status_code
+                except httpx.HTTPError:
+                    status = 0
+                records[name].append((time.perf_counter() - start, status))
+
+        await asyncio.gather(*(client_loop(i) for i in range(concurrency)))
+    return records
+
+
+def summarize(records: dict[str, list[tuple[float, int]]], elapsed: float) -> dict[str, dict]:
+    summary = {}
+    for name, samples in records.items():
+        if not samples:
+            continue
+        latencies = np.array([seconds for seconds, _ in samples]) * 1000
+        statuses: dict[str, int] = {}
+        for _, status in samples:
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+        # Requests turned away by admission control are load shedding, not failures.
+        shed = sum(1 for _, status in samples if status in _SHED_STATUSES)
+        errors = sum(1 for _, status in samples
+                     if status not in _SHED_STATUSES and (status == 0 or status >= 500))
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        summary[name] = {
+            "requests": len(samples),
+            "rps": round(len(samples) / elapsed, 1),
+            "errors": errors,
+            "error_rate": round(errors / len(samples), 4),
+            "shed": shed,
+            "status": statuses,
+            "latency_ms": {"p50": round(float(p50), 2), "p95": round(float(p95), 2),
+                           "p99": round(float(p99), 2), "max": round(float(latencies.max()), 2)},
+        }
+    return summary
+
+
+def run(base_url: str, mix: dict[str, float], concurrency: int, duration: float, warmup: float,
+        top_k: int, seed: int = 0, search_path: str = "/papers/search") -> dict:
+    """Warm up, then measure; returns the per-endpoint summary plus totals."""
+    paper_ids = []
+    if "detail" in mix:
+        listing = httpx.get(f"{base_url}/papers/", params={"limit": 1000, "fields": "title"}, timeout=30).json()
+        paper_ids = [paper["paper_id"] for paper in listing]
+        if not paper_ids:
+            raise RuntimeError("The API has no papers to load-test against")
+    queries = sample_queries(500, seed=seed + 1)
+
+    if warmup > 0:
+        asyncio.run(drive(base_url, mix, concurrency, warmup, paper_ids, queries, top_k, seed, search_path))
+    start = time.monotonic()
+    records = asyncio.run(drive(base_url, mix, concurrency, duration, paper_ids, queries, top_k, seed + 1,
+                                search_path))
+    elapsed = time.monotonic() - start
+    endpoints = summarize(records, elapsed)
+    total = sum(e["requests"] for e in endpoints.values())
+    return {
+        "elapsed_seconds": round(elapsed, 2),
+        "total_rps": round(total / elapsed, 1),
+        "total_errors": sum(e["errors"] for e in endpoints.values()),
+        "total_shed": sum(e["shed"] for e in endpoints.values()),
+        "endpoints": endpoints,
+    }
+
+
+def main(argv: Sequence[str] | None = None) -> dict:
+    parser = argparse.ArgumentParser(description="Offline HTTP load test of the API")
+    parser.add_argument("--url", default=None, help="Load an already running API instead of starting one")
+    parser.add_argument("--size", type=int, default=10_000, help="Synthetic corpus size")
+    parser.add_argument("--data-root", default=os.path.join("data", "bench"))
+    parser.add_argument("--backend", choices=["local", "azure-stub"], default="local")
+    parser.add_argument("--azure-latency-ms", type=float, default=20.0,
+                        help="Delay the stub search service adds per query")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--warmup", type=float, default=5.0)
+    parser.add_argument("--mix", default="list=1,detail=3,search=6")
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--search-path", default="/papers/search",
+                        help="Route the search share of the mix hits, e.g. /cluster/search on a coordinator")
+    parser.add_argument("--search-cache", action="store_true",
+                        help="Keep the search result cache on (off by default so every search is served)")
+    parser.add_argument("--ready-timeout", type=float, default=900.0)
+    parser.add_argument("--output", default=None, help="JSON results file (default: under --data-root)")
+    args = parser.parse_args(argv)
+    mix = parse_mix(args.mix)
+
+    process, stub, ready_seconds = None, None, None
+    base_url = args.url
+    try:
+        if base_url is None:
+            data_dir = os.path.abspath(os.path.join(args.data_root, f"n{args.size}"))
+            if corpus_size(data_dir) != args.size:
+                generate_corpus(data_dir, args.size)
+            overrides = {} if args.search_cache else {"API_SEARCH_CACHE_SIZE": "0"}
+            if args.backend == "azure-stub":
+                documents = load_documents(os.path.join(data_dir, "enriched_papers"))
+                stub = StubSearchService(documents, latency=args.azure_latency_ms / 1000).start()
+                overrides.update(AZURE_SEARCH_ENDPOINT=stub.endpoint, AZURE_SEARCH_API_KEY="offline")
+            process, base_url = start_server(data_dir, args.workers, overrides)
+        ready_seconds = wait_ready(base_url, args.ready_timeout, process)
+        result = run(base_url, mix, args.concurrency, args.duration, args.warmup, args.top_k,
+                     search_path=args.search_path)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=30)
+        if stub is not None:
+            stub.stop()
+
+    report = {
+        "meta": {
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "url": args.url,
+            "size": None if args.url else args.size,
+            "backend": None if args.url else args.backend,
+            "workers": None if args.url else args.workers,
+            "concurrency": args.concurrency,
+            "mix": mix,
+            "search_path": args.search_path,
+            "search_cache": args.search_cache,
+            "cpus": os.cpu_count(),
+            "ready_seconds": None if ready_seconds is None else round(ready_seconds, 2),
+        },
+        **result,
+    }
+    output = args.output or os.path.join(
+        args.data_root, f"load-{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    for name, stats in result["endpoints"].items():
+        latency = stats["latency_ms"]
+        print(f"{name:<8} {stats['rps']:>8.1f} req/s  p50 {latency['p50']:>7.2f}ms  p95 {latency['p95']:>7.2f}ms"
+              f"  p99 {latency['p99']:>7.2f}ms  errors {stats['errors']}  shed {stats['shed']}")
+    print(f"total    {result['total_rps']:>8.1f} req/s  -> {output}")
+    return report
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
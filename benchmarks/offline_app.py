@@ -0,0 +1,14 @@
+"""The API app with the embedding model replaced by the benchmark stub encoder.
+
+    DATA_DIR=data/bench/n10000 uvicorn benchmarks.offline_app:app
+
+Nothing is downloaded: queries are encoded by ``StubEncoder``. Point
+``AZURE_SEARCH_ENDPOINT`` at ``benchmarks.stub_search_service`` to exercise the
+Azure code path offline.
+"""
+from benchmarks.search_bench import StubEncoder
+from services.api import paper_store
+
+paper_store._load_embedding_model = lambda: StubEncoder()
+
+from services.api.main import app  # noqa: E402,F401
@@ -0,0 +1,191 @@
+"""PaperStore benchmark: load time, peak RSS, query latency and throughput per corpus size.
+
+    python -m benchmarks.search_bench --sizes 10000 100000 1000000
+
+Corpora are generated once under ``--data-root`` and reused by later runs. Each
+size is measured in a fresh process so peak RSS belongs to that size alone.
+Queries are encoded by a deterministic stub, so no model download is needed.
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timezone
+from multiprocessing import get_context
+from typing import Any, Callable, Sequence
+
+import numpy as np
+
+from benchmarks.corpus import DIM, corpus_size, generate_corpus, sample_queries
+
+logger = logging.getLogger(__name__)
+
+
+class StubEncoder:
+    """Offline stand-in for SentenceTransformer: a fixed random vector per text."""
+
+    def __init__(self, dim: int = DIM):
+        self.dim = dim
+
+    def encode(self, texts, **_kwargs) -> np.ndarray:
+        return np.stack([self._vector(t) for t in texts])
+
+    def _vector(self, text: str) -> np.ndarray:
+        seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+        return np.random.default_rng(seed).standard_normal(self.dim).astype(np.float32)
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10  # bytes on macOS, KiB on Linux
+
+
+def latency_ms(fn: Callable[[Any], Any], items: Sequence[Any]) -> dict[str, float]:
+    """Per-call latency percentiles of ``fn`` over ``items``, run one at a time."""
+    timings = []
+    for item in items:
+        start = time.perf_counter()
+        fn(item)
+        timings.append((time.perf_counter() - start) * 1000)
+    p50, p95, p99 = np.percentile(timings, [50, 95, 99])
+    return {"p50": round(float(p50), 3), "p95": round(float(p95), 3), "p99": round(float(p99), 3),
+            "mean": round(float(np.mean(timings)), 3)}
+
+
+def throughput_qps(fn: Callable[[int], Any], n: int, threads: int) -> float:
+    """Calls per second with ``threads`` callers working through ``n`` calls."""
+    start = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        list(pool.map(fn, range(n)))
+    return round(n / (time.perf_counter() - start), 1)
+
+
+def _configure(data_dir: str, options: dict) -> None:
+    from services.api.config import Config
+
+    Config.DATA_DIR = data_dir
+    Config.ENRICHED_DIR = os.path.join(data_dir, "enriched_papers")
+    Config.EMBEDDINGS_DIR = os.path.join(data_dir, "embeddings")
+    Config.SNAPSHOT_PATH = os.path.join(data_dir, "catalog.snapshot")
+    Config.SHARED_DIR = os.path.join(data_dir, "shared")
+    Config.ANN_INDEX_PATH = os.path.join(data_dir, "ann_index.npz")
+    Config.LOCAL_INDEX = options["index"]
+    Config.INDEX_QUANTIZATION = options["quantization"]
+    Config.USE_AZURE_SEARCH = False
+    Config.SEARCH_CACHE_SIZE = 0  # every query is measured, not served from the result cache
+
+
+def run_size(data_dir: str, options: dict) -> dict:
+    """Measure one corpus; meant to run in its own process."""
+    logging.basicConfig(level=logging.WARNING)
+    _configure(data_dir, options)
+    from services.api import paper_store
+    from services.api.paper_store import PaperStore
+
+    paper_store._load_embedding_model = lambda: StubEncoder()
+    for path in (os.path.join(data_dir, "catalog.snapshot"), os.path.join(data_dir, "ann_index.npz")):
+        if os.path.exists(path):
+            os.remove(path)
+    shutil.rmtree(os.path.join(data_dir, "shared"), ignore_errors=True)
+
+    store = PaperStore()
+    start = time.perf_counter()
+    store.load_papers()
+    result: dict[str, Any] = {"papers": len(store.papers), "load_seconds": round(time.perf_counter() - start, 3)}
+    store.warm_up()
+    result["peak_rss_mb_after_load"] = round(peak_rss_mb(), 1)
+
+    queries = sample_queries(options["queries"])
+    top_k, batch_size, threads = options["top_k"], options["batch_size"], options["threads"]
+    batches = [queries[i:i + batch_size] for i in range(0, len(queries), batch_size)]
+    q_vecs = store._encode_queries(queries)
+    result["modes"] = {}
+    for mode in options["modes"]:
+        single = latency_ms(lambda q: store.search(q, top_k, mode=mode), queries)
+        batch = latency_ms(lambda b: store.search_batch(b, top_k, mode=mode), batches)
+        qps = throughput_qps(
+            lambda i: store._search_local_batch([queries[i]], top_k, mode, None, q_vecs[i:i + 1]),
+            len(queries), threads)
+        result["modes"][mode] = {"single_ms": single, f"batch{batch_size}_ms": batch, "search_local_qps": qps}
+
+    restarted = PaperStore()
+    start = time.perf_counter()
+    restarted.load_papers()
+    result["restart_seconds"] = round(time.perf_counter() - start, 3)
+    result["peak_rss_mb"] = round(peak_rss_mb(), 1)
+    restarted.close()
+    store.close()
+    return result
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main(argv: Sequence[str] | None = None) -> dict:
+    parser = argparse.ArgumentParser(description="Benchmark PaperStore on synthetic corpora")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--data-root", default=os.path.join("data", "bench"))
+    parser.add_argument("--output", default=None, help="JSON results file (default: under --data-root)")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--threads", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--modes", nargs="+", choices=["vector", "keyword", "hybrid"],
+                        default=["vector", "keyword", "hybrid"])
+    parser.add_argument("--index", choices=["exact", "ivf"], default="exact")
+    parser.add_argument("--quantization", choices=["none", "int8", "float16"], default="none")
+    parser.add_argument("--no-json-embeddings", action="store_true",
+                        help="Keep vectors only in the embedding store, not in each JSON")
+    args = parser.parse_args(argv)
+    options = {key: getattr(args, key) for key in
+               ("queries", "batch_size", "top_k", "threads", "modes", "index", "quantization")}
+
+    report = {
+        "meta": {
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "options": options,
+        },
+        "runs": [],
+    }
+    for size in args.sizes:
+        data_dir = os.path.abspath(os.path.join(args.data_root, f"n{size}"))
+        if corpus_size(data_dir) != size:
+            shutil.rmtree(data_dir, ignore_errors=True)
+            start = time.perf_counter()
+            generate_corpus(data_dir, size, json_embeddings=not args.no_json_embeddings)
+            logger.info(f"Generated {size} papers in {time.perf_counter() - start:.1f}s")
+        with ProcessPoolExecutor(1, mp_context=get_context("spawn")) as pool:
+            run = pool.submit(run_size, data_dir, options).result()
+        report["runs"].append({"size": size, **run})
+        logger.info(f"{size} papers: {json.dumps(run)}")
+
+    output = args.output or os.path.join(
+        args.data_root, f"search-{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    logger.info(f"Wrote {output}")
+    return report
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
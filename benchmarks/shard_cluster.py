@@ -0,0 +1,127 @@
+"""Run a sharded API on one machine and check it against a single node.
+
+    python -m benchmarks.shard_cluster --size 20000 --shards 4
+    python -m benchmarks.shard_cluster --size 20000 --shards 4 --serve
+
+Starts ``--shards`` API processes on one synthetic corpus, each loading its
+hash partition (``API_SHARD_COUNT``/``API_SHARD_INDEX``), plus a coordinator
+holding no papers whose ``/cluster/search`` fans out to them. It also starts an
+unsharded reference node. The same queries go to both, and the report gives
+the share of identical top-k lists per mode, their mean overlap and the
+latency of each. Vector search should agree exactly. BM25 uses shard-local
+term statistics, so keyword and hybrid results agree only approximately. With ``--serve`` the cluster
+stays up for ``benchmarks.load_test --url <coordinator> --search-path
+/cluster/search``.
+"""
+import argparse
+import json
+import logging
+import os
+import subprocess
+import time
+from typing import Sequence
+
+import httpx
+import numpy as np
+
+from benchmarks.corpus import corpus_size, generate_corpus, sample_queries
+from benchmarks.load_test import start_server, wait_ready
+
+logger = logging.getLogger(__name__)
+
+
+def start_cluster(data_dir: str, shards: int, timeout: float) -> tuple[list[subprocess.Popen], str, list[str]]:
+    """Shard processes and a coordinator; returns the processes, coordinator URL and shard URLs."""
+    processes, shard_urls = [], []
+    for index in range(shards):
+        process, url = start_server(data_dir, 1, {"API_SHARD_COUNT": str(shards), "API_SHARD_INDEX": str(index)})
+        processes.append(process)
+        shard_urls.append(url)
+    coordinator_dir = os.path.join(data_dir, "coordinator")
+    os.makedirs(coordinator_dir, exist_ok=True)
+    process, url = start_server(coordinator_dir, 1, {"API_SHARD_URLS": ",".join(shard_urls),
+                                                     "API_SHARD_TIMEOUT": str(timeout)})
+    processes.append(process)
+    return processes, url, shard_urls
+
+
+def compare(reference_url: str, cluster_url: str, queries: list[str], modes: Sequence[str],
+            top_k: int) -> dict[str, dict]:
+    """Top-k agreement and latency of the cluster against the single node, per mode."""
+    report = {}
+    with httpx.Client(timeout=30) as client:
+        for mode in modes:
+            same, overlap, single_ms, cluster_ms, partial = 0, 0.0, [], [], 0
+            for q in queries:
+                params = {"q": q, "top_k": top_k, "mode": mode}
+                start = time.perf_counter()
+                expected = client.get(f"{reference_url}/papers/search", params=params).json()["results"]
+                single_ms.append((time.perf_counter() - start) * 1000)
+                start = time.perf_counter()
+                merged = client.get(f"{cluster_url}/cluster/search", params=params).json()
+                cluster_ms.append((time.perf_counter() - start) * 1000)
+                partial += merged["partial"]
+                got, want = [r["paper_id"] for r in merged["results"]], [r["paper_id"] for r in expected]
+                same += got == want
+                overlap += len(set(got) & set(want)) / max(len(want), 1)
+            report[mode] = {
+                "identical_top_k": round(same / len(queries), 3),
+                "top_k_overlap": round(overlap / len(queries), 3),
+                "partial": partial,
+                "single_p50_ms": round(float(np.percentile(single_ms, 50)), 2),
+                "cluster_p50_ms": round(float(np.percentile(cluster_ms, 50)), 2),
+                "cluster_p95_ms": round(float(np.percentile(cluster_ms, 95)), 2),
+            }
+    return report
+
+
+def main(argv: Sequence[str] | None = None) -> dict:
+    parser = argparse.ArgumentParser(description="Sharded API cluster on one machine")
+    parser.add_argument("--size", type=int, default=20_000, help="Synthetic corpus size")
+    parser.add_argument("--data-root", default=os.path.join("data", "bench"))
+    parser.add_argument("--shards", type=int, default=4)
+    parser.add_argument("--shard-timeout", type=float, default=2.0)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--modes", nargs="+", choices=["vector", "keyword", "hybrid"],
+                        default=["vector", "keyword", "hybrid"])
+    parser.add_argument("--ready-timeout", type=float, default=900.0)
+    parser.add_argument("--serve", action="store_true", help="Keep the cluster running until interrupted")
+    args = parser.parse_args(argv)
+
+    data_dir = os.path.abspath(os.path.join(args.data_root, f"n{args.size}"))
+    if corpus_size(data_dir) != args.size:
+        generate_corpus(data_dir, args.size)
+
+    processes, cluster_url, shard_urls = start_cluster(data_dir, args.shards, args.shard_timeout)
+    reference, reference_url = start_server(data_dir, 1, {})
+    processes.append(reference)
+    result: dict = {}
+    try:
+        for process, url in zip(processes, shard_urls + [cluster_url, reference_url]):
+            wait_ready(url, args.ready_timeout, process)
+        shard_papers = [httpx.get(f"{url}/ready", timeout=10).json()["papers"] for url in shard_urls]
+        result = {
+            "size": args.size,
+            "shards": args.shards,
+            "shard_papers": shard_papers,
+            "modes": compare(reference_url, cluster_url, sample_queries(args.queries), args.modes, args.top_k),
+        }
+        print(json.dumps(result, indent=2))
+        if args.serve:
+            print(f"Coordinator: {cluster_url}/cluster/search  shards: {', '.join(shard_urls)}")
+            while all(p.poll() is None for p in processes):
+                time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait(timeout=30)
+    return result
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
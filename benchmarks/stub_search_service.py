@@ -0,0 +1,127 @@
+"""Local stand-in for the Azure AI Search REST API, for offline load tests.
+
+Answers index lookups and updates and document searches from a synthetic
+corpus. The index definition has every field ``shared.search_client`` expects,
+so a client starting against the stub finds nothing to add. Every search
+returns ``top`` documents picked deterministically from the request body,
+after an optional delay that stands in for the network round trip.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+_FIELDS = ("paper_id", "title", "authors", "abstract", "topics", "categories", "published")
+_SUMMARY_FIELDS = ("research_question", "methodology", "key_findings", "contributions", "limitations")
+
+# The schema shared.search_client creates, in REST form.
+_INDEX_FIELDS = (
+    {"name": "paper_id", "type": "Edm.String", "key": True, "filterable": True},
+    {"name": "title", "type": "Edm.String", "searchable": True},
+    {"name": "abstract", "type": "Edm.String", "searchable": True},
+    {"name": "clean_text", "type": "Edm.String", "searchable": True},
+    {"name": "authors", "type": "Collection(Edm.String)", "filterable": True},
+    {"name": "topics", "type": "Collection(Edm.String)", "filterable": True, "facetable": True},
+    {"name": "categories", "type": "Collection(Edm.String)", "filterable": True, "facetable": True},
+    {"name": "published", "type": "Edm.DateTimeOffset", "filterable": True, "sortable": True},
+    {"name": "research_question", "type": "Edm.String", "searchable": True},
+    {"name": "methodology", "type": "Edm.String", "searchable": True},
+    {"name": "contributions", "type": "Edm.String", "searchable": True},
+    {"name": "limitations", "type": "Edm.String", "searchable": True},
+    {"name": "key_findings", "type": "Collection(Edm.String)"},
+    {"name": "enriched_at", "type": "Edm.DateTimeOffset", "sortable": True},
+    {"name": "embedding", "type": "Collection(Edm.Single)", "searchable": True, "dimensions": 384,
+     "vectorSearchProfile": "default-profile"},
+)
+_VECTOR_SEARCH = {
+    "algorithms": [{"name": "default-algorithm", "kind": "hnsw"}],
+    "profiles": [{"name": "default-profile", "algorithm": "default-algorithm"}],
+}
+
+
+def load_documents(enriched_dir: str, limit: int = 5000) -> list[dict]:
+    """Search documents for up to ``limit`` papers, shaped like the enricher's."""
+    documents = []
+    for name in sorted(os.listdir(enriched_dir))[:limit]:
+        with open(os.path.join(enriched_dir, name), encoding="utf-8") as f:
+            paper = json.load(f)
+        document = {field: paper.get(field) for field in _FIELDS}
+        document["paper_id"] = paper["paper_id"].replace(".", "-")
+        document.update({field: paper["summary"][field] for field in _SUMMARY_FIELDS})
+        documents.append(document)
+    return documents
+
+
+class StubSearchService:
+    def __init__(self, documents: list[dict], latency: float = 0.0, host: str = "127.0.0.1", port: int = 0):
+        service = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _reply(self, body: dict, status: int = 200) -> None:
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _body(self) -> bytes:
+                return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+            def do_GET(self):
+                self._reply(service.index)
+
+            def do_PUT(self):
+                # Create or update the index definition.
+                service.index = json.loads(self._body() or b"{}")
+                self._reply(service.index)
+
+            def do_POST(self):
+                body = self._body()
+                if urlsplit(self.path).path.rstrip("/") == "/indexes":
+                    service.index = json.loads(body or b"{}")
+                    self._reply(service.index, status=201)
+                    return
+                if service.latency:
+                    time.sleep(service.latency)
+                self._reply({"value": service.search(json.loads(body or b"{}"), body)})
+
+            def log_message(self, *_args):
+                pass
+
+        self.documents = documents
+        self.latency = latency
+        self.index = {"name": "papers", "fields": [dict(field) for field in _INDEX_FIELDS],
+                      "vectorSearch": _VECTOR_SEARCH}
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def endpoint(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def search(self, request: dict, raw: bytes) -> list[dict]:
+        top = int(request.get("top") or 10)
+        start = int.from_bytes(hashlib.sha1(raw).digest()[:4], "little") % max(len(self.documents), 1)
+        picked = (self.documents[start:] + self.documents[:start])[:top]
+        return [{"@search.score": 1.0 / (rank + 1), **doc} for rank, doc in enumerate(picked)]
+
+    def start(self) -> "StubSearchService":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="stub-search", daemon=True)
+        self._thread.start()
+        logger.info(f"Stub search service on {self.endpoint} with {len(self.documents)} documents")
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
@@ -6,5 +6,7 @@ from .paper import (
     EnrichedPaper,
     PaperSummary,
     PaperSearchResult,
+    SearchFilters,
+    BatchSearchRequest,
     ProcessingStatus,
 )
@@ -1,6 +1,6 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, constr
 from typing import Optional
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
 from enum import Enum
 
 
@@ -34,6 +34,8 @@ class ExtractedPaper(BaseModel):
     title: str
     authors: list[str] = Field(default_factory=list)
     abstract: Optional[str] = None
+    categories: list[str] = Field(default_factory=list)
+    published: Optional[str] = None
     raw_text: str
     extraction_method: str
     page_count: int
@@ -55,6 +57,8 @@ class ValidatedPaper(BaseModel):
     title: str
     authors: list[str] = Field(default_factory=list)
     abstract: Optional[str] = None
+    categories: list[str] = Field(default_factory=list)
+    published: Optional[str] = None
     clean_text: str
     validation: ValidationResult
     validated_at: datetime = Field(default_factory=_utcnow)
@@ -74,6 +78,8 @@ class EnrichedPaper(BaseModel):
     title: str
     authors: list[str] = Field(default_factory=list)
     abstract: Optional[str] = None
+    categories: list[str] = Field(default_factory=list)
+    published: Optional[str] = None
     clean_text: str
     summary: PaperSummary
     topics: list[str] = Field(default_factory=list)
@@ -89,4 +95,22 @@ class PaperSearchResult(BaseModel):
     abstract: Optional[str] = None
     summary: Optional[PaperSummary] = None
     topics: list[str] = Field(default_factory=list)
+    categories: list[str] = Field(default_factory=list)
+    published: Optional[str] = None
     score: float = 0.0
+
+
+class SearchFilters(BaseModel):
+    """Restrict search to papers matching any listed value of every given field."""
+    topics: list[str] = Field(default_factory=list)
+    authors: list[str] = Field(default_factory=list)
+    categories: list[str] = Field(default_factory=list)
+    published_from: Optional[date] = None
+    published_to: Optional[date] = None
+
+
+class BatchSearchRequest(BaseModel):
+    queries: list[constr(min_length=1)] = Field(..., min_length=1, max_length=2048)
+    top_k: int = Field(5, ge=1, le=50)
+    mode: Optional[str] = Field(None, pattern="^(hybrid|vector|keyword)$")
+    filters: Optional[SearchFilters] = None
@@ -96,6 +96,18 @@ resource "azurerm_container_app" "api" {
         name = "paper-data"
         path = "/app/data"
       }
+
+      readiness_probe {
+        transport = "HTTP"
+        port      = 8000
+        path      = "/ready"
+      }
+
+      liveness_probe {
+        transport = "HTTP"
+        port      = 8000
+        path      = "/health"
+      }
     }
   }
 }
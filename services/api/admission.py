@@ -0,0 +1,118 @@
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from services.api.metrics import ADMISSION_IN_FLIGHT, ADMISSION_QUEUE_DEPTH, ADMISSION_REJECTED, ADMISSION_WAIT
+
+
+class AdmissionRejected(RuntimeError):
+    """The request was shed; ``status_code`` and ``retry_after`` go back to the client."""
+
+    def __init__(self, message: str, status_code: int, retry_after: int):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class AdmissionLimiter:
+    """Concurrency limit with a bounded FIFO queue and a queueing deadline.
+
+    At most ``limit`` requests hold a slot at once. Up to ``queue_size`` more
+    wait for one, each for at most ``timeout`` seconds. A request that finds the
+    queue full is rejected with ``429`` at once. A request that waits past its
+    deadline is rejected with ``503``. Either way the client gets a
+    ``Retry-After`` hint, so excess load costs a few microseconds instead of a
+    thread-pool slot. Slots pass straight to the oldest waiter on release.
+
+    Only the event loop touches the state, so no lock is needed. ``limit`` 0
+    disables the limiter.
+    """
+
+    def __init__(self, name: str, limit: int, queue_size: int, timeout: float):
+        self.name = name
+        self.limit = limit
+        self.queue_size = max(0, queue_size)
+        self.timeout = max(0.0, timeout)
+        self._active = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        self._hold_seconds = 0.0  # moving average of time a slot is held, for Retry-After
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold a slot for the body; raises ``AdmissionRejected`` when shedding."""
+        if self.limit <= 0:
+            yield
+            return
+        await self._acquire()
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self._hold_seconds += 0.1 * (time.monotonic() - start - self._hold_seconds)
+            self._release()
+
+    def retry_after(self) -> int:
+        """Whole seconds until the current backlog should have drained."""
+        backlog = (self.queued + 1) / max(self.limit, 1)
+        return max(1, math.ceil(backlog * self._hold_seconds))
+
+    async def _acquire(self) -> None:
+        if self._active < self.limit and not self._waiters:
+            self._admit()
+            ADMISSION_WAIT.labels(self.name).observe(0.0)
+            return
+        if len(self._waiters) >= self.queue_size:
+            self._reject("queue_full", 429, f"Too many concurrent {self.name} requests")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        ADMISSION_QUEUE_DEPTH.labels(self.name).set(len(self._waiters))
+        start = time.monotonic()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.timeout)
+        except asyncio.TimeoutError:
+            if not waiter.done():  # else the slot was handed over as the deadline passed
+                self._withdraw(waiter)
+                self._reject("timeout", 503, f"No {self.name} capacity within {self.timeout:g}s")
+        except asyncio.CancelledError:
+            # The client went away: give back the slot if it arrived, else leave the queue.
+            if waiter.done():
+                self._release()
+            else:
+                self._withdraw(waiter)
+            raise
+        finally:
+            ADMISSION_WAIT.labels(self.name).observe(time.monotonic() - start)
+
+    def _admit(self) -> None:
+        self._active += 1
+        ADMISSION_IN_FLIGHT.labels(self.name).set(self._active)
+
+    def _release(self) -> None:
+        if self._waiters:
+            # Hand the slot over without freeing it, so a newcomer cannot jump the queue.
+            self._waiters.popleft().set_result(None)
+            ADMISSION_QUEUE_DEPTH.labels(self.name).set(len(self._waiters))
+            return
+        self._active -= 1
+        ADMISSION_IN_FLIGHT.labels(self.name).set(self._active)
+
+    def _withdraw(self, waiter: asyncio.Future) -> None:
+        waiter.cancel()
+        self._waiters.remove(waiter)
+        ADMISSION_QUEUE_DEPTH.labels(self.name).set(len(self._waiters))
+
+    def _reject(self, reason: str, status_code: int, message: str) -> None:
+        ADMISSION_REJECTED.labels(self.name, reason).inc()
+        raise AdmissionRejected(message, status_code, self.retry_after())
@@ -0,0 +1,146 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Hashable, Optional
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Thread-safe bounded LRU cache with per-entry TTL.
+
+    ``get_or_compute`` coalesces concurrent misses on the same key: the first
+    caller computes the value and every other caller waits for that result.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, hits=None, misses=None):
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._hits = hits
+        self._misses = misses
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._inflight: dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def _lookup(self, key: Hashable) -> Any:
+        """Return the cached value or ``_MISSING``. Caller holds the lock."""
+        entry = self._data.get(key)
+        if entry is None:
+            return _MISSING
+        expires, value = entry
+        if expires < time.monotonic():
+            del self._data[key]
+            return _MISSING
+        self._data.move_to_end(key)
+        return value
+
+    def _store(self, key: Hashable, value: Any) -> None:
+        """Insert and evict the least recently used entries. Caller holds the lock."""
+        if self._maxsize <= 0:
+            return
+        self._data[key] = (time.monotonic() + self._ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self._maxsize:
+            self._data.popitem(last=False)
+
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        with self._lock:
+            value = self._lookup(key)
+        self._count(value is not _MISSING)
+        return default if value is _MISSING else value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._store(key, value)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Return the cached value for ``key``, computing it at most once across threads."""
+        return self.get_or_compute_many([key], lambda keys: [compute()])[0]
+
+    def get_or_compute_many(
+        self,
+        keys: list[Hashable],
+        compute_many: Callable[[list[Hashable]], list[Any]],
+    ) -> list[Any]:
+        """Resolve many keys, passing only the uncached, not-in-flight ones to ``compute_many``."""
+        def submit(pending: list[Hashable]) -> Future:
+            future: Future = Future()
+            try:
+                future.set_result(compute_many(pending))
+            except BaseException as e:
+                future.set_exception(e)
+            return future
+
+        return [future.result() for future in self.get_or_submit_many(keys, submit)]
+
+    def get_or_submit_many(
+        self,
+        keys: list[Hashable],
+        submit_many: Callable[[list[Hashable]], Future],
+    ) -> list[Future]:
+        """Non-blocking ``get_or_compute_many``: one future per key.
+
+        ``submit_many`` receives the uncached, not-in-flight keys and returns a
+        future of their values; results are cached when it completes. Failures
+        reach every waiter and are not cached.
+        """
+        futures: dict[Hashable, Future] = {}
+        owned: list[Hashable] = []
+        hits = 0
+
+        with self._lock:
+            for key in keys:
+                if key in futures:
+                    continue
+                value = self._lookup(key)
+                if value is not _MISSING:
+                    futures[key] = Future()
+                    futures[key].set_result(value)
+                    hits += 1
+                elif key in self._inflight:
+                    futures[key] = self._inflight[key]
+                    hits += 1
+                else:
+                    futures[key] = self._inflight[key] = Future()
+                    owned.append(key)
+
+        self._count(True, hits)
+        self._count(False, len(owned))
+
+        if owned:
+            try:
+                batch = submit_many(owned)
+            except BaseException as e:
+                self._resolve(owned, None, e)
+                raise
+            batch.add_done_callback(lambda done: self._resolve(owned, done, None))
+
+        return [futures[key] for key in keys]
+
+    def _resolve(self, keys: list[Hashable], done: Optional[Future], error: Optional[BaseException]) -> None:
+        if done is not None:
+            error = done.exception()
+        values = done.result() if error is None else [None] * len(keys)
+        with self._lock:
+            futures = [self._inflight.pop(key) for key in keys]
+            if error is None:
+                for key, value in zip(keys, values):
+                    self._store(key, value)
+        for future, value in zip(futures, values):
+            if error is None:
+                future.set_result(value)
+            else:
+                future.set_exception(error)
+
+    def _count(self, hit: bool, n: int = 1) -> None:
+        counter = self._hits if hit else self._misses
+        if counter is not None and n:
+            counter.inc(n)
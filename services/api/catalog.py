@@ -0,0 +1,214 @@
+import json
+import logging
+import multiprocessing
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from typing import AbstractSet, Any, Optional
+
+import numpy as np
+
+from data_contracts.paper import EnrichedPaper, PaperSummary, ProcessingStatus
+from services.api.shared_arrays import pack_blobs
+
+logger = logging.getLogger(__name__)
+
+_SNAPSHOT_FORMAT = 1
+# Below this many files, starting worker processes costs more than it saves.
+_PARALLEL_MIN_FILES = 256
+
+
+class SharedText:
+    """Abstracts and summaries of a whole catalog, packed by ``pack_text``.
+
+    The arrays are usually mapped from the shared directory, so every worker
+    serving the same catalog reads one copy. Values are decoded on access.
+    """
+
+    __slots__ = ("_data", "_offsets")
+
+    def __init__(self, arrays: dict[str, np.ndarray]):
+        self._data = arrays["data"]
+        self._offsets = arrays["offsets"]
+
+    def _blob(self, i: int) -> bytes:
+        return self._data[self._offsets[i]:self._offsets[i + 1]].tobytes()
+
+    def abstract(self, slot: int) -> Optional[str]:
+        return json.loads(self._blob(2 * slot))
+
+    def summary(self, slot: int) -> PaperSummary:
+        return PaperSummary.model_validate_json(self._blob(2 * slot + 1))
+
+
+def pack_text(entries: list["CatalogEntry"]) -> dict[str, np.ndarray]:
+    """Abstract and summary of each entry as JSON blobs; entry ``i`` owns slot ``i``."""
+    blobs = []
+    for entry in entries:
+        blobs.append(json.dumps(entry.abstract).encode("utf-8"))
+        blobs.append(entry.summary.model_dump_json().encode("utf-8"))
+    return pack_blobs(blobs)
+
+
+class CatalogEntry:
+    """Listing and search fields of one paper.
+
+    ``clean_text`` and the embedding are never held here; the full record is
+    re-read from ``source`` (the paper's enriched JSON) when a caller needs it.
+    ``stamp`` is the ``(mtime_ns, size)`` of that file when the entry was built.
+    After ``share_text`` the abstract and summary are read from a ``SharedText``
+    and the entry itself keeps only its slot there.
+    """
+
+    # Constructor arguments, in order; also the layout of a saved catalog.
+    FIELDS = ("paper_id", "title", "authors", "abstract", "topics", "categories", "published",
+              "summary", "status", "source", "stamp")
+    __slots__ = ("paper_id", "title", "authors", "_abstract", "topics", "categories", "published",
+                 "_summary", "status", "source", "stamp", "_text", "_slot")
+
+    def __init__(self, paper_id: str, title: str, authors: tuple[str, ...], abstract: Optional[str],
+                 topics: tuple[str, ...], categories: tuple[str, ...], published: Optional[str],
+                 summary: PaperSummary, status: ProcessingStatus, source: str, stamp: tuple[int, int]):
+        self.paper_id = paper_id
+        self.title = title
+        self.authors = authors
+        self._abstract = abstract
+        self.topics = topics
+        self.categories = categories
+        self.published = published
+        self._summary = summary
+        self.status = status
+        self.source = source
+        self.stamp = stamp
+        self._text: Optional[SharedText] = None
+        self._slot = 0
+
+    @property
+    def abstract(self) -> Optional[str]:
+        text = self._text
+        return self._abstract if text is None else text.abstract(self._slot)
+
+    @property
+    def summary(self) -> PaperSummary:
+        text = self._text
+        return self._summary if text is None else text.summary(self._slot)
+
+    def share_text(self, text: SharedText, slot: int) -> None:
+        """Read the abstract and summary from ``text`` from now on and drop the own copies."""
+        self._slot = slot
+        self._text = text
+        self._abstract = self._summary = None
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any], source: str, stamp: tuple[int, int]) -> "CatalogEntry":
+        """Validate an enriched-paper dict without its large fields and keep the slim part."""
+        slim = dict(data, clean_text="", embedding=None)
+        paper = EnrichedPaper(**slim)
+        return cls(
+            paper_id=paper.paper_id,
+            title=paper.title,
+            authors=tuple(paper.authors),
+            abstract=paper.abstract,
+            topics=tuple(paper.topics),
+            categories=tuple(paper.categories),
+            published=paper.published,
+            summary=paper.summary,
+            status=paper.status,
+            source=source,
+            stamp=stamp,
+        )
+
+
+def load_record(entry: CatalogEntry) -> Optional[EnrichedPaper]:
+    """Read the full paper behind a catalog entry, or ``None`` if its file is gone."""
+    try:
+        with open(entry.source, "r", encoding="utf-8") as f:
+            return EnrichedPaper(**json.load(f))
+    except FileNotFoundError:
+        return None
+
+
+def read_entry(path: str, stamp: tuple[int, int],
+               known_ids: Optional[AbstractSet[str]]) -> tuple[Optional[CatalogEntry], Optional[list[float]]]:
+    """Catalog entry for one enriched JSON, plus its embedding if ``known_ids`` lacks the paper.
+
+    Pass ``known_ids=None`` when embeddings are never needed (Azure mode).
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        embedding = None
+        if known_ids is not None and data.get("paper_id") not in known_ids:
+            embedding = data.get("embedding")
+        return CatalogEntry.from_dict(data, path, stamp), embedding
+    except Exception as e:
+        logger.error(f"Failed to load {os.path.basename(path)}: {e}")
+        return None, None
+
+
+_worker_known_ids: Optional[AbstractSet[str]] = None
+
+
+def _init_worker(known_ids: Optional[AbstractSet[str]]) -> None:
+    global _worker_known_ids
+    _worker_known_ids = known_ids
+
+
+def _read_entry_in_worker(item: tuple[str, tuple[int, int]]):
+    return read_entry(item[0], item[1], _worker_known_ids)
+
+
+def read_entries(items: list[tuple[str, tuple[int, int]]], known_ids: Optional[AbstractSet[str]],
+                 workers: int) -> list[tuple[Optional[CatalogEntry], Optional[list[float]]]]:
+    """``read_entry`` for many ``(path, stamp)`` pairs, in order.
+
+    Large batches (a cold start without a snapshot) are parsed in a process pool.
+    """
+    if workers <= 1 or len(items) < _PARALLEL_MIN_FILES:
+        return [read_entry(path, stamp, known_ids) for path, stamp in items]
+    # Spawned, not forked: the API process already runs threads.
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(workers, mp_context=context, initializer=_init_worker,
+                             initargs=(None if known_ids is None else frozenset(known_ids),)) as pool:
+        return list(pool.map(_read_entry_in_worker, items, chunksize=max(1, len(items) // (workers * 4))))
+
+
+def save_catalog(path: str, enriched_dir: str, papers: dict[str, CatalogEntry],
+                 files: dict[str, tuple[int, int]], sources: dict[str, str]) -> None:
+    """Write the catalog and the file stamps it was built from as one binary snapshot."""
+    snapshot = {
+        "format": _SNAPSHOT_FORMAT,
+        "enriched_dir": os.path.abspath(enriched_dir),
+        "entries": [tuple(getattr(e, field) for field in CatalogEntry.FIELDS) for e in papers.values()],
+        "files": files,
+        "sources": sources,
+    }
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"  # worker processes may save at the same time
+    with open(tmp, "wb") as f:
+        pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+
+
+def load_catalog(path: str, enriched_dir: str) -> Optional[tuple[dict[str, CatalogEntry],
+                                                                  dict[str, tuple[int, int]], dict[str, str]]]:
+    """Restore ``(papers, files, sources)`` from a snapshot, or ``None`` if it is unusable.
+
+    Files changed since the snapshot are still picked up: their stamps no longer match.
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "rb") as f:
+            snapshot = pickle.load(f)
+        if snapshot.get("format") != _SNAPSHOT_FORMAT or snapshot.get("enriched_dir") != os.path.abspath(enriched_dir):
+            logger.info(f"Catalog snapshot at {path} is for another layout; ignoring it")
+            return None
+        papers = {}
+        for values in snapshot["entries"]:
+            entry = CatalogEntry(*values)
+            papers[entry.paper_id] = entry
+        return papers, snapshot["files"], snapshot["sources"]
+    except Exception as e:
+        logger.warning(f"Failed to load catalog snapshot from {path}: {e}")
+        return None
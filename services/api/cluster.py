@@ -0,0 +1,112 @@
+import asyncio
+import heapq
+import logging
+import time
+from typing import Optional, Sequence
+
+import httpx
+
+from services.api.keyword_index import reciprocal_rank_fusion
+from services.api.metrics import SHARD_REQUEST_LATENCY, SHARD_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+
+def merge_top_k(partials: Sequence[list[dict]], top_k: int) -> list[dict]:
+    """The ``top_k`` best results across shard-local top-k lists, by descending score.
+
+    Each shard owns a disjoint set of papers, so its own top-k contains every one
+    of its papers that can make the global top-k. A paper reported twice, e.g.
+    while shards are being resized, keeps its better score.
+    """
+    best: dict[str, dict] = {}
+    for results in partials:
+        for result in results:
+            seen = best.get(result["paper_id"])
+            if seen is None or result["score"] > seen["score"]:
+                best[result["paper_id"]] = result
+    return heapq.nlargest(top_k, best.values(), key=lambda r: r["score"])
+
+
+def _with(params: list[tuple[str, str]], **overrides) -> list[tuple[str, str]]:
+    return [(k, v) for k, v in params if k not in overrides] + [(k, str(v)) for k, v in overrides.items()]
+
+
+class ScatterGather:
+    """Sends one search to every shard over pooled HTTP and merges the replies.
+
+    Each shard answers ``/papers/search`` over its own partition. A shard that
+    errors or does not reply within ``timeout`` seconds is left out, and the
+    caller gets the merge of the shards that did answer, along with the list of
+    failures. Slow shards therefore cost at most ``timeout``, not a failed query.
+
+    Shard-local RRF scores cannot be compared across shards. Hybrid search
+    therefore gathers the vector and keyword rankings separately, each
+    ``depth`` deep, and fuses them here.
+    """
+
+    def __init__(self, urls: list[str], timeout: float, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.urls = urls
+        self.timeout = timeout
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def search(self, params: list[tuple[str, str]], top_k: int, mode: str, depth: int,
+                     rrf_k: int) -> tuple[list[dict], list[dict]]:
+        """Merged results and ``{"shard", "url", "error"}`` for each shard that failed."""
+        if mode != "hybrid":
+            return await self._gather(_with(params, mode=mode, top_k=top_k), top_k)
+        (vector, vector_failed), (keyword, keyword_failed) = await asyncio.gather(
+            self._gather(_with(params, mode="vector", top_k=depth), depth),
+            self._gather(_with(params, mode="keyword", top_k=depth), depth),
+        )
+        by_id = {r["paper_id"]: r for r in keyword + vector}
+        fused = reciprocal_rank_fusion([[r["paper_id"] for r in vector], [r["paper_id"] for r in keyword]], k=rrf_k)
+        failed = {f["shard"]: f for f in keyword_failed + vector_failed}
+        results = [dict(by_id[pid], score=score) for pid, score in fused[:top_k]]
+        return results, [failed[shard] for shard in sorted(failed)]
+
+    async def _gather(self, params: list[tuple[str, str]], top_k: int) -> tuple[list[dict], list[dict]]:
+        replies = await asyncio.gather(*(self._query(shard, params) for shard in range(len(self.urls))))
+        partials, failed = [], []
+        for shard, (results, error) in enumerate(replies):
+            if error is None:
+                partials.append(results)
+            else:
+                failed.append({"shard": shard, "url": self.urls[shard], "error": error})
+        return merge_top_k(partials, top_k), failed
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _http(self) -> httpx.AsyncClient:
+        # Connections belong to the event loop that opened them; a server has one per worker.
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            limits = httpx.Limits(max_connections=64 * max(len(self.urls), 1), max_keepalive_connections=64)
+            self._client = httpx.AsyncClient(timeout=self.timeout, limits=limits, transport=self._transport)
+            self._loop = loop
+        return self._client
+
+    async def _query(self, shard: int, params: list[tuple[str, str]]) -> tuple[list[dict], Optional[str]]:
+        url = self.urls[shard]
+        start = time.perf_counter()
+        outcome, error, results = "ok", None, []
+        try:
+            response = await asyncio.wait_for(self._http().get(f"{url}/papers/search", params=params), self.timeout)
+            if response.status_code == 200:
+                results = response.json()["results"]
+            else:
+                outcome, error = "error", f"HTTP {response.status_code}"
+        except asyncio.TimeoutError:
+            outcome, error = "timeout", f"No reply within {self.timeout:g}s"
+        except (httpx.HTTPError, ValueError, KeyError) as e:
+            outcome, error = "error", f"{type(e).__name__}: {e}"
+        SHARD_REQUESTS.labels(str(shard), outcome).inc()
+        SHARD_REQUEST_LATENCY.labels(str(shard)).observe(time.perf_counter() - start)
+        if error is not None:
+            logger.warning(f"Shard {shard} ({url}) left out of search: {error}")
+        return results, error
@@ -9,7 +9,46 @@ class Config:
     PORT = int(os.getenv("API_PORT", "8000"))
     DATA_DIR = os.getenv("DATA_DIR", "data")
     ENRICHED_DIR = os.path.join(DATA_DIR, "enriched_papers")
+    EMBEDDINGS_DIR = os.getenv("EMBEDDINGS_DIR", os.path.join(DATA_DIR, "embeddings"))
+    SHARD_COUNT = int(os.getenv("API_SHARD_COUNT", "1"))  # >1 serves only papers hashed to SHARD_INDEX
+    SHARD_INDEX = int(os.getenv("API_SHARD_INDEX", "0"))
+    # Shards of one corpus share DATA_DIR; each keeps its own snapshot, index file and shared arrays.
+    _SHARD_SUFFIX = f"-shard{SHARD_INDEX}of{SHARD_COUNT}" if SHARD_COUNT > 1 else ""
+    SHARD_URLS = [u.strip().rstrip("/") for u in os.getenv("API_SHARD_URLS", "").split(",") if u.strip()]
+    SHARD_TIMEOUT = float(os.getenv("API_SHARD_TIMEOUT", "2"))  # seconds /cluster/search waits per shard
     EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+    LOCAL_INDEX = os.getenv("API_LOCAL_INDEX", "exact")  # "exact" or "ivf"
+    ANN_INDEX_PATH = os.getenv("API_ANN_INDEX_PATH", os.path.join(DATA_DIR, f"ann_index{_SHARD_SUFFIX}.npz"))
+    IVF_NLIST = int(os.getenv("API_IVF_NLIST", "0"))  # 0 = 4 * sqrt(n_papers)
+    IVF_NPROBE = int(os.getenv("API_IVF_NPROBE", "8"))
+    INDEX_QUANTIZATION = os.getenv("API_INDEX_QUANTIZATION", "none")  # "none", "int8" or "float16"
+    RESCORE_FACTOR = int(os.getenv("API_RESCORE_FACTOR", "4"))
+    RECALL_CHECK_QUERIES = int(os.getenv("API_RECALL_CHECK_QUERIES", "200"))  # 0 disables the startup check
+    SIMILAR_K = int(os.getenv("API_SIMILAR_K", "20"))  # neighbours kept per paper, built in the background; 0 disables
+    SEARCH_MODE = os.getenv("API_SEARCH_MODE", "hybrid")  # default mode: "hybrid", "vector" or "keyword"
+    HYBRID_DEPTH = int(os.getenv("API_HYBRID_DEPTH", "50"))  # candidates per ranking fused by RRF
+    RRF_K = int(os.getenv("API_RRF_K", "60"))
+    ENCODER_MAX_BATCH = int(os.getenv("API_ENCODER_MAX_BATCH", "64"))
+    ENCODER_MAX_WAIT_MS = float(os.getenv("API_ENCODER_MAX_WAIT_MS", "2"))
+    ENCODER_QUEUE_SIZE = int(os.getenv("API_ENCODER_QUEUE_SIZE", "1024"))  # pending requests before 503s
+    SEARCH_CONCURRENCY = int(os.getenv("API_SEARCH_CONCURRENCY", str(os.cpu_count() or 1)))  # 0 disables
+    SEARCH_QUEUE_SIZE = int(os.getenv("API_SEARCH_QUEUE_SIZE", "64"))  # waiting searches before 429s
+    SEARCH_QUEUE_TIMEOUT = float(os.getenv("API_SEARCH_QUEUE_TIMEOUT", "2"))  # seconds queued before a 503
+    # Set either to "" to disable it: the catalog snapshot, or the arrays shared between workers.
+    SNAPSHOT_PATH = os.getenv("API_SNAPSHOT_PATH", os.path.join(DATA_DIR, f"catalog{_SHARD_SUFFIX}.snapshot"))
+    SHARED_DIR = os.getenv("API_SHARED_DIR", os.path.join(DATA_DIR, f"shared{_SHARD_SUFFIX}"))
+    WORKERS = int(os.getenv("API_WORKERS", "1"))  # uvicorn worker processes
+    LOAD_WORKERS = int(os.getenv("API_LOAD_WORKERS", str(os.cpu_count() or 1)))
+    WATCH_INTERVAL = float(os.getenv("API_WATCH_INTERVAL", "30"))  # seconds; 0 disables
+    METRIC_EXEMPLARS = os.getenv("API_METRIC_EXEMPLARS", "") == "1"  # path params as exemplars (OpenMetrics)
+    ADMIN_TOKEN = os.getenv("API_ADMIN_TOKEN", "")  # empty disables /admin
+    RECORD_CACHE_SIZE = int(os.getenv("API_RECORD_CACHE_SIZE", "256"))
+    RECORD_CACHE_TTL = float(os.getenv("API_RECORD_CACHE_TTL", "3600"))
+    LISTING_PAGE_CACHE_SIZE = int(os.getenv("API_LISTING_PAGE_CACHE_SIZE", "1024"))
+    QUERY_CACHE_SIZE = int(os.getenv("API_QUERY_CACHE_SIZE", "10000"))
+    QUERY_CACHE_TTL = float(os.getenv("API_QUERY_CACHE_TTL", "3600"))
+    SEARCH_CACHE_SIZE = int(os.getenv("API_SEARCH_CACHE_SIZE", "4096"))  # 0 disables
+    SEARCH_CACHE_TTL = float(os.getenv("API_SEARCH_CACHE_TTL", "300"))  # bounds staleness against Azure-side indexing
 
     AZURE_SEARCH_ENDPOINT = os.getenv("AZURE_SEARCH_ENDPOINT", "")
     AZURE_SEARCH_API_KEY = os.getenv("AZURE_SEARCH_API_KEY", "")
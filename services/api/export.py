@@ -0,0 +1,79 @@
+import base64
+import json
+from typing import Callable, Iterable, Iterator, Optional
+
+import numpy as np
+
+from data_contracts.paper import EnrichedPaper
+from services.api.catalog import CatalogEntry
+
+EXPORT_FIELDS = ("paper_id", "title", "authors", "abstract", "topics", "categories", "published",
+                 "summary", "status", "clean_text")
+# clean_text means one file read per paper, so it is exported only on request.
+DEFAULT_EXPORT_FIELDS = tuple(f for f in EXPORT_FIELDS if f != "clean_text")
+
+# Lines are sent in chunks of about this size; each chunk is one trip through the thread pool.
+CHUNK_BYTES = 64 * 1024
+
+
+def parse_export_fields(fields: Optional[str]) -> tuple[str, ...]:
+    """Validate a comma-separated projection; ``paper_id`` is always included."""
+    if not fields:
+        return DEFAULT_EXPORT_FIELDS
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in requested if f not in EXPORT_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return tuple(f for f in EXPORT_FIELDS if f == "paper_id" or f in requested)
+
+
+def encode_vector(vector: np.ndarray) -> str:
+    """Base64 of the vector as little-endian float32."""
+    return base64.b64encode(np.asarray(vector, dtype="<f4").tobytes()).decode("ascii")
+
+
+def export_row(entry: CatalogEntry, fields: tuple[str, ...], record: Optional[EnrichedPaper] = None) -> dict:
+    row = {}
+    for field in fields:
+        if field == "clean_text":
+            row[field] = record.clean_text if record is not None else None
+        elif field == "summary":
+            row[field] = entry.summary.model_dump()
+        elif field == "status":
+            row[field] = entry.status.value
+        elif field in ("authors", "topics", "categories"):
+            row[field] = list(getattr(entry, field))
+        else:
+            row[field] = getattr(entry, field)
+    return row
+
+
+def ndjson_chunks(entries: Iterable[CatalogEntry], fields: tuple[str, ...],
+                  load: Optional[Callable[[CatalogEntry], Optional[EnrichedPaper]]] = None,
+                  vector_of: Optional[Callable[[CatalogEntry, Optional[EnrichedPaper]], Optional[np.ndarray]]] = None,
+                  chunk_bytes: Optional[int] = None) -> Iterator[bytes]:
+    """One JSON object per line, yielded in chunks of about ``chunk_bytes`` (default ``CHUNK_BYTES``).
+
+    Rows are built as the chunks are consumed, so memory holds one chunk and at
+    most one full record, whatever the corpus size. ``load`` reads a paper's full
+    record and is only called when ``clean_text`` is exported. ``vector_of``
+    gives a paper's embedding; when it is set, every line carries an
+    ``embedding`` key.
+    """
+    chunk_bytes = chunk_bytes or CHUNK_BYTES
+    buffer: list[bytes] = []
+    size = 0
+    for entry in entries:
+        record = load(entry) if load is not None and "clean_text" in fields else None
+        row = export_row(entry, fields, record)
+        if vector_of is not None:
+            vector = vector_of(entry, record)
+            row["embedding"] = encode_vector(vector) if vector is not None else None
+        line = json.dumps(row, separators=(",", ":")).encode("utf-8") + b"\n"
+        buffer.append(line)
+        size += len(line)
+        if size >= chunk_bytes:
+            yield b"".join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield b"".join(buffer)
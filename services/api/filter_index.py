@@ -0,0 +1,136 @@
+from datetime import date
+from typing import Iterable, Optional
+
+import numpy as np
+
+from data_contracts.paper import SearchFilters
+from services.api.catalog import CatalogEntry
+
+FILTER_FIELDS = ("topics", "authors", "categories")
+
+
+def _key(value: str) -> str:
+    return " ".join(value.split()).lower()
+
+
+def _day(published: Optional[str]) -> Optional[int]:
+    """Days since the epoch for an ISO date or timestamp, or ``None`` if unparseable."""
+    if not published:
+        return None
+    try:
+        return int(np.datetime64(published[:10], "D").astype(np.int64))
+    except ValueError:
+        return None
+
+
+def is_empty(filters: Optional[SearchFilters]) -> bool:
+    return filters is None or filters == SearchFilters()
+
+
+class FilterIndex:
+    """Posting sets over the filterable catalog fields plus a sorted date column.
+
+    ``postings[field][value]`` is the frozenset of paper_ids carrying ``value``
+    (compared case-insensitively). ``days``/``day_ids`` hold every dated paper
+    sorted by publication day, so a date range is two binary searches and a slice.
+    Evaluating a filter touches only the posting sets it names, so narrow filters
+    are cheap regardless of catalog size.
+    """
+
+    def __init__(self, postings: dict[str, dict[str, frozenset[str]]], day_of: dict[str, int],
+                 sorted_days: Optional[tuple[np.ndarray, np.ndarray]] = None):
+        self.postings = postings
+        self.day_of = day_of
+        if sorted_days is None:
+            order = sorted(day_of, key=day_of.__getitem__)
+            sorted_days = (
+                np.fromiter((day_of[pid] for pid in order), dtype=np.int64, count=len(order)),
+                np.array(order, dtype=object),
+            )
+        self.days, self.day_ids = sorted_days
+
+    @classmethod
+    def build(cls, entries: Iterable[CatalogEntry]) -> "FilterIndex":
+        papers = {e.paper_id: e for e in entries}
+        return cls({field: {} for field in FILTER_FIELDS}, {}).updated({}, papers, set(papers))
+
+    def updated(self, previous: dict[str, CatalogEntry], papers: dict[str, CatalogEntry],
+                touched: set[str]) -> "FilterIndex":
+        """A new index after the ``touched`` ids changed from ``previous`` to ``papers``.
+
+        Only posting sets for values the touched papers had or now have are copied;
+        the receiver is left untouched for concurrent readers.
+        """
+        postings = {field: dict(values) for field, values in self.postings.items()}
+        added: dict[tuple[str, str], set[str]] = {}
+        dropped: dict[tuple[str, str], set[str]] = {}
+        day_of = dict(self.day_of)
+        for pid in touched:
+            old, new = previous.get(pid), papers.get(pid)
+            for field in FILTER_FIELDS:
+                old_values = {_key(v) for v in getattr(old, field, ())}
+                new_values = {_key(v) for v in getattr(new, field, ())}
+                for value in old_values - new_values:
+                    dropped.setdefault((field, value), set()).add(pid)
+                for value in new_values - old_values:
+                    added.setdefault((field, value), set()).add(pid)
+            day = _day(new.published) if new is not None else None
+            if day is None:
+                day_of.pop(pid, None)
+            else:
+                day_of[pid] = day
+
+        for field, value in set(added) | set(dropped):
+            ids = (postings[field].get(value, frozenset()) - dropped.get((field, value), set())) \
+                | added.get((field, value), set())
+            if ids:
+                postings[field][value] = frozenset(ids)
+            else:
+                postings[field].pop(value, None)
+
+        if day_of == self.day_of:
+            return FilterIndex(postings, self.day_of, (self.days, self.day_ids))
+        return FilterIndex(postings, day_of)
+
+    def matching(self, filters: SearchFilters) -> frozenset[str]:
+        """paper_ids matching every field of ``filters`` (any listed value within a field)."""
+        sets: list[frozenset[str]] = []
+        for field in FILTER_FIELDS:
+            values = getattr(filters, field)
+            if values:
+                by_value = self.postings[field]
+                sets.append(frozenset().union(*(by_value.get(_key(v), frozenset()) for v in values)))
+
+        if filters.published_from is not None or filters.published_to is not None:
+            sets.append(self._published_between(filters.published_from, filters.published_to))
+
+        sets.sort(key=len)
+        result = sets[0]
+        for other in sets[1:]:
+            if not result:
+                break
+            result = result & other
+        return result
+
+    def _published_between(self, start: Optional[date], end: Optional[date]) -> frozenset[str]:
+        lo = 0 if start is None else np.searchsorted(self.days, _day(start.isoformat()), side="left")
+        hi = len(self.days) if end is None else np.searchsorted(self.days, _day(end.isoformat()), side="right")
+        return frozenset(self.day_ids[lo:hi])
+
+
+def _quote(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def to_odata(filters: SearchFilters) -> Optional[str]:
+    """The same filter as an Azure AI Search OData expression."""
+    clauses = []
+    for field in FILTER_FIELDS:
+        values = getattr(filters, field)
+        if values:
+            clauses.append(f"{field}/any(v: " + " or ".join(f"v eq {_quote(v)}" for v in values) + ")")
+    if filters.published_from is not None:
+        clauses.append(f"published ge {filters.published_from.isoformat()}T00:00:00Z")
+    if filters.published_to is not None:
+        clauses.append(f"published le {filters.published_to.isoformat()}T23:59:59Z")
+    return " and ".join(clauses) or None
@@ -0,0 +1,114 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Optional
+
+import numpy as np
+
+from services.api.metrics import ENCODE_BATCH_SIZE
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class EncoderOverloaded(RuntimeError):
+    """The encode queue is full; the caller should shed the request."""
+
+
+class BatchingEncoder:
+    """Single inference thread that encodes concurrent requests as one batch.
+
+    ``submit`` queues texts and returns a future of their L2-normalized,
+    read-only float32 vectors. The worker takes the first waiting request,
+    keeps collecting for up to ``max_wait`` seconds or until ``max_batch``
+    texts are queued, and runs the model once for all of them. One thread owns
+    the model, so request threads never compete for cores inside ``encode``.
+    """
+
+    def __init__(self, load_model: Callable[[], Any], max_batch: int = 64,
+                 max_wait: float = 0.002, queue_size: int = 1024):
+        self._load_model = load_model
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max(0.0, max_wait)
+        self._queue: queue.Queue = queue.Queue(maxsize=max(1, queue_size))
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    def submit(self, texts: list[str]) -> Future:
+        """Queue ``texts`` for encoding; raises ``EncoderOverloaded`` if the queue is full."""
+        self._ensure_started()
+        future: Future = Future()
+        try:
+            self._queue.put_nowait((texts, future))
+        except queue.Full:
+            raise EncoderOverloaded("Query encoder queue is full") from None
+        return future
+
+    def encode(self, texts: list[str]) -> list[np.ndarray]:
+        return self.submit(texts).result()
+
+    def close(self) -> None:
+        with self._start_lock:
+            if self._thread is None:
+                return
+            self._queue.put(_STOP)
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="query-encoder", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            batch = [item]
+            size = len(item[0])
+            deadline = time.monotonic() + self.max_wait
+            stop = False
+            while size < self.max_batch:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+                size += len(item[0])
+            self._encode_batch(batch)
+            if stop:
+                return
+
+    def _encode_batch(self, batch: list[tuple[list[str], Future]]) -> None:
+        batch = [(texts, future) for texts, future in batch if future.set_running_or_notify_cancel()]
+        texts = [text for request, _ in batch for text in request]
+        if not texts:
+            for _, future in batch:
+                future.set_result([])
+            return
+        ENCODE_BATCH_SIZE.observe(len(texts))
+        try:
+            vectors = np.asarray(self._load_model().encode(texts, batch_size=len(texts)), dtype=np.float32)
+            vectors = vectors.reshape(len(texts), -1)
+            vectors = vectors / (np.linalg.norm(vectors, axis=1, keepdims=True) + 1e-8)
+            vectors.flags.writeable = False
+        except Exception as e:
+            logger.error(f"Query encoding failed for a batch of {len(texts)}: {e}")
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        start = 0
+        for request, future in batch:
+            future.set_result(list(vectors[start:start + len(request)]))
+            start += len(request)
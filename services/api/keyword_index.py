@@ -0,0 +1,169 @@
+import math
+import re
+from typing import AbstractSet, Iterable, Optional
+
+import numpy as np
+
+from services.api.catalog import CatalogEntry
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in into is it its of on or that the their "
+    "this to was were which with we our these those using use used via".split()
+)
+
+# Rebuild everything once the delta segment grows past this share of the base.
+_MAX_DELTA_RATIO = 0.1
+
+
+def tokenize(text: str) -> list[str]:
+    return [t for t in _TOKEN.findall(text.lower()) if len(t) > 1 and t not in _STOPWORDS]
+
+
+def document_text(entry: CatalogEntry) -> str:
+    """Fields indexed for keyword search: title, abstract, topics and the AI summary."""
+    s = entry.summary
+    parts = [entry.title, entry.abstract or "", " ".join(entry.topics),
+             s.research_question, s.methodology, " ".join(s.key_findings), s.contributions, s.limitations]
+    return " ".join(parts)
+
+
+class _Segment:
+    """Immutable inverted index over a fixed set of documents (CSR posting lists)."""
+
+    def __init__(self, entries: list[CatalogEntry]):
+        self.doc_ids = [e.paper_id for e in entries]
+        self.row_of = {pid: i for i, pid in enumerate(self.doc_ids)}
+
+        vocab: dict[str, int] = {}
+        terms: list[int] = []
+        docs: list[int] = []
+        tfs: list[int] = []
+        lengths = np.zeros(len(entries), dtype=np.float32)
+        for doc, entry in enumerate(entries):
+            tokens = tokenize(document_text(entry))
+            lengths[doc] = len(tokens)
+            counts: dict[int, int] = {}
+            for token in tokens:
+                term = vocab.setdefault(token, len(vocab))
+                counts[term] = counts.get(term, 0) + 1
+            terms.extend(counts)
+            docs.extend([doc] * len(counts))
+            tfs.extend(counts.values())
+
+        order = np.argsort(np.asarray(terms, dtype=np.int32), kind="stable")
+        self.vocab = vocab
+        self.postings_docs = np.asarray(docs, dtype=np.int32)[order]
+        self.postings_tfs = np.asarray(tfs, dtype=np.float32)[order]
+        self.offsets = np.zeros(len(vocab) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(np.asarray(terms, dtype=np.int64), minlength=len(vocab)), out=self.offsets[1:])
+        self.lengths = lengths
+
+    def __len__(self) -> int:
+        return len(self.doc_ids)
+
+    def postings(self, token: str) -> tuple[np.ndarray, np.ndarray]:
+        term = self.vocab.get(token)
+        if term is None:
+            return self.postings_docs[:0], self.postings_tfs[:0]
+        lo, hi = self.offsets[term], self.offsets[term + 1]
+        return self.postings_docs[lo:hi], self.postings_tfs[lo:hi]
+
+
+class KeywordIndex:
+    """BM25 over the catalog, split into a large base segment and a small delta.
+
+    Papers added or changed after the base was built go into the delta, which is
+    rebuilt on every update; their base documents are masked out. Document
+    frequencies still count masked base documents, a small skew that disappears
+    at the next full rebuild.
+    """
+
+    def __init__(self, base: _Segment, base_alive: np.ndarray,
+                 delta: Optional[_Segment] = None, k1: float = 1.2, b: float = 0.75):
+        self.base = base
+        self.base_alive = base_alive
+        self.delta = delta if delta is not None else _Segment([])
+        self.k1 = k1
+        self.b = b
+
+        self.n_docs = int(base_alive.sum()) + len(self.delta)
+        total_length = float(base.lengths[base_alive].sum() + self.delta.lengths.sum())
+        self.avg_length = total_length / self.n_docs if self.n_docs else 0.0
+
+    @classmethod
+    def build(cls, entries: Iterable[CatalogEntry]) -> "KeywordIndex":
+        base = _Segment(list(entries))
+        return cls(base, np.ones(len(base), dtype=bool))
+
+    def updated(self, papers: dict[str, CatalogEntry], touched: set[str]) -> "KeywordIndex":
+        """A new index reflecting ``papers`` after the ``touched`` ids changed."""
+        delta_ids = {pid for pid in self.delta.doc_ids if pid not in touched}
+        delta_ids.update(pid for pid in touched if pid in papers)
+        if len(delta_ids) > max(1000, _MAX_DELTA_RATIO * len(self.base)):
+            return KeywordIndex.build(papers.values())
+
+        base_alive = self.base_alive.copy()
+        for pid in touched:
+            row = self.base.row_of.get(pid)
+            if row is not None:
+                base_alive[row] = False
+        delta = _Segment([papers[pid] for pid in sorted(delta_ids)])
+        return KeywordIndex(self.base, base_alive, delta, self.k1, self.b)
+
+    def search(self, query: str, top_k: int,
+               allowed: Optional[AbstractSet[str]] = None) -> list[tuple[str, float]]:
+        """Top ``top_k`` ``(paper_id, bm25_score)`` pairs, best first.
+
+        ``allowed`` restricts results to those paper_ids (e.g. a filter's matches).
+        """
+        tokens = tokenize(query)
+        if not tokens or not self.n_docs or (allowed is not None and not allowed):
+            return []
+
+        hits: list[tuple[str, float]] = []
+        for segment, alive in ((self.base, self.base_alive), (self.delta, None)):
+            if not len(segment):
+                continue
+            scores = self._score(segment, tokens)
+            if alive is not None:
+                scores[~alive] = 0.0
+            if allowed is not None:
+                keep = np.zeros(len(segment), dtype=bool)
+                keep[[segment.row_of[pid] for pid in allowed if pid in segment.row_of]] = True
+                scores[~keep] = 0.0
+            k = min(top_k, int(np.count_nonzero(scores)))
+            if k == 0:
+                continue
+            best = np.argpartition(-scores, k - 1)[:k]
+            hits.extend((segment.doc_ids[i], float(scores[i])) for i in best)
+
+        hits.sort(key=lambda h: -h[1])
+        return hits[:top_k]
+
+    def _score(self, segment: _Segment, tokens: list[str]) -> np.ndarray:
+        scores = np.zeros(len(segment), dtype=np.float32)
+        norm = self.k1 * (1 - self.b + self.b * segment.lengths / max(self.avg_length, 1e-9))
+        for token in set(tokens):
+            df = len(self.base.postings(token)[0]) + len(self.delta.postings(token)[0])
+            if df == 0:
+                continue
+            idf = math.log(1 + (self.n_docs - df + 0.5) / (df + 0.5))
+            docs, tfs = segment.postings(token)
+            scores[docs] += idf * tfs * (self.k1 + 1) / (tfs + norm[docs])
+        return scores
+
+
+def reciprocal_rank_fusion(rankings: list[list[str]], k: int = 60) -> list[tuple[str, float]]:
+    """Fuse ranked id lists: each id scores ``sum(1 / (k + rank))`` over the lists it appears in.
+
+    Scores are divided by the best possible sum, so they fall in ``(0, 1]`` and
+    1 means first in every list. They rank results; unlike vector scores they
+    are not similarities.
+    """
+    best = len(rankings) / (k + 1)
+    fused: dict[str, float] = {}
+    for ranking in rankings:
+        for rank, pid in enumerate(ranking, start=1):
+            fused[pid] = fused.get(pid, 0.0) + 1.0 / (k + rank) / best
+    return sorted(fused.items(), key=lambda item: -item[1])
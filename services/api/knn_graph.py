@@ -0,0 +1,128 @@
+import logging
+import time
+from typing import Optional
+
+import numpy as np
+
+from services.api.vector_index import VectorIndex
+
+logger = logging.getLogger(__name__)
+
+# Rows whose neighbours are computed per index search while building the graph.
+_BUILD_BLOCK = 1024
+# Rebuild from scratch when an update appends more than this share of the rows.
+_MAX_APPEND_RATIO = 0.1
+
+
+class KnnGraph:
+    """The ``k`` nearest live neighbours of every index row, best first.
+
+    ``neighbors[row]`` holds row numbers (``-1`` for empty slots) and
+    ``scores[row]`` their cosine similarities. Neighbours that die later (deleted
+    or superseded papers) stay in the lists; ``lookup`` skips them, so deletes
+    cost nothing and only appends touch the graph.
+    """
+
+    def __init__(self, neighbors: np.ndarray, scores: np.ndarray):
+        self.neighbors = neighbors
+        self.scores = scores
+
+    @property
+    def k(self) -> int:
+        return self.neighbors.shape[1]
+
+    @classmethod
+    def build(cls, index: VectorIndex, k: int) -> "KnnGraph":
+        """Search the index with every live row, one block of rows per search."""
+        start = time.perf_counter()
+        n = index.matrix.shape[0]
+        graph = cls(np.full((n, k), -1, dtype=np.int32), np.full((n, k), -np.inf, dtype=np.float32))
+        live = np.arange(n) if index.alive is None else np.flatnonzero(index.alive)
+        graph._fill(index, live)
+        logger.info(f"Built {k}-NN graph over {len(live)} rows in {time.perf_counter() - start:.2f}s")
+        return graph
+
+    def updated(self, index: VectorIndex) -> Optional["KnnGraph"]:
+        """A graph for ``index`` after rows were appended to it; the receiver is untouched.
+
+        New rows get their own lists from the index. Each old row found in a new
+        row's list is offered the new row in return (similarity is symmetric),
+        which keeps existing lists current without rescanning them. Returns
+        ``None`` when so many rows were appended that the caller should build a
+        fresh graph instead.
+        """
+        n_old, n = self.neighbors.shape[0], index.matrix.shape[0]
+        if n == n_old:
+            return self
+        if n - n_old > max(_BUILD_BLOCK, _MAX_APPEND_RATIO * n_old):
+            return None
+
+        graph = KnnGraph(
+            np.concatenate([self.neighbors, np.full((n - n_old, self.k), -1, dtype=np.int32)]),
+            np.concatenate([self.scores, np.full((n - n_old, self.k), -np.inf, dtype=np.float32)]),
+        )
+        graph._add(index, np.arange(n_old, n))
+        return graph
+
+    def remapped(self, index: VectorIndex, old_rows: np.ndarray) -> Optional["KnnGraph"]:
+        """The graph for ``index``, whose row ``i`` holds the receiver's row ``old_rows[i]``.
+
+        Lists are carried over with their rows renumbered; rows that no longer
+        exist drop out of them. Rows marked ``-1`` are new and get lists as in
+        ``updated``, which also decides when a fresh build is due (``None``).
+        """
+        n, k = len(old_rows), self.k
+        fresh = np.flatnonzero(old_rows < 0)
+        if len(fresh) > max(_BUILD_BLOCK, _MAX_APPEND_RATIO * (n - len(fresh))):
+            return None
+        old_to_new = np.full(self.neighbors.shape[0], -1, dtype=np.int32)
+        mapped = np.flatnonzero(old_rows >= 0)
+        old_to_new[old_rows[mapped]] = mapped
+
+        graph = KnnGraph(np.full((n, k), -1, dtype=np.int32), np.full((n, k), -np.inf, dtype=np.float32))
+        neighbors = self.neighbors[old_rows[mapped]]
+        moved = np.where(neighbors >= 0, old_to_new[np.maximum(neighbors, 0)], -1)
+        scores = np.where(moved >= 0, self.scores[old_rows[mapped]], -np.inf).astype(np.float32)
+        # Dropped neighbours leave gaps; close them so each list stays best first.
+        order = np.argsort(-scores, axis=1, kind="stable")
+        graph.neighbors[mapped] = np.take_along_axis(moved, order, axis=1)
+        graph.scores[mapped] = np.take_along_axis(scores, order, axis=1)
+        graph._add(index, fresh)
+        return graph
+
+    def _add(self, index: VectorIndex, rows: np.ndarray) -> None:
+        """Fill the lists of ``rows`` and offer each row to the lists of its neighbours."""
+        if index.alive is not None:
+            rows = rows[index.alive[rows]]
+        self._fill(index, rows)
+        added = np.zeros(self.neighbors.shape[0], dtype=bool)
+        added[rows] = True
+        for row in rows:
+            for other, score in zip(self.neighbors[row], self.scores[row]):
+                if other < 0 or added[other] or score <= self.scores[other, -1] or row in self.neighbors[other]:
+                    continue
+                pos = int(np.searchsorted(-self.scores[other], -score, side="right"))
+                self.neighbors[other, pos + 1:] = self.neighbors[other, pos:-1].copy()
+                self.scores[other, pos + 1:] = self.scores[other, pos:-1].copy()
+                self.neighbors[other, pos] = row
+                self.scores[other, pos] = score
+
+    def _fill(self, index: VectorIndex, rows: np.ndarray) -> None:
+        for lo in range(0, len(rows), _BUILD_BLOCK):
+            block = rows[lo:lo + _BUILD_BLOCK]
+            scores, found = index.search(np.asarray(index.matrix[block]), self.k + 1)
+            # Drop each row itself (and empty slots); the rest stay best first.
+            keep = (found >= 0) & (found != block[:, None])
+            order = np.argsort(~keep, axis=1, kind="stable")[:, :self.k]
+            kept = np.take_along_axis(keep, order, axis=1)
+            width = order.shape[1]
+            self.neighbors[block, :width] = np.where(kept, np.take_along_axis(found, order, axis=1), -1)
+            self.scores[block, :width] = np.where(kept, np.take_along_axis(scores, order, axis=1), -np.inf)
+
+    def lookup(self, row: int, alive: Optional[np.ndarray]) -> tuple[np.ndarray, np.ndarray]:
+        """Live neighbours of ``row`` and their scores, best first."""
+        rows, scores = self.neighbors[row], self.scores[row]
+        keep = rows >= 0
+        if alive is not None:
+            keep &= alive[np.maximum(rows, 0)]
+        return rows[keep], scores[keep]
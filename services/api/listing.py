@@ -0,0 +1,83 @@
+import base64
+import binascii
+import hashlib
+import json
+from bisect import bisect_right
+from typing import Optional
+
+from services.api.catalog import CatalogEntry
+
+LISTING_FIELDS = ("paper_id", "title", "authors", "topics", "status")
+
+
+class Listing:
+    """Listing rows for one store version, sorted by paper_id so cursors stay stable."""
+
+    def __init__(self, entries: list[CatalogEntry]):
+        entries = sorted(entries, key=lambda e: e.paper_id)
+        self.ids = [e.paper_id for e in entries]
+        self.rows = [
+            {
+                "paper_id": e.paper_id,
+                "title": e.title,
+                "authors": list(e.authors),
+                "topics": list(e.topics),
+                "status": e.status.value,
+            }
+            for e in entries
+        ]
+
+
+class Page:
+    def __init__(self, body: bytes, etag: str, next_cursor: Optional[str]):
+        self.body = body
+        self.etag = etag
+        self.next_cursor = next_cursor
+
+
+def encode_cursor(paper_id: str) -> str:
+    return base64.urlsafe_b64encode(paper_id.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> str:
+    """Raises ``ValueError`` for cursors this API did not issue."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return base64.b64decode(padded, altchars=b"-_", validate=True).decode("utf-8")
+    except (binascii.Error, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def parse_fields(fields: Optional[str]) -> tuple[str, ...]:
+    """Validate a comma-separated projection; ``paper_id`` is always included."""
+    if not fields:
+        return LISTING_FIELDS
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in requested if f not in LISTING_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return tuple(f for f in LISTING_FIELDS if f == "paper_id" or f in requested)
+
+
+def render_page(listing: Listing, cursor: Optional[str], limit: Optional[int],
+                fields: tuple[str, ...]) -> Page:
+    """Serialize one page of the listing; the ETag is a hash of the exact bytes sent."""
+    start = bisect_right(listing.ids, decode_cursor(cursor)) if cursor else 0
+    end = len(listing.rows) if limit is None else min(start + limit, len(listing.rows))
+
+    rows = listing.rows[start:end]
+    if fields != LISTING_FIELDS:
+        rows = [{f: row[f] for f in fields} for row in rows]
+    body = json.dumps(rows, separators=(",", ":")).encode("utf-8")
+
+    next_cursor = encode_cursor(listing.ids[end - 1]) if end < len(listing.rows) and end > start else None
+    etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+    return Page(body, etag, next_cursor)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return etag in (tag.strip() for tag in if_none_match.split(","))
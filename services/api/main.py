@@ -1,7 +1,10 @@
+import logging
 import os
 import sys
+import threading
 import time
 from contextlib import asynccontextmanager
+from typing import Optional
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
 
@@ -12,15 +15,34 @@ from prometheus_client import make_asgi_app
 
 from services.api.config import Config
 from services.api.metrics import REQUEST_LATENCY, REQUEST_COUNT, APP_INFO
+from services.api.timing import server_timing, start_request
+from services.api.routes.admin import router as admin_router
+from services.api.routes.cluster import coordinator, router as cluster_router
 from services.api.routes.health import router as health_router
 from services.api.routes.papers import router as papers_router, store
 
+logger = logging.getLogger(__name__)
+
+
+def _start_store() -> None:
+    """Load papers and warm the model off the event loop; /ready reports when done."""
+    try:
+        store.load_papers()
+        if Config.WATCH_INTERVAL > 0:
+            store.start_watching(Config.WATCH_INTERVAL)
+        store.warm_up()
+    except Exception as e:
+        logger.error(f"Paper store failed to start: {e}")
+
 
 @asynccontextmanager
 async def lifespan(_app: FastAPI):
     APP_INFO.info({"version": "0.1.0", "environment": os.getenv("ENVIRONMENT", "dev")})
-    store.load_papers()
+    threading.Thread(target=_start_store, name="paper-store-startup", daemon=True).start()
     yield
+    await store.aclose()
+    await coordinator.aclose()
+    store.close()
 
 
 app = FastAPI(
@@ -39,21 +61,52 @@ app.add_middleware(
 )
 
 
+UNMATCHED_ENDPOINT = "<unmatched>"
+_METHODS = frozenset({"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"})
+# OpenMetrics caps an exemplar's label names and values at 128 characters in total.
+_EXEMPLAR_CHARS = 128
+
+
+def _endpoint_label(request: Request) -> str:
+    """The matched route template (``/papers/{paper_id}``), so label values stay
+    bounded by the number of routes rather than the number of papers."""
+    route = request.scope.get("route")
+    return getattr(route, "path", None) or UNMATCHED_ENDPOINT
+
+
+def _exemplar(request: Request) -> Optional[dict[str, str]]:
+    """The concrete path parameters, attached to the observation as an exemplar."""
+    params = request.scope.get("path_params")
+    if not Config.METRIC_EXEMPLARS or not params:
+        return None
+    exemplar, budget = {}, _EXEMPLAR_CHARS
+    for name, value in params.items():
+        value = str(value)[:max(budget - len(name), 0)]
+        budget -= len(name) + len(value)
+        if budget < 0 or not value:
+            break
+        exemplar[name] = value
+    return exemplar or None
+
+
 @app.middleware("http")
 async def metrics_middleware(request: Request, call_next) -> Response:
     start = time.perf_counter()
+    phases = start_request()
     response = await call_next(request)
     elapsed = time.perf_counter() - start
+    if phases:
+        response.headers["Server-Timing"] = server_timing(phases, elapsed)
 
-    path = request.url.path
-    if not path.startswith("/metrics"):
+    if not request.url.path.startswith("/metrics"):
         labels = {
-            "method": request.method,
-            "endpoint": path,
+            "method": request.method if request.method in _METHODS else "OTHER",
+            "endpoint": _endpoint_label(request),
             "status": str(response.status_code),
         }
-        REQUEST_LATENCY.labels(**labels).observe(elapsed)
-        REQUEST_COUNT.labels(**labels).inc()
+        exemplar = _exemplar(request)
+        REQUEST_LATENCY.labels(**labels).observe(elapsed, exemplar=exemplar)
+        REQUEST_COUNT.labels(**labels).inc(exemplar=exemplar)
 
     return response
 
@@ -63,6 +116,12 @@ app.mount("/metrics", metrics_app)
 
 app.include_router(health_router)
 app.include_router(papers_router)
+app.include_router(admin_router)
+app.include_router(cluster_router)
 
 if __name__ == "__main__":
-    uvicorn.run("services.api.main:app", host=Config.HOST, port=Config.PORT, reload=True)
+    if Config.WORKERS > 1:
+        # Each worker loads the store; all but the first attach to what it publishes.
+        uvicorn.run("services.api.main:app", host=Config.HOST, port=Config.PORT, workers=Config.WORKERS)
+    else:
+        uvicorn.run("services.api.main:app", host=Config.HOST, port=Config.PORT, reload=True)
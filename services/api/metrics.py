@@ -2,7 +2,7 @@ from prometheus_client import Counter, Histogram, Gauge, Info
 
 REQUEST_LATENCY = Histogram(
     "api_request_duration_seconds",
-    "Request latency in seconds",
+    "Request latency in seconds, labelled by route template",
     labelnames=["method", "endpoint", "status"],
     buckets=[0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0],
 )
@@ -23,17 +23,105 @@ SEARCH_QUERIES = Counter(
     "Total number of search queries executed",
 )
 
+QUERY_EMBEDDING_CACHE_HITS = Counter(
+    "api_query_embedding_cache_hits_total",
+    "Query embeddings served from cache or from an in-flight encode",
+)
+
+QUERY_EMBEDDING_CACHE_MISSES = Counter(
+    "api_query_embedding_cache_misses_total",
+    "Query embeddings that required a model encode",
+)
+
 SEARCH_LATENCY = Histogram(
     "api_search_duration_seconds",
     "Search query latency in seconds",
     buckets=[0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0],
 )
 
+SEARCH_PHASE_LATENCY = Histogram(
+    "api_search_phase_duration_seconds",
+    "Time spent in each search phase (encode, filter, vector, keyword, fuse, azure, results)",
+    labelnames=["phase"],
+    buckets=[0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5],
+)
+
+SEARCH_CACHE_HITS = Counter(
+    "api_search_cache_hits_total",
+    "Searches answered from the result cache or from an identical in-flight search",
+)
+
+SEARCH_CACHE_MISSES = Counter(
+    "api_search_cache_misses_total",
+    "Searches that ran against the index",
+)
+
+BATCH_SEARCH_LATENCY = Histogram(
+    "api_batch_search_duration_seconds",
+    "Batch search request latency in seconds",
+    buckets=[0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0],
+)
+
+ADMISSION_IN_FLIGHT = Gauge(
+    "api_admission_in_flight",
+    "Requests holding an admission slot",
+    labelnames=["pool"],
+)
+
+ADMISSION_QUEUE_DEPTH = Gauge(
+    "api_admission_queue_depth",
+    "Requests waiting for an admission slot",
+    labelnames=["pool"],
+)
+
+ADMISSION_REJECTED = Counter(
+    "api_admission_rejected_total",
+    "Requests shed by admission control (queue_full -> 429, timeout -> 503)",
+    labelnames=["pool", "reason"],
+)
+
+ADMISSION_WAIT = Histogram(
+    "api_admission_wait_seconds",
+    "Time spent queued for an admission slot",
+    labelnames=["pool"],
+    buckets=[0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0],
+)
+
+SHARD_REQUESTS = Counter(
+    "api_shard_requests_total",
+    "Scatter-gather requests to each shard, by outcome (ok, timeout, error)",
+    labelnames=["shard", "outcome"],
+)
+
+SHARD_REQUEST_LATENCY = Histogram(
+    "api_shard_request_duration_seconds",
+    "Latency of scatter-gather requests to each shard",
+    labelnames=["shard"],
+    buckets=[0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0],
+)
+
+ENCODE_BATCH_SIZE = Histogram(
+    "api_query_encode_batch_size",
+    "Query texts encoded per model call by the batching encoder",
+    buckets=[1, 2, 4, 8, 16, 32, 64, 128, 256],
+)
+
 INDEX_SIZE = Gauge(
     "api_index_dimensions",
     "Embedding dimensions in the search index",
 )
 
+INDEX_MEMORY_BYTES = Gauge(
+    "api_index_memory_bytes",
+    "Resident bytes of the first-pass search representation",
+)
+
+INDEX_RECALL = Gauge(
+    "api_index_estimated_recall",
+    "Estimated recall@10 of the local index against exact float32 search",
+    labelnames=["stage"],
+)
+
 APP_INFO = Info(
     "api",
     "Paper Analyzer API info",
@@ -1,18 +1,64 @@
-import json
+import asyncio
 import logging
 import os
+import threading
 import time
+from concurrent.futures import Future
+from contextlib import nullcontext
 from functools import lru_cache
-from typing import Optional
+from typing import Iterator, Optional
 
 import numpy as np
 
-from data_contracts.paper import EnrichedPaper, PaperSearchResult, PaperSummary
+from data_contracts.paper import EnrichedPaper, PaperSearchResult, PaperSummary, SearchFilters
+from services.api.cache import TTLCache
+from services.api.catalog import (
+    CatalogEntry,
+    SharedText,
+    load_catalog,
+    load_record,
+    pack_text,
+    read_entries,
+    save_catalog,
+)
+from services.api.export import ndjson_chunks
+from services.api.inference import BatchingEncoder
+from services.api.filter_index import FilterIndex, is_empty, to_odata
+from services.api.knn_graph import KnnGraph
+from services.api.keyword_index import KeywordIndex, reciprocal_rank_fusion
+from services.api.listing import Listing, Page, render_page
+from services.api.payloads import Payload, detail_payload, summary_payload
 from services.api.config import Config
-from services.api.metrics import PAPERS_LOADED, SEARCH_QUERIES, SEARCH_LATENCY, INDEX_SIZE
+from services.api.timing import phase
+from services.api.sharding import owns
+from services.api.shared_arrays import attach, content_key, loader_lock, pack_blobs, publish, unpack_blobs
+from services.api.vector_index import RowBuffer, VectorIndex, build_index, fingerprint, index_from_arrays
+from services.api.metrics import (
+    PAPERS_LOADED,
+    SEARCH_QUERIES,
+    QUERY_EMBEDDING_CACHE_HITS,
+    QUERY_EMBEDDING_CACHE_MISSES,
+    SEARCH_LATENCY,
+    SEARCH_CACHE_HITS,
+    SEARCH_CACHE_MISSES,
+    BATCH_SEARCH_LATENCY,
+    INDEX_SIZE,
+    INDEX_MEMORY_BYTES,
+    INDEX_RECALL,
+)
+from shared.embedding_store import EmbeddingStore
 
 logger = logging.getLogger(__name__)
 
+SEARCH_MODES = ("hybrid", "vector", "keyword")
+
+
+def _search_mode(mode: Optional[str]) -> str:
+    mode = mode or Config.SEARCH_MODE
+    if mode not in SEARCH_MODES:
+        raise ValueError(f"Unknown search mode: {mode}")
+    return mode
+
 
 @lru_cache(maxsize=1)
 def _load_embedding_model():
@@ -20,6 +66,11 @@ def _load_embedding_model():
     return SentenceTransformer(Config.EMBEDDING_MODEL)
 
 
+def _query_key(query: str) -> str:
+    # all-MiniLM-L6-v2 lower-cases its input, so case and whitespace never change the vector.
+    return " ".join(query.split()).lower()
+
+
 def _get_search_client():
     if Config.USE_AZURE_SEARCH:
         from shared.search_client import SearchClient
@@ -30,127 +81,1000 @@ def _get_search_client():
     return None
 
 
+class _Snapshot:
+    """Papers and the local index as of one update.
+
+    Updates build a new snapshot and swap it in with a single assignment, so a
+    reader that grabs ``store._snapshot`` once never sees papers and index rows
+    from different updates.
+    """
+
+    def __init__(self, papers: dict[str, CatalogEntry], row_ids: list[str],
+                 row_of: dict[str, int], index: Optional[VectorIndex], version: int,
+                 keywords: Optional[KeywordIndex] = None, filters: Optional[FilterIndex] = None,
+                 summaries: Optional[dict[str, Payload]] = None, similar: Optional[KnnGraph] = None):
+        self.papers = papers
+        self.row_ids = row_ids      # index row -> paper_id (rows may be dead)
+        self.row_of = row_of        # paper_id -> live index row
+        self.index = index
+        self.version = version
+        self.keywords = keywords
+        self.filters = filters
+        self.summaries = summaries if summaries is not None else {}   # paper_id -> /summary body
+        self.similar = similar
+
+
+def _normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (vectors / norms).astype(np.float32)
+
+
 class PaperStore:
     """Paper store with Azure AI Search backend or in-memory fallback."""
 
     def __init__(self) -> None:
-        self.papers: dict[str, EnrichedPaper] = {}
-        self._embeddings: Optional[np.ndarray] = None
-        self._paper_ids: list[str] = []
+        self._snapshot = _Snapshot({}, [], {}, None, 0)
         self._search_client = None
+        self._async_search_client = None
+        self._query_vectors = TTLCache(
+            Config.QUERY_CACHE_SIZE,
+            Config.QUERY_CACHE_TTL,
+            hits=QUERY_EMBEDDING_CACHE_HITS,
+            misses=QUERY_EMBEDDING_CACHE_MISSES,
+        )
+        # Resolved lazily so tests can swap the model loader.
+        self._encoder = BatchingEncoder(
+            lambda: _load_embedding_model(),
+            max_batch=Config.ENCODER_MAX_BATCH,
+            max_wait=Config.ENCODER_MAX_WAIT_MS / 1000,
+            queue_size=Config.ENCODER_QUEUE_SIZE,
+        )
+        # Final result lists keyed by store version, so any update invalidates them.
+        self._results = TTLCache(
+            Config.SEARCH_CACHE_SIZE,
+            Config.SEARCH_CACHE_TTL,
+            hits=SEARCH_CACHE_HITS,
+            misses=SEARCH_CACHE_MISSES,
+        )
+        # Full records (with clean_text) of recently requested papers.
+        self._records = TTLCache(Config.RECORD_CACHE_SIZE, Config.RECORD_CACHE_TTL)
+        self._details = TTLCache(Config.RECORD_CACHE_SIZE, Config.RECORD_CACHE_TTL)
+        # Listing rows and serialized pages, keyed by store version so updates invalidate them.
+        self._listings = TTLCache(1, float("inf"))
+        self._pages = TTLCache(Config.LISTING_PAGE_CACHE_SIZE, float("inf"))
+
+        # Writer-side bookkeeping, guarded by _update_lock.
+        self._update_lock = threading.Lock()
+        self._files: dict[str, tuple[int, int]] = {}    # path -> (mtime_ns, size)
+        self._sources: dict[str, str] = {}               # path -> paper_id
+        self._paths: dict[str, str] = {}                 # paper_id -> path
+        self._vector_store: Optional[EmbeddingStore] = None
+        self._store_offset = 0                           # bytes of the id table consumed
+        self._store_rows = 0                             # embedding store rows consumed
+        self._store_generation: Optional[int] = None
+        self._latest_row: dict[str, int] = {}            # paper_id -> newest index row
+        self._ram_rows: Optional[RowBuffer] = None       # set once the matrix no longer mirrors the store
+        self._json_vectors = False                       # some rows came from JSON, not the store
+        self._graph_generation = 0                       # bumped for each background graph build
+        self._graph_builder: Optional[threading.Thread] = None
+
+        self._saved_version = 0                          # store version last written to the snapshot
+
+        self._watcher: Optional[threading.Thread] = None
+        self._stop_watching = threading.Event()
+        self._ready = threading.Event()
+
+    @property
+    def papers(self) -> dict[str, CatalogEntry]:
+        return self._snapshot.papers
+
+    @property
+    def version(self) -> int:
+        """Increases every time papers or the index change."""
+        return self._snapshot.version
+
+    @property
+    def ready(self) -> bool:
+        """True once papers are loaded and the model has answered a warm-up query."""
+        return self._ready.is_set()
 
     def load_papers(self) -> None:
         """Load papers from disk. If Azure AI Search is configured, use it for search."""
         self._search_client = _get_search_client()
         if self._search_client:
             logger.info("Azure AI Search enabled for queries")
+            self._async_search_client = self._search_client.async_client()
+        else:
+            self._vector_store = EmbeddingStore(Config.EMBEDDINGS_DIR)
 
         if not os.path.exists(Config.ENRICHED_DIR):
             logger.warning(f"Enriched papers directory not found: {Config.ENRICHED_DIR}")
             return
 
-        for name in os.listdir(Config.ENRICHED_DIR):
-            if not name.endswith(".json"):
-                continue
-            path = os.path.join(Config.ENRICHED_DIR, name)
+        start = time.perf_counter()
+        # With several workers, the first one through the lock parses, builds and
+        # publishes; the rest restore its snapshot and attach to its arrays.
+        with loader_lock(Config.SHARED_DIR) if Config.SHARED_DIR else nullcontext():
+            restored = self._restore_snapshot()
+            self.refresh()
+            logger.info(f"Loaded {len(self.papers)} papers in {time.perf_counter() - start:.2f}s"
+                        + (" from snapshot" if restored is not None else ""))
+            if restored is None or self._files != restored:
+                self.save_snapshot()
+            else:
+                self._saved_version = self.version
+
+        index = self._snapshot.index
+        if index is not None:
+            INDEX_SIZE.set(index.matrix.shape[1])
+            logger.info(f"Local index: {len(self._snapshot.row_of)} papers, {index.matrix.shape[1]} dims")
+
+    def refresh(self) -> bool:
+        """Pick up enriched papers added, changed or deleted on disk since the last call.
+
+        New vectors are appended to the live index; nothing is rebuilt. Returns
+        whether anything changed.
+        """
+        with self._update_lock:
+            # Scan before reading the vector store: the enricher appends a vector
+            # before writing its JSON, so every file seen here has its row.
+            files = self._scan()
+            old = self._snapshot
+            previous_rows = self._latest_row
+            store_matrix = None
+            if self._vector_store is not None:
+                with self._vector_store.reading():
+                    new_ids, store_rows, rewritten = self._tail_vector_store(old)
+                    store_matrix = self._vector_store.matrix(self._store_rows)
+            else:
+                new_ids, store_rows, rewritten = [], np.empty(0, dtype=np.intp), False
+
+            # Some vectors only exist in JSON files: those have to be re-read.
+            reload = rewritten and self._json_vectors
+            if rewritten and (reload or old.index is None or not new_ids):
+                logger.info("Embedding store was rewritten; rebuilding the local index")
+                self._ram_rows = None
+                self._json_vectors = False
+                old = _Snapshot(old.papers, [], {}, None, old.version, old.keywords, old.filters, old.summaries)
+            elif rewritten:
+                old = self._remap_rows(old, previous_rows, new_ids, store_rows, store_matrix)
+                new_ids, store_rows = [], store_rows[:0]
+
+            changed = [path for path, stat in files.items() if reload or self._files.get(path) != stat]
+            removed = [path for path in self._files if path not in files]
+            if not changed and not removed and not new_ids and not rewritten and old.version:
+                return False
+
+            papers = dict(old.papers)
+            touched: set[str] = set(new_ids)
+
+            for path in removed:
+                pid = self._sources.pop(path, None)
+                if pid is not None and self._paths.get(pid) == path:
+                    del self._paths[pid]
+                    papers.pop(pid, None)
+                    touched.add(pid)
+
+            legacy: list[tuple[str, list[float]]] = []
+            known = self._latest_row.keys() if self._vector_store is not None else None
+            entries = read_entries([(path, files[path]) for path in changed], known, Config.LOAD_WORKERS)
+            for path, (paper, embedding) in zip(changed, entries):
+                if paper is None:
+                    continue
+                if not owns(paper.paper_id):
+                    # Another shard's paper. File names need not match paper_ids, so
+                    # shards split on the parsed id, like the embedding store rows.
+                    previous = self._sources.pop(path, None)
+                    if previous is not None and self._paths.get(previous) == path:
+                        del self._paths[previous]
+                        papers.pop(previous, None)
+                        touched.add(previous)
+                    continue
+                previous = self._sources.get(path)
+                if previous is not None and previous != paper.paper_id:
+                    papers.pop(previous, None)
+                    self._paths.pop(previous, None)
+                    touched.add(previous)
+                papers[paper.paper_id] = paper
+                self._sources[path] = paper.paper_id
+                self._paths[paper.paper_id] = path
+                touched.add(paper.paper_id)
+                if embedding and paper.paper_id not in self._latest_row:
+                    legacy.append((paper.paper_id, embedding))
+
+            self._files = files
+            row_ids, row_of, index, similar = old.row_ids, old.row_of, old.index, old.similar
+            if self._vector_store is not None:
+                row_ids, row_of, index, similar = self._update_vectors(
+                    old, papers, new_ids, store_rows, store_matrix, legacy, touched)
+
+            keywords, filters = old.keywords, old.filters
+            if self._search_client is None:
+                if keywords is None:
+                    keywords = KeywordIndex.build(papers.values())
+                    filters = FilterIndex.build(papers.values())
+                else:
+                    keywords = keywords.updated(papers, touched)
+                    filters = filters.updated(old.papers, papers, touched)
+
+            if not old.version:
+                summaries = self._initial_summaries(papers)
+                self._share_text(papers)
+            else:
+                summaries = dict(old.summaries)
+                for pid in touched:
+                    if pid not in papers:
+                        summaries.pop(pid, None)
+                    elif papers[pid] is not old.papers.get(pid):
+                        summaries[pid] = summary_payload(papers[pid])
+
+            self._snapshot = _Snapshot(papers, row_ids, row_of, index, old.version + 1, keywords, filters,
+                                       summaries, similar)
+
+        PAPERS_LOADED.set(len(papers))
+        if old.version:
+            logger.info(f"Store updated to version {old.version + 1}: "
+                        f"{len(changed)} changed, {len(removed)} removed, {len(new_ids)} new vectors")
+        return True
+
+    def upsert_paper(self, paper: EnrichedPaper) -> int:
+        """Persist a paper the way the enricher does, publish it and return the new version."""
+        os.makedirs(Config.ENRICHED_DIR, exist_ok=True)
+        with self._update_lock:
+            path = self._paths.get(paper.paper_id) or os.path.join(Config.ENRICHED_DIR, f"{paper.paper_id}.json")
+        # Vector before JSON, like the enricher: a visible paper always has its store row.
+        if self._vector_store is not None and paper.embedding:
+            self._vector_store.append(paper.paper_id, paper.embedding)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(paper.model_dump_json(indent=2))
+        os.replace(tmp, path)
+        self.refresh()
+        return self.version
+
+    def delete_paper(self, paper_id: str) -> bool:
+        """Remove a paper's enriched JSON and drop it from the live store."""
+        with self._update_lock:
+            path = self._paths.get(paper_id)
+        if path is None:
+            return False
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        self.refresh()
+        return True
+
+    def start_watching(self, interval: float) -> None:
+        """Poll the enriched papers directory every ``interval`` seconds in a daemon thread."""
+        if self._watcher is not None:
+            return
+        self._stop_watching.clear()
+
+        def _run() -> None:
+            while not self._stop_watching.wait(interval):
+                try:
+                    self.refresh()
+                except Exception as e:
+                    logger.error(f"Failed to refresh papers: {e}")
+
+        self._watcher = threading.Thread(target=_run, name="paper-store-watcher", daemon=True)
+        self._watcher.start()
+        logger.info(f"Watching {Config.ENRICHED_DIR} every {interval}s")
+
+    def stop_watching(self) -> None:
+        self._stop_watching.set()
+        if self._watcher is not None:
+            self._watcher.join(timeout=5)
+            self._watcher = None
+
+    def close(self) -> None:
+        """Stop the directory watcher and the query encoder thread; persist the catalog."""
+        self.stop_watching()
+        self._encoder.close()
+        if self._search_client:
+            self._search_client.close()
+        if self.version != self._saved_version:
+            self.save_snapshot()
+
+    async def aclose(self) -> None:
+        """Close the asyncio search client; call from the event loop that used it."""
+        if self._async_search_client is not None:
+            await self._async_search_client.close()
+
+    def warm_up(self) -> None:
+        """Load the embedding model and run a query through each local index, then
+        report ready. Until then the first real query would pay the model load."""
+        start = time.perf_counter()
+        q_vecs = np.stack(self._encoder.encode(["warm up"]))
+        snapshot = self._snapshot
+        if snapshot.index is not None and snapshot.row_of:
+            snapshot.index.search(q_vecs, 1)
+        if snapshot.keywords is not None:
+            snapshot.keywords.search("warm up", 1)
+        self._ready.set()
+        logger.info(f"Search warmed up in {time.perf_counter() - start:.2f}s")
+
+    def save_snapshot(self) -> None:
+        """Write the catalog as one binary file so the next start skips JSON parsing."""
+        if not Config.SNAPSHOT_PATH:
+            return
+        with self._update_lock:
+            if self._json_vectors:
+                # Some vectors only exist in JSON files; those have to be re-read anyway.
+                return
+            snapshot = self._snapshot
             try:
-                with open(path, "r", encoding="utf-8") as f:
-                    paper = EnrichedPaper(**json.load(f))
-                self.papers[paper.paper_id] = paper
-            except Exception as e:
-                logger.error(f"Failed to load {name}: {e}")
-
-        PAPERS_LOADED.set(len(self.papers))
-        logger.info(f"Loaded {len(self.papers)} papers")
-
-        if not self._search_client:
-            self._build_local_index()
-
-    def _build_local_index(self) -> None:
-        """Build the in-memory cosine-similarity index (fallback when no Azure Search)."""
-        items = [(pid, p) for pid, p in self.papers.items() if p.embedding]
-        if not items:
+                save_catalog(Config.SNAPSHOT_PATH, Config.ENRICHED_DIR, snapshot.papers, self._files, self._sources)
+            except OSError as e:
+                logger.warning(f"Failed to save catalog snapshot: {e}")
+                return
+            self._saved_version = snapshot.version
+
+    def _restore_snapshot(self) -> Optional[dict[str, tuple[int, int]]]:
+        """Seed the catalog from the binary snapshot; returns the file stamps it covered.
+
+        The following ``refresh`` re-reads only files whose stamps changed and maps
+        vectors straight from the embedding store.
+        """
+        if not Config.SNAPSHOT_PATH:
+            return None
+        restored = load_catalog(Config.SNAPSHOT_PATH, Config.ENRICHED_DIR)
+        if restored is None:
+            return None
+        papers, files, sources = restored
+        with self._update_lock:
+            self._files = dict(files)
+            self._sources = sources
+            self._paths = {entry.paper_id: entry.source for entry in papers.values()}
+            self._snapshot = _Snapshot(papers, [], {}, None, 0)
+        return files
+
+    def _scan(self) -> dict[str, tuple[int, int]]:
+        if not os.path.exists(Config.ENRICHED_DIR):
+            return {}
+        files = {}
+        with os.scandir(Config.ENRICHED_DIR) as entries:
+            for entry in entries:
+                if entry.name.endswith(".json") and entry.is_file():
+                    stat = entry.stat()
+                    files[entry.path] = (stat.st_mtime_ns, stat.st_size)
+        return files
+
+    def _tail_vector_store(self, old: _Snapshot) -> tuple[list[str], np.ndarray, bool]:
+        """Read ids appended to the embedding store and register their rows.
+
+        Returns the new ids and their rows in the store file; a shard keeps only
+        the papers it owns. Also reports whether the store was rewritten
+        (compacted) since the last call, in which case every id is returned with
+        its new row. Call with the store's read lock held.
+        """
+        generation = self._vector_store.generation()
+        rewritten = self._store_generation is not None and generation != self._store_generation
+        self._store_generation = generation
+        if rewritten:
+            self._store_offset = self._store_rows = 0
+            self._latest_row = {}
+
+        ids, self._store_offset = self._vector_store.tail_ids(self._store_offset)
+        store_rows = np.arange(self._store_rows, self._store_rows + len(ids), dtype=np.intp)
+        self._store_rows += len(ids)
+        if Config.SHARD_COUNT > 1:
+            kept = [i for i, pid in enumerate(ids) if owns(pid)]
+            ids, store_rows = [ids[i] for i in kept], store_rows[kept]
+        first_row = 0 if rewritten else len(old.row_ids)
+        for i, pid in enumerate(ids):
+            self._latest_row[pid] = first_row + i
+        return ids, store_rows, rewritten
+
+    def _remap_rows(self, old: _Snapshot, previous_rows: dict[str, int], ids: list[str],
+                    store_rows: np.ndarray, store_matrix: np.ndarray) -> _Snapshot:
+        """``old`` renumbered to the rows of the compacted store.
+
+        Compaction only drops superseded rows, so every vector the index holds
+        for a live paper is still in the store under a new number. The index and
+        similarity graph are remapped instead of rebuilt, and no paper is re-read.
+        Rows without a counterpart, i.e. vectors appended since the last refresh,
+        are indexed as new ones.
+        """
+        logger.info("Embedding store was compacted; renumbering the local index")
+        if Config.SHARD_COUNT > 1:
+            self._ram_rows = RowBuffer(np.asarray(store_matrix[store_rows]))
+            matrix = self._ram_rows.view()
+        else:
+            matrix = store_matrix
+
+        old_rows = np.full(len(ids), -1, dtype=np.intp)
+        unclaimed = dict(previous_rows)
+        for row, pid in enumerate(ids):
+            previous = unclaimed.pop(pid, None)
+            if previous is not None:
+                old_rows[row] = previous
+        mapped = np.flatnonzero(old_rows >= 0)
+        if old.index is not None and len(mapped):
+            # A paper re-enriched just before the compaction has a vector the index never saw.
+            same = (np.asarray(old.index.matrix[old_rows[mapped]]) == np.asarray(matrix[mapped])).all(axis=1)
+            old_rows[mapped[~same]] = -1
+
+        row_of = {pid: row for pid, row in self._latest_row.items() if pid in old.papers}
+        alive = np.zeros(len(ids), dtype=bool)
+        alive[np.fromiter(row_of.values(), dtype=np.intp, count=len(row_of))] = True
+        index = old.index.remapped(matrix, old_rows, alive)
+        # A graph still being built refers to the old row numbers; drop it.
+        self._graph_generation += 1
+        similar = old.similar.remapped(index, old_rows) if old.similar is not None else None
+        if similar is None:
+            similar = self._similar_graph(index, ids, alive)
+        return _Snapshot(old.papers, list(ids), row_of, index, old.version, old.keywords, old.filters,
+                         old.summaries, similar)
+
+    def _update_vectors(self, old: _Snapshot, papers: dict[str, CatalogEntry], new_ids: list[str],
+                        store_rows: np.ndarray, store_matrix: np.ndarray,
+                        legacy: list[tuple[str, list[float]]], touched: set[str]):
+        """Append new store rows and legacy JSON embeddings; recompute which rows are live."""
+        row_ids = old.row_ids + new_ids
+
+        sharded = Config.SHARD_COUNT > 1 and len(new_ids) > 0
+        if (legacy or sharded) and self._ram_rows is None:
+            # Papers enriched before the store existed: their vectors only live in JSON,
+            # so the matrix can no longer be a plain view of the store file. A shard
+            # copies out just its own rows, so it holds 1/SHARD_COUNT of the vectors.
+            if old.index is not None:
+                base = np.asarray(old.index.matrix, dtype=np.float32)
+            else:
+                dim = len(legacy[0][1]) if legacy else store_matrix.shape[1]
+                base = np.empty((0, dim), dtype=np.float32)
+            self._ram_rows = RowBuffer(base)
+
+        if self._ram_rows is not None:
+            matrix = self._ram_rows.view()
+            if new_ids:
+                matrix = self._ram_rows.append(np.asarray(store_matrix[store_rows]))
+            if legacy:
+                self._json_vectors = True
+                for pid, _ in legacy:
+                    self._latest_row[pid] = len(row_ids)
+                    row_ids.append(pid)
+                matrix = self._ram_rows.append(_normalize_rows(np.array([e for _, e in legacy], dtype=np.float32)))
+        else:
+            matrix = store_matrix
+
+        row_of = dict(old.row_of)
+        for pid in touched:
+            row = self._latest_row.get(pid)
+            if pid in papers and row is not None:
+                row_of[pid] = row
+            else:
+                row_of.pop(pid, None)
+
+        if not row_ids:
+            return row_ids, row_of, None, None
+
+        alive = np.zeros(len(row_ids), dtype=bool)
+        alive[np.fromiter(row_of.values(), dtype=np.intp, count=len(row_of))] = True
+        if old.index is not None:
+            index = old.index.updated(matrix, alive)
+            similar = old.similar.updated(index) if old.similar is not None else None
+            if old.similar is not None and similar is None:
+                similar = self._similar_graph(index, row_ids, alive)
+        else:
+            index = self._shared_index(matrix, row_ids, alive)
+            similar = self._similar_graph(index, row_ids, alive)
+        return row_ids, row_of, index, similar
+
+    def _shared_index(self, matrix: np.ndarray, row_ids: list[str], alive: np.ndarray) -> VectorIndex:
+        """Build the index, or attach to the arrays another worker published for the
+        same corpus. The matrix itself is already shared: it maps the store file
+        read-only.
+        """
+        if not Config.SHARED_DIR or self._ram_rows is not None:
+            return self._build_index(matrix, row_ids, alive)
+
+        key = content_key("index", fingerprint(row_ids, matrix), alive.tobytes(), Config.LOCAL_INDEX,
+                          Config.INDEX_QUANTIZATION, str(Config.IVF_NLIST))
+        attached = attach(Config.SHARED_DIR, key)
+        if attached is None:
+            index = self._build_index(matrix, row_ids, alive)
+            try:
+                publish(Config.SHARED_DIR, key, index.arrays(), {"report": index.report})
+            except OSError as e:
+                logger.warning(f"Failed to publish the local index: {e}")
+                return index
+            # Map the published copy so this process does not keep a private one.
+            attached = attach(Config.SHARED_DIR, key)
+            if attached is None:
+                return index
+
+        arrays, meta = attached
+        index = index_from_arrays(Config.LOCAL_INDEX, matrix, arrays, nprobe=Config.IVF_NPROBE,
+                                  quantization=Config.INDEX_QUANTIZATION,
+                                  rescore_factor=Config.RESCORE_FACTOR, alive=alive)
+        index.report = meta["report"]
+        self._report_index(index)
+        return index
+
+    def _similar_graph(self, index: VectorIndex, row_ids: list[str], alive: np.ndarray) -> Optional[KnnGraph]:
+        """The kNN graph for a freshly built index if one was published for this corpus.
+
+        Otherwise the graph is built in a background thread and swapped in when
+        done, so loading does not wait for the all-pairs search; until then
+        ``similar`` answers with index searches. Called with ``_update_lock`` held.
+        """
+        if Config.SIMILAR_K <= 0:
+            return None
+        key = content_key("knn", fingerprint(row_ids, index.matrix), alive.tobytes(), str(Config.SIMILAR_K))
+        if Config.SHARED_DIR:
+            attached = attach(Config.SHARED_DIR, key)
+            if attached is not None:
+                return KnnGraph(attached[0]["neighbors"], attached[0]["scores"])
+
+        self._graph_generation += 1
+        self._graph_builder = threading.Thread(target=self._build_similar_graph,
+                                               args=(index, key, self._graph_generation),
+                                               name="knn-graph-builder", daemon=True)
+        self._graph_builder.start()
+        return None
+
+    def _build_similar_graph(self, index: VectorIndex, key: str, generation: int) -> None:
+        """Build (or attach to) the graph for ``index`` and swap it into the snapshot.
+
+        Workers queue on a lock so only the first builds; the rest map its copy,
+        which also survives restarts. Rows appended meanwhile are merged in with
+        ``KnnGraph.updated``; a compaction in the meantime makes the result stale.
+        """
+        try:
+            with loader_lock(Config.SHARED_DIR, ".knn.lock") if Config.SHARED_DIR else nullcontext():
+                attached = attach(Config.SHARED_DIR, key) if Config.SHARED_DIR else None
+                if attached is None:
+                    graph = KnnGraph.build(index, Config.SIMILAR_K)
+                    if Config.SHARED_DIR:
+                        try:
+                            publish(Config.SHARED_DIR, key, {"neighbors": graph.neighbors, "scores": graph.scores})
+                            attached = attach(Config.SHARED_DIR, key)
+                        except OSError as e:
+                            logger.warning(f"Failed to publish the similarity graph: {e}")
+                if attached is not None:
+                    graph = KnnGraph(attached[0]["neighbors"], attached[0]["scores"])
+        except Exception as e:
+            logger.error(f"Failed to build the similarity graph: {e}")
             return
 
-        self._paper_ids = [pid for pid, _ in items]
-        self._embeddings = np.array([p.embedding for _, p in items], dtype=np.float32)
+        with self._update_lock:
+            snapshot = self._snapshot
+            if generation != self._graph_generation or snapshot.index is None:
+                return
+            if snapshot.index is not index:
+                graph = graph.updated(snapshot.index)
+                if graph is None:
+                    self._similar_graph(snapshot.index, snapshot.row_ids, snapshot.index.alive)
+                    return
+            self._snapshot = _Snapshot(snapshot.papers, snapshot.row_ids, snapshot.row_of, snapshot.index,
+                                       snapshot.version, snapshot.keywords, snapshot.filters,
+                                       snapshot.summaries, graph)
+
+    def _initial_summaries(self, papers: dict[str, CatalogEntry]) -> dict[str, Payload]:
+        """``/summary`` bodies for every paper, mapped from the shared directory when
+        another worker already serialized the same catalog."""
+        if not Config.SHARED_DIR:
+            return {pid: summary_payload(entry) for pid, entry in papers.items()}
 
-        norms = np.linalg.norm(self._embeddings, axis=1, keepdims=True)
-        norms[norms == 0] = 1.0
-        self._embeddings = self._embeddings / norms
+        ids = sorted(papers)
+        key = content_key("summaries", *(f"{pid}\0{papers[pid].source}\0{papers[pid].stamp}" for pid in ids))
+        attached = attach(Config.SHARED_DIR, key)
+        if attached is None:
+            payloads = [summary_payload(papers[pid]) for pid in ids]
+            try:
+                publish(Config.SHARED_DIR, key, pack_blobs([b for p in payloads for b in (p.body, p.gzip, p.br)]))
+            except OSError as e:
+                logger.warning(f"Failed to publish summary payloads: {e}")
+                return dict(zip(ids, payloads))
+            attached = attach(Config.SHARED_DIR, key)
+            if attached is None:
+                return dict(zip(ids, payloads))
 
-        INDEX_SIZE.set(self._embeddings.shape[1])
-        logger.info(f"Local index: {len(self._paper_ids)} papers, {self._embeddings.shape[1]} dims")
+        views = unpack_blobs(attached[0])
+        return {pid: Payload.from_variants(*views[3 * i:3 * i + 3]) for i, pid in enumerate(ids)}
 
-    def get_paper(self, paper_id: str) -> Optional[EnrichedPaper]:
+    def _share_text(self, papers: dict[str, CatalogEntry]) -> None:
+        """Move every entry's abstract and summary into blobs mapped from the shared
+        directory, so workers serving the same catalog keep one copy between them.
+        Papers loaded later keep their own."""
+        if not Config.SHARED_DIR or not papers:
+            return
+
+        ids = sorted(papers)
+        key = content_key("text", *(f"{pid}\0{papers[pid].source}\0{papers[pid].stamp}" for pid in ids))
+        attached = attach(Config.SHARED_DIR, key)
+        if attached is None:
+            try:
+                publish(Config.SHARED_DIR, key, pack_text([papers[pid] for pid in ids]))
+            except OSError as e:
+                logger.warning(f"Failed to publish catalog text: {e}")
+                return
+            attached = attach(Config.SHARED_DIR, key)
+            if attached is None:
+                return
+
+        text = SharedText(attached[0])
+        for slot, pid in enumerate(ids):
+            papers[pid].share_text(text, slot)
+
+    def _build_index(self, matrix: np.ndarray, row_ids: list[str], alive: np.ndarray) -> VectorIndex:
+        """Build the cosine-similarity index (fallback when no Azure Search)."""
+        index = build_index(
+            Config.LOCAL_INDEX,
+            matrix,
+            row_ids,
+            Config.ANN_INDEX_PATH,
+            nlist=Config.IVF_NLIST,
+            nprobe=Config.IVF_NPROBE,
+            quantization=Config.INDEX_QUANTIZATION,
+            rescore_factor=Config.RESCORE_FACTOR,
+            recall_queries=Config.RECALL_CHECK_QUERIES,
+            alive=alive,
+        )
+        self._report_index(index)
+        return index
+
+    @staticmethod
+    def _report_index(index: VectorIndex) -> None:
+        INDEX_MEMORY_BYTES.set(index.nbytes)
+        for stage in ("recall", "first_pass_recall"):
+            if stage in index.report:
+                INDEX_RECALL.labels(stage=stage).set(index.report[stage])
+
+    def get_entry(self, paper_id: str) -> Optional[CatalogEntry]:
+        """Listing/search fields of a paper, without touching disk."""
         return self.papers.get(paper_id)
 
-    def list_papers(self) -> list[EnrichedPaper]:
+    def get_paper(self, paper_id: str) -> Optional[EnrichedPaper]:
+        """Full paper record, read from disk on first use and kept in a small LRU."""
+        entry = self.papers.get(paper_id)
+        if entry is None:
+            return None
+        # The stamp changes with the file, so edited papers never hit a stale record.
+        return self._records.get_or_compute((paper_id, entry.stamp), lambda: load_record(entry))
+
+    def detail_payload(self, paper_id: str) -> Optional[Payload]:
+        """Serialized (and compressed) detail response, built once per file version."""
+        entry = self.papers.get(paper_id)
+        if entry is None:
+            return None
+
+        def build() -> Optional[Payload]:
+            paper = self.get_paper(paper_id)
+            return detail_payload(paper) if paper is not None else None
+
+        return self._details.get_or_compute((paper_id, entry.stamp), build)
+
+    def summary_payload(self, paper_id: str) -> Optional[Payload]:
+        """Serialized summary response, prepared when the paper was loaded."""
+        return self._snapshot.summaries.get(paper_id)
+
+    def list_papers(self) -> list[CatalogEntry]:
         return list(self.papers.values())
 
-    def search(self, query: str, top_k: int = 5) -> list[PaperSearchResult]:
-        """Search papers using Azure AI Search (hybrid) or local in-memory fallback."""
+    def listing_page(self, cursor: Optional[str], limit: Optional[int], fields: tuple[str, ...]) -> Page:
+        """A serialized listing page, rendered once per store version and parameters."""
+        snapshot = self._snapshot
+        listing = self._listings.get_or_compute(
+            snapshot.version, lambda: Listing(list(snapshot.papers.values())))
+        return self._pages.get_or_compute(
+            (snapshot.version, cursor, limit, fields), lambda: render_page(listing, cursor, limit, fields))
+
+    def export(self, fields: tuple[str, ...], embeddings: bool = False) -> Iterator[bytes]:
+        """NDJSON chunks of every paper, ordered by paper_id, as of one store version.
+
+        Rows come from the catalog. Full records are read from disk, one at a
+        time, only for ``clean_text`` or for embeddings with no local index row.
+        Embeddings are L2-normalized, like the vectors the local index searches.
+        """
+        snapshot = self._snapshot
+        ids = sorted(snapshot.papers)
+
+        def vector_of(entry: CatalogEntry, record: Optional[EnrichedPaper]) -> Optional[np.ndarray]:
+            row = snapshot.row_of.get(entry.paper_id)
+            if row is not None and snapshot.index is not None:
+                return snapshot.index.matrix[row]
+            record = record or load_record(entry)
+            if record is None or not record.embedding:
+                return None
+            return _normalize_rows(np.asarray([record.embedding], dtype=np.float32))[0]
+
+        entries = (snapshot.papers[paper_id] for paper_id in ids)
+        return ndjson_chunks(entries, fields, load=load_record, vector_of=vector_of if embeddings else None)
+
+    def search(self, query: str, top_k: int = 5, mode: Optional[str] = None,
+               filters: Optional[SearchFilters] = None) -> list[PaperSearchResult]:
+        """Search papers using Azure AI Search or the local in-memory indexes.
+
+        ``mode`` is ``"hybrid"`` (BM25 and vector rankings fused), ``"vector"`` or
+        ``"keyword"``; it defaults to ``Config.SEARCH_MODE``. ``filters`` restricts
+        the candidates before anything is scored.
+        """
+        mode = _search_mode(mode)
         SEARCH_QUERIES.inc()
         start = time.perf_counter()
+        results = self._cached_search([query], top_k, mode, filters)[0]
+        SEARCH_LATENCY.observe(time.perf_counter() - start)
+        return results
 
-        if self._search_client:
-            results = self._search_azure(query, top_k)
-        else:
-            results = self._search_local(query, top_k)
-
+    async def search_async(self, query: str, top_k: int = 5, mode: Optional[str] = None,
+                           filters: Optional[SearchFilters] = None) -> list[PaperSearchResult]:
+        """``search`` for async callers: waits for the query vector without holding a
+        thread, then scores in the default executor."""
+        mode = _search_mode(mode)
+        SEARCH_QUERIES.inc()
+        start = time.perf_counter()
+        results = (await self._cached_search_async([query], top_k, mode, filters))[0]
         SEARCH_LATENCY.observe(time.perf_counter() - start)
         return results
 
-    def _search_azure(self, query: str, top_k: int) -> list[PaperSearchResult]:
-        """Hybrid search via Azure AI Search (text + vector)."""
-        model = _load_embedding_model()
-        embedding = model.encode(query).tolist()
+    def search_batch(self, queries: list[str], top_k: int = 5, mode: Optional[str] = None,
+                     filters: Optional[SearchFilters] = None) -> list[list[PaperSearchResult]]:
+        """Search many queries at once; results are returned in query order."""
+        mode = _search_mode(mode)
+        SEARCH_QUERIES.inc(len(queries))
+        start = time.perf_counter()
+        results = self._cached_search(queries, top_k, mode, filters)
+        BATCH_SEARCH_LATENCY.observe(time.perf_counter() - start)
+        return results
 
-        hits = self._search_client.search_hybrid(query, embedding, top_k=top_k)
+    async def search_batch_async(self, queries: list[str], top_k: int = 5, mode: Optional[str] = None,
+                                 filters: Optional[SearchFilters] = None) -> list[list[PaperSearchResult]]:
+        """``search_batch`` for async callers (see ``search_async``)."""
+        mode = _search_mode(mode)
+        SEARCH_QUERIES.inc(len(queries))
+        start = time.perf_counter()
+        results = await self._cached_search_async(queries, top_k, mode, filters)
+        BATCH_SEARCH_LATENCY.observe(time.perf_counter() - start)
+        return results
+
+    def similar(self, paper_id: str, top_k: int = 5) -> Optional[list[PaperSearchResult]]:
+        """Papers closest to ``paper_id``'s stored embedding, or ``None`` for unknown papers.
+
+        Answered from the precomputed kNN graph; falls back to one index search
+        with the stored vector when too few graph neighbours are still live.
+        Never calls the model.
+        """
+        snapshot = self._snapshot
+        if paper_id not in snapshot.papers:
+            return None
+        if self._search_client:
+            return self._similar_azure(paper_id, top_k)
+
+        row = snapshot.row_of.get(paper_id)
+        if row is None or snapshot.index is None:
+            return []
+        wanted = min(top_k, len(snapshot.row_of) - 1)
+        rows = scores = np.empty(0)
+        if snapshot.similar is not None:
+            rows, scores = snapshot.similar.lookup(row, snapshot.index.alive)
+        if len(rows) < wanted:
+            found_scores, found = snapshot.index.search(np.asarray(snapshot.index.matrix[row:row + 1]), top_k + 1)
+            keep = (found[0] >= 0) & (found[0] != row)
+            rows, scores = found[0][keep], found_scores[0][keep]
+        return [self._to_result(snapshot, snapshot.row_ids[r], float(s)) for r, s in zip(rows[:top_k], scores[:top_k])]
+
+    def _similar_azure(self, paper_id: str, top_k: int) -> list[PaperSearchResult]:
+        paper = self.get_paper(paper_id)
+        if paper is None or not paper.embedding:
+            return []
+        hits = self._search_client.search_vector(paper.embedding, top_k=top_k + 1)
+        # Azure keys have dots replaced (see the enricher's _to_search_document).
+        own_keys = {paper_id, paper_id.replace(".", "-")}
+        return [r for r in self._azure_results(hits) if r.paper_id not in own_keys][:top_k]
+
+    def _result_keys(self, queries: list[str], top_k: int, mode: str,
+                     filters: Optional[SearchFilters]) -> list[tuple]:
+        """Result-cache keys: store version plus everything that shapes the ranking.
+
+        Queries are normalized like query vectors; keyword tokenization and the
+        Azure analyzers are case-insensitive too, so equal keys mean equal results.
+        """
+        version = self._snapshot.version
+        filters_key = None if is_empty(filters) else filters.model_dump_json()
+        return [(version, _query_key(q), top_k, mode, filters_key) for q in queries]
+
+    def _cached_search(self, queries: list[str], top_k: int, mode: str,
+                       filters: Optional[SearchFilters]) -> list[list[PaperSearchResult]]:
+        """``_search`` through the result cache; only uncached queries are run."""
+        keys = self._result_keys(queries, top_k, mode, filters)
+        results = self._results.get_or_compute_many(
+            keys, lambda pending: self._search([key[1] for key in pending], top_k, mode, filters, None))
+        return [list(r) for r in results]
+
+    async def _cached_search_async(self, queries: list[str], top_k: int, mode: str,
+                                   filters: Optional[SearchFilters]) -> list[list[PaperSearchResult]]:
+        """``_cached_search`` for async callers: misses are encoded and searched in a task."""
+        loop = asyncio.get_running_loop()
+        tasks = []
+
+        def submit(pending: list[tuple]) -> Future:
+            future: Future = Future()
+
+            async def run() -> None:
+                try:
+                    future.set_result(await self._search_uncached_async([key[1] for key in pending], top_k,
+                                                                        mode, filters))
+                except BaseException as e:
+                    future.set_exception(e)
+
+            tasks.append(loop.create_task(run()))
+            return future
+
+        futures = self._results.get_or_submit_many(self._result_keys(queries, top_k, mode, filters), submit)
+        return [list(r) for r in await asyncio.gather(*(asyncio.wrap_future(f) for f in futures))]
+
+    async def _search_uncached_async(self, queries: list[str], top_k: int, mode: str,
+                                     filters: Optional[SearchFilters]) -> list[list[PaperSearchResult]]:
+        q_vecs = await self._encode_queries_async(queries) if self._needs_vectors(mode) else None
+        return await self._search_async(queries, top_k, mode, filters, q_vecs)
+
+    def _needs_vectors(self, mode: str) -> bool:
+        if mode == "keyword":
+            return False
+        snapshot = self._snapshot
+        return bool(self._search_client) or (snapshot.index is not None and bool(snapshot.row_of))
 
+    def _search(self, queries: list[str], top_k: int, mode: str, filters: Optional[SearchFilters],
+                q_vecs: Optional[np.ndarray]) -> list[list[PaperSearchResult]]:
+        """Route to Azure or the local indexes; ``q_vecs`` are encoded here if not given."""
+        if self._search_client:
+            if q_vecs is None and mode != "keyword":
+                q_vecs = self._encode_queries(queries)
+            return [
+                self._search_azure(q, top_k, mode, filters, None if q_vecs is None else q_vecs[i])
+                for i, q in enumerate(queries)
+            ]
+        return self._search_local_batch(queries, top_k, mode, filters, q_vecs)
+
+    async def _search_async(self, queries: list[str], top_k: int, mode: str, filters: Optional[SearchFilters],
+                            q_vecs: Optional[np.ndarray]) -> list[list[PaperSearchResult]]:
+        """Azure queries run concurrently on the event loop; local scoring runs in the
+        default executor so it does not block the loop."""
+        if self._async_search_client is not None:
+            return list(await asyncio.gather(*(
+                self._search_azure_async(q, top_k, mode, filters, None if q_vecs is None else q_vecs[i])
+                for i, q in enumerate(queries)
+            )))
+        return await asyncio.to_thread(self._search, queries, top_k, mode, filters, q_vecs)
+
+    async def _search_azure_async(self, query: str, top_k: int, mode: str, filters: Optional[SearchFilters],
+                                  q_vec: Optional[np.ndarray]) -> list[PaperSearchResult]:
+        """``_search_azure`` through the asyncio client."""
+        client = self._async_search_client
+        odata = None if is_empty(filters) else to_odata(filters)
+        with phase("azure"):
+            if mode == "keyword":
+                hits = await client.search_text(query, top_k=top_k, filter=odata)
+            elif mode == "vector":
+                hits = await client.search_vector(q_vec.tolist(), top_k=top_k, filter=odata)
+            else:
+                hits = await client.search_hybrid(query, q_vec.tolist(), top_k=top_k, filter=odata)
+        return self._azure_results(hits)
+
+    def _search_azure(self, query: str, top_k: int, mode: str, filters: Optional[SearchFilters],
+                      q_vec: Optional[np.ndarray]) -> list[PaperSearchResult]:
+        """Search via Azure AI Search (text, vector or both); filters become OData."""
+        odata = None if is_empty(filters) else to_odata(filters)
+        with phase("azure"):
+            if mode == "keyword":
+                hits = self._search_client.search_text(query, top_k=top_k, filter=odata)
+            else:
+                embedding = q_vec.tolist()
+                if mode == "vector":
+                    hits = self._search_client.search_vector(embedding, top_k=top_k, filter=odata)
+                else:
+                    hits = self._search_client.search_hybrid(query, embedding, top_k=top_k, filter=odata)
+        return self._azure_results(hits)
+
+    @staticmethod
+    def _azure_results(hits: list[dict]) -> list[PaperSearchResult]:
         results = []
-        for hit in hits:
-            summary = None
-            if hit.get("research_question"):
-                summary = PaperSummary(
-                    research_question=hit.get("research_question", ""),
-                    methodology=hit.get("methodology", ""),
-                    key_findings=hit.get("key_findings", []),
-                    contributions=hit.get("contributions", ""),
-                    limitations=hit.get("limitations", ""),
-                )
-            results.append(PaperSearchResult(
-                paper_id=hit["paper_id"],
-                title=hit.get("title", ""),
-                authors=hit.get("authors", []),
-                abstract=hit.get("abstract"),
-                summary=summary,
-                topics=hit.get("topics", []),
-                score=hit.get("score", 0.0),
-            ))
+        with phase("results"):
+            for hit in hits:
+                summary = None
+                if hit.get("research_question"):
+                    summary = PaperSummary(
+                        research_question=hit.get("research_question", ""),
+                        methodology=hit.get("methodology", ""),
+                        key_findings=hit.get("key_findings", []),
+                        contributions=hit.get("contributions", ""),
+                        limitations=hit.get("limitations", ""),
+                    )
+                results.append(PaperSearchResult(
+                    paper_id=hit["paper_id"],
+                    title=hit.get("title", ""),
+                    authors=hit.get("authors", []),
+                    abstract=hit.get("abstract"),
+                    summary=summary,
+                    topics=hit.get("topics", []),
+                    categories=hit.get("categories") or [],
+                    published=hit.get("published"),
+                    score=hit.get("score", 0.0),
+                ))
         return results
 
-    def _search_local(self, query: str, top_k: int) -> list[PaperSearchResult]:
-        """In-memory cosine similarity search (fallback)."""
-        if self._embeddings is None or not self._paper_ids:
-            return []
+    def _search_local_batch(self, queries: list[str], top_k: int, mode: str, filters: Optional[SearchFilters],
+                            q_vecs: Optional[np.ndarray]) -> list[list[PaperSearchResult]]:
+        """Rank queries against the local vector and keyword indexes of one snapshot.
+
+        In hybrid mode both rankings are cut at ``Config.HYBRID_DEPTH`` and fused
+        with reciprocal rank fusion; results then carry the fused score. Filters
+        are resolved to the matching papers first and only those are scored.
+        """
+        snapshot = self._snapshot
+        depth = max(top_k, Config.HYBRID_DEPTH) if mode == "hybrid" else top_k
+
+        allowed, candidate_rows = None, None
+        if not is_empty(filters) and snapshot.filters is not None:
+            with phase("filter"):
+                allowed = snapshot.filters.matching(filters)
+                if not allowed:
+                    return [[] for _ in queries]
+                live = [snapshot.row_of[pid] for pid in allowed if pid in snapshot.row_of]
+                candidate_rows = np.sort(np.asarray(live, dtype=np.intp))
+
+        vector_hits: list[list[tuple[str, float]]] = [[] for _ in queries]
+        if mode != "keyword" and snapshot.index is not None and snapshot.row_of:
+            if q_vecs is None:
+                q_vecs = self._encode_queries(queries)
+            with phase("vector"):
+                scores, rows = snapshot.index.search(q_vecs, depth, candidate_rows)
+                vector_hits = [
+                    [(snapshot.row_ids[i], float(s)) for s, i in zip(row_scores, row_idx) if i >= 0]
+                    for row_scores, row_idx in zip(scores, rows)
+                ]
 
-        model = _load_embedding_model()
-        q_vec = model.encode(query).astype(np.float32)
-        q_vec = q_vec / (np.linalg.norm(q_vec) + 1e-8)
-
-        scores = self._embeddings @ q_vec
-        top_idx = np.argsort(scores)[::-1][:top_k]
-
-        return [
-            PaperSearchResult(
-                paper_id=(p := self.papers[self._paper_ids[i]]).paper_id,
-                title=p.title,
-                authors=p.authors,
-                abstract=p.abstract,
-                summary=p.summary,
-                topics=p.topics,
-                score=float(scores[i]),
-            )
-            for i in top_idx
-        ]
+        keyword_hits: list[list[tuple[str, float]]] = [[] for _ in queries]
+        if mode != "vector" and snapshot.keywords is not None:
+            with phase("keyword"):
+                keyword_hits = [snapshot.keywords.search(q, depth, allowed) for q in queries]
+
+        if mode == "hybrid":
+            with phase("fuse"):
+                ranked = [
+                    reciprocal_rank_fusion([[pid for pid, _ in vec], [pid for pid, _ in kw]], k=Config.RRF_K)
+                    for vec, kw in zip(vector_hits, keyword_hits)
+                ]
+        else:
+            ranked = [vec or kw for vec, kw in zip(vector_hits, keyword_hits)]
+
+        with phase("results"):
+            return [[self._to_result(snapshot, pid, score) for pid, score in hits[:top_k]] for hits in ranked]
+
+    def _encode_queries(self, queries: list[str]) -> np.ndarray:
+        """Encode queries into an L2-normalized ``(len(queries), dim)`` float32 matrix.
+
+        Vectors are cached by normalized query text; only uncached queries reach the model.
+        """
+        with phase("encode"):
+            return np.stack([future.result() for future in self._query_futures(queries)])
+
+    async def _encode_queries_async(self, queries: list[str]) -> np.ndarray:
+        with phase("encode"):
+            futures = self._query_futures(queries)
+            return np.stack(await asyncio.gather(*(asyncio.wrap_future(f) for f in futures)))
+
+    def _query_futures(self, queries: list[str]) -> list[Future]:
+        """Vectors are cached by normalized query text; only uncached queries go to
+        the batching encoder, where they share a model call with concurrent requests."""
+        keys = [_query_key(q) for q in queries]
+        return self._query_vectors.get_or_submit_many(keys, self._encoder.submit)
+
+    @staticmethod
+    def _to_result(snapshot: _Snapshot, paper_id: str, score: float) -> PaperSearchResult:
+        p = snapshot.papers[paper_id]
+        return PaperSearchResult(
+            paper_id=p.paper_id,
+            title=p.title,
+            authors=p.authors,
+            abstract=p.abstract,
+            summary=p.summary,
+            topics=p.topics,
+            categories=p.categories,
+            published=p.published,
+            score=score,
+        )
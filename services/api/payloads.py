@@ -0,0 +1,90 @@
+import gzip
+import json
+from typing import Optional
+
+from data_contracts.paper import EnrichedPaper
+from services.api.catalog import CatalogEntry
+
+try:
+    import brotli
+except ImportError:  # optional: gzip alone still covers every client
+    brotli = None
+
+# Below this size compression saves less than the headers and CPU it costs.
+_MIN_COMPRESS_BYTES = 1024
+# Lazy payloads are compressed on the request path, so they trade some ratio for speed.
+_LAZY_GZIP_LEVEL = 5
+_LAZY_BROTLI_QUALITY = 4
+
+
+class Payload:
+    """A response body serialized once, with its compressed variants alongside.
+
+    Variants are compressed up front at the highest levels, which pays off for
+    bodies served many times (summaries). A ``lazy`` payload instead compresses
+    at faster levels, only into the encodings clients actually ask for.
+    """
+
+    __slots__ = ("body", "gzip", "br", "_lazy")
+
+    def __init__(self, body: bytes, lazy: bool = False):
+        self.body = body
+        self.gzip: Optional[bytes] = None
+        self.br: Optional[bytes] = None
+        self._lazy = lazy and len(body) >= _MIN_COMPRESS_BYTES
+        if len(body) >= _MIN_COMPRESS_BYTES and not lazy:
+            self.gzip = gzip.compress(body, compresslevel=9, mtime=0)
+            if brotli is not None:
+                self.br = brotli.compress(body, quality=9)
+
+    @classmethod
+    def from_variants(cls, body: bytes | memoryview, gzip_body: Optional[bytes | memoryview],
+                      br_body: Optional[bytes | memoryview]) -> "Payload":
+        """A payload around variants compressed earlier, e.g. views of shared memory."""
+        payload = cls.__new__(cls)
+        payload.body, payload.gzip, payload.br, payload._lazy = body, gzip_body, br_body, False
+        return payload
+
+    def select(self, accept_encoding: Optional[str]) -> tuple[bytes, Optional[str]]:
+        """The smallest variant the client accepts, and its ``Content-Encoding``."""
+        accepted = accepted_encodings(accept_encoding)
+        # Concurrent requests may both compress a lazy variant; they store equal bytes.
+        if "br" in accepted and (self.br is not None or self._lazy and brotli is not None):
+            if self.br is None:
+                self.br = brotli.compress(self.body, quality=_LAZY_BROTLI_QUALITY)
+            return self.br, "br"
+        if "gzip" in accepted and (self.gzip is not None or self._lazy):
+            if self.gzip is None:
+                self.gzip = gzip.compress(self.body, compresslevel=_LAZY_GZIP_LEVEL, mtime=0)
+            return self.gzip, "gzip"
+        return self.body, None
+
+
+def accepted_encodings(accept_encoding: Optional[str]) -> set[str]:
+    """Codings listed in an ``Accept-Encoding`` header with a non-zero q-value."""
+    accepted, refused = set(), set()
+    for part in (accept_encoding or "").split(","):
+        coding, _, params = part.partition(";")
+        coding = coding.strip().lower()
+        q = 1.0
+        name, _, value = params.strip().partition("=")
+        if name.strip() == "q":
+            try:
+                q = float(value)
+            except ValueError:
+                q = 0.0
+        if coding:
+            (accepted if q > 0 else refused).add(coding)
+    if "*" in accepted:
+        accepted.update({"gzip", "br"} - refused)
+    return accepted
+
+
+def detail_payload(paper: EnrichedPaper) -> Payload:
+    # Detail bodies carry clean_text and are mostly read once: compress on demand.
+    return Payload(paper.model_dump_json(exclude={"embedding"}).encode("utf-8"), lazy=True)
+
+
+def summary_payload(entry: CatalogEntry) -> Payload:
+    body = {"paper_id": entry.paper_id, "title": entry.title, "summary": entry.summary.model_dump()}
+    return Payload(json.dumps(body, separators=(",", ":")).encode("utf-8"))
@@ -0,0 +1,127 @@
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from types import CodeType
+
+# One capture at a time: overlapping samplers would profile each other, and
+# tracemalloc is process-wide.
+_busy = threading.Lock()
+
+
+class ProfilerBusy(RuntimeError):
+    """Another capture is already running in this process."""
+
+
+# Innermost Python frames of threads parked in a blocking call: lock and
+# condition waits (Event, Queue), selector polls (event loops, servers) and
+# socket reads. Their samples measure wall-clock idling, not CPU.
+_IDLE_FRAMES = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("selectors.py", "select"),
+    ("socket.py", "accept"),
+    ("socket.py", "readinto"),
+}
+
+
+def _label(code: CodeType) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _is_idle(code: CodeType) -> bool:
+    return (os.path.basename(code.co_filename), code.co_name) in _IDLE_FRAMES
+
+
+def sample_stacks(seconds: float, interval: float = 0.01) -> Counter:
+    """Sample every running thread's Python stack each ``interval`` for ``seconds``.
+
+    Returns sample counts keyed by ``(thread name, outermost frame, ..., innermost
+    frame)``. Threads blocked in a known wait (see ``_IDLE_FRAMES``) are skipped,
+    so the counts approximate CPU time rather than wall-clock time. Sampling
+    reads frames from a separate thread, so the traffic being profiled runs
+    unmodified; only the sampler's own wake-ups cost anything.
+    """
+    if not _busy.acquire(blocking=False):
+        raise ProfilerBusy("A profile is already being captured")
+    try:
+        me = threading.get_ident()
+        names: dict[int, str] = {}
+        stacks: Counter = Counter()
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            for ident, frame in sys._current_frames().items():
+                if ident == me or _is_idle(frame.f_code):
+                    continue
+                if ident not in names:
+                    names = {t.ident: t.name for t in threading.enumerate()}
+                stack = []
+                while frame is not None:
+                    stack.append(_label(frame.f_code))
+                    frame = frame.f_back
+                stacks[(names.get(ident, f"thread-{ident}"), *reversed(stack))] += 1
+            time.sleep(interval)
+        return stacks
+    finally:
+        _busy.release()
+
+
+def collapsed(stacks: Counter) -> str:
+    """Brendan Gregg's collapsed format (``a;b;c count``), for flamegraph.pl or speedscope."""
+    return "".join(f"{';'.join(stack)} {count}\n" for stack, count in stacks.most_common())
+
+
+def top_functions(stacks: Counter, limit: int = 50) -> str:
+    """Functions by samples spent in them (self) and under them (total)."""
+    own: Counter = Counter()
+    total: Counter = Counter()
+    for stack, count in stacks.items():
+        frames = stack[1:]
+        if frames:
+            own[frames[-1]] += count
+        for frame in set(frames):
+            total[frame] += count
+    samples = sum(stacks.values()) or 1
+    lines = [f"{'self%':>7} {'total%':>7} {'self':>7} {'total':>7}  function"]
+    for frame, count in own.most_common(limit):
+        lines.append(f"{100 * count / samples:7.1f} {100 * total[frame] / samples:7.1f} "
+                     f"{count:7d} {total[frame]:7d}  {frame}")
+    return "\n".join(lines) + "\n"
+
+
+def allocation_snapshot(seconds: float, group_by: str = "lineno", limit: int = 50, frames: int = 1) -> str:
+    """Top allocators of memory allocated during the next ``seconds`` and still held.
+
+    Tracing starts here (unless already on) and stops afterwards; while it runs
+    every allocation pays tracemalloc's bookkeeping, so keep the window short.
+    """
+    if not _busy.acquire(blocking=False):
+        raise ProfilerBusy("A profile is already being captured")
+    try:
+        started = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start(max(frames, 1))
+        try:
+            time.sleep(seconds)
+            snapshot = tracemalloc.take_snapshot()
+        finally:
+            if started:
+                tracemalloc.stop()
+    finally:
+        _busy.release()
+
+    snapshot = snapshot.filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    ])
+    stats = snapshot.statistics(group_by)
+    lines = [f"{'size_kib':>10} {'blocks':>8}  location"]
+    for stat in stats[:limit]:
+        where = stat.traceback.format()
+        lines.append(f"{stat.size / 1024:10.1f} {stat.count:8d}  {where[0].strip() if where else '?'}")
+        lines.extend(f"{'':20}{line.strip()}" for line in where[1:] if line.strip())
+    total = sum(stat.size for stat in stats)
+    lines.append(f"{total / 1024:10.1f} {sum(stat.count for stat in stats):8d}  total ({len(stats)} locations)")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,75 @@
+import hmac
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+
+from data_contracts.paper import EnrichedPaper
+from services.api.config import Config
+from services.api.profiling import ProfilerBusy, allocation_snapshot, collapsed, sample_stacks, top_functions
+from services.api.routes.papers import store
+
+
+def require_admin_token(x_admin_token: str = Header(default="")) -> None:
+    if not Config.ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin API is disabled")
+    if not hmac.compare_digest(x_admin_token, Config.ADMIN_TOKEN):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin_token)])
+
+
+@router.put("/papers/{paper_id}")
+def ingest_paper(paper_id: str, paper: EnrichedPaper) -> dict:
+    """Add or replace an enriched paper and publish it to the live index."""
+    if paper.paper_id != paper_id:
+        raise HTTPException(status_code=400, detail="paper_id in path and body differ")
+    version = store.upsert_paper(paper)
+    return {"paper_id": paper_id, "version": version}
+
+
+@router.delete("/papers/{paper_id}")
+def delete_paper(paper_id: str) -> dict:
+    """Remove a paper from disk and from the live index."""
+    if not store.delete_paper(paper_id):
+        raise HTTPException(status_code=404, detail="Paper not found")
+    return {"paper_id": paper_id, "version": store.version}
+
+
+@router.post("/refresh")
+def refresh_papers() -> dict:
+    """Rescan the enriched papers directory now instead of waiting for the watcher."""
+    changed = store.refresh()
+    return {"changed": changed, "version": store.version}
+
+
+@router.post("/profile/cpu", response_class=PlainTextResponse)
+def profile_cpu(
+    seconds: float = Query(10.0, gt=0, le=120),
+    interval_ms: float = Query(10.0, ge=1, le=1000),
+    format: str = Query("collapsed", pattern="^(collapsed|top)$"),
+    limit: int = Query(50, ge=1, le=1000),
+) -> str:
+    """Sample the stacks of all running (not idle) threads while live traffic runs.
+
+    ``collapsed`` feeds flamegraph.pl or speedscope; ``top`` is a self/total table.
+    """
+    try:
+        stacks = sample_stacks(seconds, interval_ms / 1000)
+    except ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return collapsed(stacks) if format == "collapsed" else top_functions(stacks, limit)
+
+
+@router.post("/profile/memory", response_class=PlainTextResponse)
+def profile_memory(
+    seconds: float = Query(10.0, gt=0, le=120),
+    group_by: str = Query("lineno", pattern="^(lineno|filename|traceback)$"),
+    limit: int = Query(50, ge=1, le=1000),
+    frames: int = Query(1, ge=1, le=50),
+) -> str:
+    """Top allocators of memory allocated during the window and still held at its end."""
+    try:
+        return allocation_snapshot(seconds, group_by, limit, frames)
+    except ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
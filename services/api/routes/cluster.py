@@ -0,0 +1,48 @@
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request
+
+from services.api.cluster import ScatterGather
+from services.api.config import Config
+
+router = APIRouter(prefix="/cluster", tags=["cluster"])
+coordinator = ScatterGather(Config.SHARD_URLS, Config.SHARD_TIMEOUT)
+
+
+@router.get("/search")
+async def search_cluster(
+    request: Request,
+    q: str = Query(..., min_length=1),
+    top_k: int = Query(5, ge=1, le=50),
+    mode: Optional[str] = Query(None, pattern="^(hybrid|vector|keyword)$"),
+    topic: list[str] = Query([]),
+    author: list[str] = Query([]),
+    category: list[str] = Query([]),
+    published_from: Optional[date] = None,
+    published_to: Optional[date] = None,
+) -> dict:
+    """``/papers/search`` over every shard in ``API_SHARD_URLS``.
+
+    The query goes to every shard and their top-k lists are merged by score.
+    Hybrid queries are fused here from the globally merged vector and keyword
+    rankings. Vector results match a single node exactly. BM25 scores use
+    shard-local term statistics, so keyword ranks are approximate. Shards that
+    fail or miss ``API_SHARD_TIMEOUT`` are listed in ``failed_shards``. Results
+    are then partial, and ``503`` is returned only when no shard answered.
+    """
+    if not coordinator.urls:
+        raise HTTPException(status_code=404, detail="No shards configured")
+    # Shards cap top_k at 50, which bounds the depth of each hybrid ranking.
+    depth = min(max(top_k, Config.HYBRID_DEPTH), 50)
+    results, failed = await coordinator.search(request.query_params.multi_items(), top_k,
+                                               mode or Config.SEARCH_MODE, depth, Config.RRF_K)
+    if len(failed) == len(coordinator.urls):
+        raise HTTPException(status_code=503, detail="No shard answered", headers={"Retry-After": "1"})
+    return {
+        "query": q,
+        "results": results,
+        "shards": len(coordinator.urls),
+        "failed_shards": failed,
+        "partial": bool(failed),
+    }
@@ -1,4 +1,7 @@
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from services.api.routes import papers
 
 router = APIRouter()
 
@@ -6,3 +9,12 @@ router = APIRouter()
 @router.get("/health")
 def health_check():
     return {"status": "healthy"}
+
+
+@router.get("/ready")
+def readiness_check():
+    """Ready once papers are loaded and search has been warmed up; 503 until then."""
+    store = papers.store
+    if not store.ready:
+        return JSONResponse(status_code=503, content={"status": "loading"})
+    return {"status": "ready", "papers": len(store.papers), "version": store.version}
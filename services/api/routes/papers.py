@@ -1,52 +1,155 @@
-from fastapi import APIRouter, HTTPException, Query
+from datetime import date
+from typing import Optional
 
+from fastapi import APIRouter, Header, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+
+from data_contracts.paper import BatchSearchRequest, SearchFilters
+from services.api.admission import AdmissionLimiter, AdmissionRejected
+from services.api.config import Config
+from services.api.export import parse_export_fields
+from services.api.inference import EncoderOverloaded
+from services.api.listing import etag_matches, parse_fields
+from services.api.payloads import Payload
 from services.api.paper_store import PaperStore
 
 router = APIRouter(prefix="/papers", tags=["papers"])
 store = PaperStore()
+# Searches encode and score on the thread pool; bounding them keeps cheap routes responsive.
+search_admission = AdmissionLimiter("search", Config.SEARCH_CONCURRENCY, Config.SEARCH_QUEUE_SIZE,
+                                    Config.SEARCH_QUEUE_TIMEOUT)
+
+
+def _shed(e: AdmissionRejected) -> HTTPException:
+    return HTTPException(status_code=e.status_code, detail=str(e), headers={"Retry-After": str(e.retry_after)})
 
 
 @router.get("/")
-def list_papers() -> list[dict]:
-    """List all papers with basic metadata."""
-    return [
-        {
-            "paper_id": p.paper_id,
-            "title": p.title,
-            "authors": p.authors,
-            "topics": p.topics,
-            "status": p.status,
-        }
-        for p in store.list_papers()
-    ]
+def list_papers(
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    fields: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None),
+) -> Response:
+    """List papers with basic metadata, ordered by paper_id.
+
+    Pass ``limit`` to paginate; the next page's cursor is in the ``X-Next-Cursor``
+    header. ``fields`` is a comma-separated subset of the listing fields. Responses
+    carry a strong ETag and honour ``If-None-Match`` with ``304 Not Modified``.
+    """
+    try:
+        page = store.listing_page(cursor, limit, parse_fields(fields))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    headers = {"ETag": page.etag, "Cache-Control": "no-cache"}
+    if page.next_cursor:
+        headers["X-Next-Cursor"] = page.next_cursor
+    if etag_matches(if_none_match, page.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=page.body, media_type="application/json", headers=headers)
+
+
+@router.get("/export")
+def export_papers(fields: Optional[str] = None, embeddings: bool = False) -> StreamingResponse:
+    """Stream every paper as NDJSON (one JSON object per line), ordered by paper_id.
+
+    ``fields`` is a comma-separated subset of the export fields; ``clean_text``
+    is left out unless asked for. With ``embeddings=true`` each line also
+    carries ``embedding``: base64 of the L2-normalized little-endian float32 vector. The whole
+    export reflects one store version, however long it takes to read.
+    """
+    try:
+        selected = parse_export_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return StreamingResponse(store.export(selected, embeddings=embeddings), media_type="application/x-ndjson")
 
 
 @router.get("/search")
-def search_papers(q: str = Query(..., min_length=1), top_k: int = Query(5, ge=1, le=50)) -> dict:
-    """Semantic search over papers by natural-language query."""
-    results = store.search(q, top_k=top_k)
+async def search_papers(
+    q: str = Query(..., min_length=1),
+    top_k: int = Query(5, ge=1, le=50),
+    mode: Optional[str] = Query(None, pattern="^(hybrid|vector|keyword)$"),
+    topic: list[str] = Query([]),
+    author: list[str] = Query([]),
+    category: list[str] = Query([]),
+    published_from: Optional[date] = None,
+    published_to: Optional[date] = None,
+) -> dict:
+    """Search papers by natural-language query.
+
+    ``mode`` picks hybrid (keyword and semantic rankings fused), vector or keyword
+    search; the server default applies when it is omitted. ``topic``, ``author``
+    and ``category`` may be repeated (any value matches) and combine with the
+    ``published_from``/``published_to`` dates; only matching papers are scored.
+
+    Under overload the request is shed with ``429`` (queue full) or ``503``
+    (queued too long), both carrying ``Retry-After``.
+    """
+    filters = SearchFilters(topics=topic, authors=author, categories=category,
+                            published_from=published_from, published_to=published_to)
+    try:
+        async with search_admission.slot():
+            results = await store.search_async(q, top_k=top_k, mode=mode, filters=filters)
+    except AdmissionRejected as e:
+        raise _shed(e)
+    except EncoderOverloaded as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
     if not results:
         return {"query": q, "results": [], "message": "No papers indexed yet"}
     return {"query": q, "results": [r.model_dump() for r in results]}
 
 
+@router.post("/search/batch")
+async def search_papers_batch(request: BatchSearchRequest) -> dict:
+    """Semantic search for many queries in one request (one encode, one scoring pass)."""
+    try:
+        async with search_admission.slot():
+            batches = await store.search_batch_async(request.queries, top_k=request.top_k, mode=request.mode,
+                                                     filters=request.filters)
+    except AdmissionRejected as e:
+        raise _shed(e)
+    except EncoderOverloaded as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    return {
+        "results": [
+            {"query": q, "results": [r.model_dump() for r in results]}
+            for q, results in zip(request.queries, batches)
+        ]
+    }
+
+
+def _send(payload: Payload, accept_encoding: Optional[str]) -> Response:
+    body, encoding = payload.select(accept_encoding)
+    headers = {"Vary": "Accept-Encoding"}
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
 @router.get("/{paper_id}")
-def get_paper(paper_id: str) -> dict:
+def get_paper(paper_id: str, accept_encoding: Optional[str] = Header(None)) -> Response:
     """Get full paper details (excluding raw embedding vector)."""
-    paper = store.get_paper(paper_id)
-    if not paper:
+    payload = store.detail_payload(paper_id)
+    if payload is None:
         raise HTTPException(status_code=404, detail="Paper not found")
-    return paper.model_dump(exclude={"embedding"})
+    return _send(payload, accept_encoding)
+
+
+@router.get("/{paper_id}/similar")
+def get_similar_papers(paper_id: str, top_k: int = Query(5, ge=1, le=50)) -> dict:
+    """Papers most similar to this one, from its stored embedding (no model call)."""
+    results = store.similar(paper_id, top_k=top_k)
+    if results is None:
+        raise HTTPException(status_code=404, detail="Paper not found")
+    return {"paper_id": paper_id, "results": [r.model_dump() for r in results]}
 
 
 @router.get("/{paper_id}/summary")
-def get_paper_summary(paper_id: str) -> dict:
+def get_paper_summary(paper_id: str, accept_encoding: Optional[str] = Header(None)) -> Response:
     """Get just the AI-generated summary for a paper."""
-    paper = store.get_paper(paper_id)
-    if not paper:
+    payload = store.summary_payload(paper_id)
+    if payload is None:
         raise HTTPException(status_code=404, detail="Paper not found")
-    return {
-        "paper_id": paper.paper_id,
-        "title": paper.title,
-        "summary": paper.summary.model_dump(),
-    }
+    return _send(payload, accept_encoding)
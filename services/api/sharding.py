@@ -0,0 +1,20 @@
+import hashlib
+
+from services.api.config import Config
+
+
+def shard_of(paper_id: str, count: int) -> int:
+    """The shard that owns ``paper_id``. The value is stable across processes and
+    restarts, which the salted built-in ``hash`` is not."""
+    digest = hashlib.blake2b(paper_id.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little") % count
+
+
+def owns(paper_id: str) -> bool:
+    """Whether this node's shard (``Config.SHARD_INDEX`` of ``SHARD_COUNT``) owns the paper.
+
+    Enriched files and embedding store rows are both partitioned by paper_id.
+    File names come from the extractor and need not match it, so every shard
+    reads each file once and keeps the papers it owns.
+    """
+    return Config.SHARD_COUNT <= 1 or shard_of(paper_id, Config.SHARD_COUNT) == Config.SHARD_INDEX
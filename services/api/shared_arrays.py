@@ -0,0 +1,92 @@
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import shutil
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_META_FILE = "meta.json"
+
+
+@contextmanager
+def loader_lock(directory: str, name: str = ".lock") -> Iterator[None]:
+    """Hold the directory's exclusive lock ``name`` while loading.
+
+    Worker processes that start together queue up here: the first one builds and
+    publishes, the others find the published arrays once the lock is theirs.
+    """
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, name), "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        yield
+
+
+def content_key(kind: str, *parts: bytes | str) -> str:
+    """Name for a set of arrays derived from exactly these inputs."""
+    h = hashlib.sha1()
+    for part in parts:
+        h.update(part.encode("utf-8") if isinstance(part, str) else part)
+        h.update(b"\0")
+    return f"{kind}-{h.hexdigest()}"
+
+
+def publish(directory: str, key: str, arrays: dict[str, np.ndarray], meta: Optional[dict] = None) -> None:
+    """Write ``arrays`` as ``.npy`` files under ``directory/key`` and drop older sets of the same kind.
+
+    Workers still mapping a dropped set keep reading it: unlinked files stay
+    valid until their last mapping goes away.
+    """
+    final = os.path.join(directory, key)
+    if os.path.isdir(final):
+        return
+    tmp = f"{final}.{os.getpid()}.tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    for name, array in arrays.items():
+        np.save(os.path.join(tmp, f"{name}.npy"), np.ascontiguousarray(array), allow_pickle=False)
+    with open(os.path.join(tmp, _META_FILE), "w", encoding="utf-8") as f:
+        json.dump(meta or {}, f)
+    os.replace(tmp, final)
+
+    kind = key.rsplit("-", 1)[0]
+    for name in os.listdir(directory):
+        if name != key and name.rsplit("-", 1)[0] == kind and not name.endswith(".tmp"):
+            shutil.rmtree(os.path.join(directory, name), ignore_errors=True)
+    logger.info(f"Published {len(arrays)} shared arrays as {key}")
+
+
+def attach(directory: str, key: str) -> Optional[tuple[dict[str, np.ndarray], dict]]:
+    """Memory-map a published set read-only, or ``None`` if it is missing."""
+    path = os.path.join(directory, key)
+    try:
+        with open(os.path.join(path, _META_FILE), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        arrays = {
+            name[:-4]: np.load(os.path.join(path, name), mmap_mode="r", allow_pickle=False)
+            for name in os.listdir(path) if name.endswith(".npy")
+        }
+    except (OSError, ValueError) as e:
+        if not isinstance(e, FileNotFoundError):
+            logger.warning(f"Failed to attach shared arrays {key}: {e}")
+        return None
+    return arrays, meta
+
+
+def pack_blobs(blobs: list[Optional[bytes]]) -> dict[str, np.ndarray]:
+    """Concatenate byte strings into one array plus offsets (``None`` packs as empty)."""
+    lengths = np.fromiter((len(b) if b else 0 for b in blobs), dtype=np.int64, count=len(blobs))
+    offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+    data = np.frombuffer(b"".join(b for b in blobs if b), dtype=np.uint8)
+    return {"data": data, "offsets": offsets}
+
+
+def unpack_blobs(arrays: dict[str, np.ndarray]) -> list[Optional[memoryview]]:
+    """Zero-copy views of the blobs packed by ``pack_blobs``; empty ones come back as ``None``."""
+    data, offsets = memoryview(arrays["data"]), arrays["offsets"].tolist()
+    return [data[lo:hi] if hi > lo else None for lo, hi in zip(offsets[:-1], offsets[1:])]
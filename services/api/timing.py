@@ -0,0 +1,39 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from services.api.metrics import SEARCH_PHASE_LATENCY
+
+# Phase durations (seconds) of the request being served. The dict is shared, not
+# copied, by threads and tasks started from the request, so their phases add up here.
+_request_phases: ContextVar[Optional[dict[str, float]]] = ContextVar("request_phases", default=None)
+
+
+def start_request() -> dict[str, float]:
+    """Begin collecting phases for the current request; returns the live dict."""
+    phases: dict[str, float] = {}
+    _request_phases.set(phases)
+    return phases
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """Time a block into the ``phase`` histogram and the current request's breakdown."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        SEARCH_PHASE_LATENCY.labels(phase=name).observe(elapsed)
+        phases = _request_phases.get()
+        if phases is not None:
+            phases[name] = phases.get(name, 0.0) + elapsed
+
+
+def server_timing(phases: dict[str, float], total: Optional[float] = None) -> str:
+    """A ``Server-Timing`` header value, durations in milliseconds."""
+    entries = [f"{name};dur={seconds * 1000:.2f}" for name, seconds in phases.items()]
+    if total is not None:
+        entries.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(entries)
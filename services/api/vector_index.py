@@ -0,0 +1,565 @@
+import copy
+import hashlib
+import logging
+import os
+import time
+from typing import Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on the (queries x rows) score block materialized at once.
+_MAX_SCORE_BLOCK = 16_000_000
+# k-means trains on at most this many rows per list, and never more than _MAX_TRAIN_ROWS.
+_TRAIN_ROWS_PER_LIST = 64
+_MAX_TRAIN_ROWS = 131_072
+# Rows whose vectors enter a fingerprint; hashing every row of a large store would
+# dominate a worker's start-up.
+_FINGERPRINT_ROWS = 4096
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the ``k`` highest scores along the last axis, best first."""
+    k = min(k, scores.shape[-1])
+    if k <= 0:
+        return np.empty(scores.shape[:-1] + (0,), dtype=np.intp)
+    if k < scores.shape[-1]:
+        idx = np.argpartition(-scores, k - 1, axis=-1)[..., :k]
+    else:
+        idx = np.broadcast_to(np.arange(k), scores.shape[:-1] + (k,))
+    order = np.argsort(-np.take_along_axis(scores, idx, axis=-1), axis=-1, kind="stable")
+    return np.take_along_axis(idx, order, axis=-1)
+
+
+def fingerprint(paper_ids: list[str], matrix: np.ndarray) -> str:
+    """Identify the exact corpus an index was built from.
+
+    Covers the shape, every id in row order and the vectors of up to
+    ``_FINGERPRINT_ROWS`` evenly spaced rows (first and last included). Store
+    rows are append-only, so new or re-embedded papers change the ids; the
+    sampled vectors tell apart stores with the same ids but different vectors,
+    e.g. a corpus re-embedded with another model.
+    """
+    h = hashlib.sha1(f"{matrix.shape}".encode())
+    for pid in paper_ids:
+        h.update(pid.encode("utf-8"))
+        h.update(b"\0")
+    if matrix.shape[0]:
+        n = matrix.shape[0]
+        rows = np.unique(np.linspace(0, n - 1, min(n, _FINGERPRINT_ROWS)).astype(np.intp))
+        h.update(np.ascontiguousarray(matrix[rows], dtype=np.float32).tobytes())
+    return h.hexdigest()
+
+
+class RowBuffer:
+    """Append-only array with amortized growth.
+
+    ``append`` writes past the end of earlier views and returns a new view, so
+    a reader holding an older view never sees rows change underneath it.
+    """
+
+    def __init__(self, initial: np.ndarray, spare: Optional[int] = None):
+        n = initial.shape[0]
+        spare = max(1024, n // 8) if spare is None else spare
+        self._buf = np.empty((n + spare,) + initial.shape[1:], dtype=initial.dtype)
+        self._buf[:n] = initial
+        self._n = n
+
+    def view(self) -> np.ndarray:
+        return self._buf[:self._n]
+
+    def append(self, rows: np.ndarray) -> np.ndarray:
+        end = self._n + rows.shape[0]
+        if end > self._buf.shape[0]:
+            grown = np.empty((max(end, self._buf.shape[0] * 3 // 2),) + self._buf.shape[1:], dtype=self._buf.dtype)
+            grown[:self._n] = self._buf[:self._n]
+            self._buf = grown
+        self._buf[self._n:end] = rows
+        self._n = end
+        return self.view()
+
+
+class QuantizedVectors:
+    """Compressed copy of the matrix used for first-pass scoring.
+
+    ``int8`` stores each dimension scaled by its own max-abs value (4x smaller);
+    ``float16`` halves the size with almost no ranking change.
+    """
+
+    # Rows decoded to float32 per matmul; bounds the temporary copy.
+    _CHUNK_ROWS = 65_536
+
+    def __init__(self, mode: str, codes: np.ndarray, scale: Optional[np.ndarray] = None,
+                 buffer: Optional[RowBuffer] = None):
+        self.mode = mode
+        self.codes = codes
+        self.scale = scale
+        self._buffer = buffer
+
+    def _encode(self, rows: np.ndarray) -> np.ndarray:
+        if self.scale is None:
+            return rows.astype(np.float16)
+        return np.clip(np.rint(rows / self.scale), -127, 127).astype(np.int8)
+
+    def extended(self, rows: np.ndarray) -> "QuantizedVectors":
+        """Codes for the current rows plus ``rows``, encoded with the existing scale."""
+        if self._buffer is None:
+            self._buffer = RowBuffer(self.codes)
+        return QuantizedVectors(self.mode, self._buffer.append(self._encode(rows)), self.scale, self._buffer)
+
+    def remapped(self, matrix: np.ndarray, old_rows: np.ndarray) -> "QuantizedVectors":
+        """Codes for ``matrix`` whose row ``i`` is the receiver's row ``old_rows[i]`` (``-1``: encode anew)."""
+        codes = np.empty((len(old_rows),) + self.codes.shape[1:], dtype=self.codes.dtype)
+        mapped = old_rows >= 0
+        codes[mapped] = self.codes[old_rows[mapped]]
+        fresh = np.flatnonzero(~mapped)
+        if len(fresh):
+            codes[fresh] = self._encode(np.asarray(matrix[fresh]))
+        return QuantizedVectors(self.mode, codes, self.scale)
+
+    @classmethod
+    def from_matrix(cls, matrix: np.ndarray, mode: str) -> "QuantizedVectors":
+        if mode == "float16":
+            codes = np.empty(matrix.shape, dtype=np.float16)
+            for lo in range(0, matrix.shape[0], cls._CHUNK_ROWS):
+                codes[lo:lo + cls._CHUNK_ROWS] = matrix[lo:lo + cls._CHUNK_ROWS]
+            return cls(mode, codes)
+        if mode == "int8":
+            max_abs = np.zeros(matrix.shape[1], dtype=np.float32)
+            for lo in range(0, matrix.shape[0], cls._CHUNK_ROWS):
+                np.maximum(max_abs, np.abs(matrix[lo:lo + cls._CHUNK_ROWS]).max(axis=0), out=max_abs)
+            scale = np.where(max_abs > 0, max_abs / 127.0, 1.0).astype(np.float32)
+            codes = np.empty(matrix.shape, dtype=np.int8)
+            for lo in range(0, matrix.shape[0], cls._CHUNK_ROWS):
+                codes[lo:lo + cls._CHUNK_ROWS] = np.rint(matrix[lo:lo + cls._CHUNK_ROWS] / scale)
+            return cls(mode, codes, scale)
+        raise ValueError(f"Unknown quantization mode: {mode}")
+
+    @property
+    def nbytes(self) -> int:
+        return self.codes.nbytes + (self.scale.nbytes if self.scale is not None else 0)
+
+    def score(self, q_vecs: np.ndarray, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """Approximate ``q_vecs @ matrix[rows].T`` from the compressed codes."""
+        if self.scale is not None:
+            q_vecs = q_vecs * self.scale
+        codes = self.codes if rows is None else self.codes[rows]
+        out = np.empty((len(q_vecs), codes.shape[0]), dtype=np.float32)
+        for lo in range(0, codes.shape[0], self._CHUNK_ROWS):
+            block = codes[lo:lo + self._CHUNK_ROWS].astype(np.float32)
+            out[:, lo:lo + self._CHUNK_ROWS] = q_vecs @ block.T
+        return out
+
+
+class VectorIndex:
+    """Maximum inner-product search over the rows of a normalized matrix.
+
+    ``search`` returns ``(scores, rows)`` arrays of shape ``(len(q_vecs), k)``,
+    best first. Slots with no candidate have row ``-1`` and score ``-inf``.
+
+    With ``quantized`` set, candidates are picked from the compressed vectors and
+    the best ``k * rescore_factor`` are re-scored exactly against ``matrix``, which
+    can stay memory-mapped on disk.
+
+    ``alive`` optionally masks out rows (deleted or superseded papers) without
+    rebuilding anything.
+
+    Passing ``rows`` (sorted, live row numbers) restricts a search to those rows,
+    e.g. the papers matching a filter; its cost then scales with ``len(rows)``.
+    """
+
+    kind = "base"
+
+    def __init__(self, matrix: np.ndarray, quantized: Optional[QuantizedVectors] = None,
+                 rescore_factor: int = 4, alive: Optional[np.ndarray] = None):
+        self.matrix = matrix
+        self.quantized = quantized
+        self.rescore_factor = max(1, rescore_factor)
+        self.alive = alive
+        self.report: dict = {}
+
+    def search(self, q_vecs: np.ndarray, k: int,
+               rows: Optional[np.ndarray] = None) -> tuple[np.ndarray, np.ndarray]:
+        raise NotImplementedError
+
+    def _search_rows(self, q_vecs: np.ndarray, k: int, rows: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Brute-force search over the given rows only."""
+        all_scores = np.full((len(q_vecs), k), -np.inf, dtype=np.float32)
+        all_rows = np.full((len(q_vecs), k), -1, dtype=np.intp)
+        if not len(rows):
+            return all_scores, all_rows
+
+        k_found = min(k, len(rows))
+        chunk = max(1, _MAX_SCORE_BLOCK // len(rows))
+        for lo in range(0, len(q_vecs), chunk):
+            q = q_vecs[lo:lo + chunk]
+            scores = self._first_pass(q, rows)
+            if self.quantized is None:
+                best = top_k_indices(scores, k_found)
+                all_rows[lo:lo + chunk, :k_found] = rows[best]
+                all_scores[lo:lo + chunk, :k_found] = np.take_along_axis(scores, best, axis=-1)
+            else:
+                candidates = rows[top_k_indices(scores, min(len(rows), k * self.rescore_factor))]
+                best_scores, best_rows = self._rescore(q, candidates, k_found)
+                all_rows[lo:lo + chunk, :k_found] = best_rows
+                all_scores[lo:lo + chunk, :k_found] = best_scores
+        return all_scores, all_rows
+
+    def updated(self, matrix: np.ndarray, alive: Optional[np.ndarray]) -> "VectorIndex":
+        """A new index over ``matrix`` (the current rows plus appended ones).
+
+        Only the appended rows are processed; the receiver is left untouched so
+        concurrent searches against it stay consistent.
+        """
+        new_rows = np.asarray(matrix[self.matrix.shape[0]:])
+        clone = copy.copy(self)
+        clone.matrix = matrix
+        clone.alive = alive
+        if self.quantized is not None and len(new_rows):
+            clone.quantized = self.quantized.extended(new_rows)
+        return clone
+
+    def remapped(self, matrix: np.ndarray, old_rows: np.ndarray, alive: Optional[np.ndarray]) -> "VectorIndex":
+        """A new index over ``matrix`` whose row ``i`` holds the receiver's row ``old_rows[i]``.
+
+        Rows marked ``-1`` are vectors the receiver never saw and are indexed
+        here. Used when the embedding store is compacted: rows are renumbered but
+        their vectors do not change, so nothing is rebuilt.
+        """
+        clone = copy.copy(self)
+        clone.matrix = matrix
+        clone.alive = alive
+        if self.quantized is not None:
+            clone.quantized = self.quantized.remapped(matrix, old_rows)
+        return clone
+
+    def _first_pass(self, q_vecs: np.ndarray, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        if self.quantized is not None:
+            return self.quantized.score(q_vecs, rows)
+        return q_vecs @ (self.matrix if rows is None else self.matrix[rows]).T
+
+    def _rescore(self, q_vecs: np.ndarray, candidates: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+        """Exact float32 scores for ``candidates`` (one row of ids per query), top ``k`` kept."""
+        exact = np.einsum("qd,qcd->qc", q_vecs, self.matrix[candidates.ravel()].reshape(
+            candidates.shape + (self.matrix.shape[1],)))
+        if self.alive is not None:
+            exact[~self.alive[candidates]] = -np.inf
+        best = top_k_indices(exact, k)
+        return np.take_along_axis(exact, best, axis=-1), np.take_along_axis(candidates, best, axis=-1)
+
+    @property
+    def nbytes(self) -> int:
+        """Resident bytes of the first-pass representation."""
+        return self.quantized.nbytes if self.quantized is not None else self.matrix.nbytes
+
+    def save(self, path: str, fp: str) -> None:
+        pass
+
+    def arrays(self) -> dict[str, np.ndarray]:
+        """The arrays built from the matrix, for ``index_from_arrays`` in another process."""
+        if self.quantized is None:
+            return {}
+        arrays = {"codes": self.quantized.codes}
+        if self.quantized.scale is not None:
+            arrays["scale"] = self.quantized.scale
+        return arrays
+
+
+class ExactIndex(VectorIndex):
+    """Brute-force scoring of every row; the reference for recall checks."""
+
+    kind = "exact"
+
+    def search(self, q_vecs: np.ndarray, k: int,
+               rows: Optional[np.ndarray] = None) -> tuple[np.ndarray, np.ndarray]:
+        if rows is not None:
+            return self._search_rows(q_vecs, k, rows)
+        n = self.matrix.shape[0]
+        k = min(k, n)
+        chunk = max(1, _MAX_SCORE_BLOCK // max(n, 1))
+        all_scores = np.empty((len(q_vecs), k), dtype=np.float32)
+        all_rows = np.empty((len(q_vecs), k), dtype=np.intp)
+
+        for lo in range(0, len(q_vecs), chunk):
+            q = q_vecs[lo:lo + chunk]
+            scores = self._first_pass(q)
+            if self.alive is not None:
+                scores[:, ~self.alive] = -np.inf
+            if self.quantized is None:
+                rows = top_k_indices(scores, k)
+                all_rows[lo:lo + chunk] = rows
+                all_scores[lo:lo + chunk] = np.take_along_axis(scores, rows, axis=-1)
+            else:
+                candidates = top_k_indices(scores, k * self.rescore_factor)
+                all_scores[lo:lo + chunk], all_rows[lo:lo + chunk] = self._rescore(q, candidates, k)
+        all_rows[np.isneginf(all_scores)] = -1
+        return all_scores, all_rows
+
+
+class IVFFlatIndex(VectorIndex):
+    """Inverted-file index: k-means centroids partition the rows into lists and a
+    query only scores the rows in its ``nprobe`` closest lists."""
+
+    kind = "ivf"
+
+    def __init__(self, matrix: np.ndarray, centroids: np.ndarray, list_offsets: np.ndarray,
+                 list_rows: np.ndarray, nprobe: int, **kwargs):
+        super().__init__(matrix, **kwargs)
+        self.centroids = centroids
+        self.list_offsets = list_offsets
+        self.list_rows = list_rows
+        self.nprobe = max(1, min(nprobe, len(centroids)))
+        # Rows appended after the build, kept outside the packed lists until the next rebuild.
+        self.extra_rows = np.empty(0, dtype=np.int64)
+        self.extra_lists = np.empty(0, dtype=np.int64)
+
+    def updated(self, matrix: np.ndarray, alive: Optional[np.ndarray]) -> "IVFFlatIndex":
+        start = self.matrix.shape[0]
+        clone = super().updated(matrix, alive)
+        if matrix.shape[0] > start:
+            new_rows = np.arange(start, matrix.shape[0], dtype=np.int64)
+            clone.extra_rows = np.concatenate([self.extra_rows, new_rows])
+            clone.extra_lists = np.concatenate([self.extra_lists, self._assign(matrix[start:], self.centroids)])
+        return clone
+
+    def remapped(self, matrix: np.ndarray, old_rows: np.ndarray, alive: Optional[np.ndarray]) -> "IVFFlatIndex":
+        clone = super().remapped(matrix, old_rows, alive)
+        old_lists = np.empty(self.matrix.shape[0], dtype=np.int64)
+        old_lists[self.list_rows] = np.repeat(np.arange(len(self.centroids)), np.diff(self.list_offsets))
+        old_lists[self.extra_rows] = self.extra_lists
+        lists = np.empty(len(old_rows), dtype=np.int64)
+        mapped = old_rows >= 0
+        lists[mapped] = old_lists[old_rows[mapped]]
+        fresh = np.flatnonzero(~mapped)
+        if len(fresh):
+            lists[fresh] = self._assign(np.asarray(matrix[fresh]), self.centroids)
+        # Every row goes back into the packed lists, appended ones included.
+        clone.list_rows = np.argsort(lists, kind="stable").astype(np.int64)
+        clone.list_offsets = np.concatenate(
+            [[0], np.cumsum(np.bincount(lists, minlength=len(self.centroids)))]).astype(np.int64)
+        clone.extra_rows = np.empty(0, dtype=np.int64)
+        clone.extra_lists = np.empty(0, dtype=np.int64)
+        return clone
+
+    @classmethod
+    def build(cls, matrix: np.ndarray, nlist: int, nprobe: int,
+              iterations: int = 10, seed: int = 0, **kwargs) -> "IVFFlatIndex":
+        n = matrix.shape[0]
+        nlist = max(1, min(nlist, n))
+        rng = np.random.default_rng(seed)
+
+        # Spherical k-means on a training sample; cosine is the similarity we serve.
+        sample_size = min(n, max(nlist, min(nlist * _TRAIN_ROWS_PER_LIST, _MAX_TRAIN_ROWS)))
+        sample = np.asarray(matrix[np.sort(rng.choice(n, sample_size, replace=False))])
+        centroids = sample[rng.choice(sample_size, nlist, replace=False)].copy()
+        for _ in range(iterations):
+            assign = cls._assign(sample, centroids)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assign, sample)
+            counts = np.bincount(assign, minlength=nlist)
+            empty = counts == 0
+            sums[empty] = sample[rng.choice(sample_size, int(empty.sum()))]
+            centroids = sums / (np.linalg.norm(sums, axis=1, keepdims=True) + 1e-8)
+
+        assign = cls._assign(matrix, centroids)
+        list_rows = np.argsort(assign, kind="stable").astype(np.int64)
+        list_offsets = np.concatenate([[0], np.cumsum(np.bincount(assign, minlength=nlist))]).astype(np.int64)
+        return cls(matrix, centroids.astype(np.float32), list_offsets, list_rows, nprobe, **kwargs)
+
+    @staticmethod
+    def _assign(matrix: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+        chunk = max(1, _MAX_SCORE_BLOCK // len(centroids))
+        return np.concatenate([
+            np.argmax(matrix[lo:lo + chunk] @ centroids.T, axis=1)
+            for lo in range(0, matrix.shape[0], chunk)
+        ])
+
+    def search(self, q_vecs: np.ndarray, k: int,
+               rows: Optional[np.ndarray] = None) -> tuple[np.ndarray, np.ndarray]:
+        allowed = self.alive
+        if rows is not None:
+            # A filter narrower than what the probes would scan anyway is cheaper
+            # (and exact) to brute-force; wider ones mask the probed lists instead.
+            probed = self.matrix.shape[0] * self.nprobe / len(self.centroids)
+            if len(rows) <= probed:
+                return self._search_rows(q_vecs, k, rows)
+            allowed = np.zeros(self.matrix.shape[0], dtype=bool)
+            allowed[rows] = True
+
+        all_scores = np.full((len(q_vecs), k), -np.inf, dtype=np.float32)
+        all_rows = np.full((len(q_vecs), k), -1, dtype=np.intp)
+        probes = top_k_indices(q_vecs @ self.centroids.T, self.nprobe)
+
+        for qi, (q, lists) in enumerate(zip(q_vecs, probes)):
+            candidates = np.concatenate([
+                self.list_rows[self.list_offsets[c]:self.list_offsets[c + 1]] for c in lists
+            ] + [self.extra_rows[np.isin(self.extra_lists, lists)]])
+            if allowed is not None:
+                candidates = candidates[allowed[candidates]]
+            if not len(candidates):
+                continue
+            candidates.sort()
+            scores = self._first_pass(q[None, :], candidates)[0]
+            if self.quantized is None:
+                best = top_k_indices(scores, k)
+                all_rows[qi, :len(best)] = candidates[best]
+                all_scores[qi, :len(best)] = scores[best]
+            else:
+                shortlist = candidates[top_k_indices(scores, k * self.rescore_factor)]
+                best_scores, best_rows = self._rescore(q[None, :], shortlist[None, :], k)
+                all_rows[qi, :best_rows.shape[1]] = best_rows[0]
+                all_scores[qi, :best_rows.shape[1]] = best_scores[0]
+        all_rows[np.isneginf(all_scores)] = -1
+        return all_scores, all_rows
+
+    def arrays(self) -> dict[str, np.ndarray]:
+        return dict(super().arrays(), centroids=self.centroids, list_offsets=self.list_offsets,
+                    list_rows=self.list_rows)
+
+    def save(self, path: str, fp: str) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = path + ".tmp.npz"
+        np.savez(tmp, centroids=self.centroids, list_offsets=self.list_offsets,
+                 list_rows=self.list_rows, fingerprint=np.array(fp))
+        os.replace(tmp, path)
+        logger.info(f"Saved IVF index ({len(self.centroids)} lists) to {path}")
+
+    @classmethod
+    def load(cls, path: str, matrix: np.ndarray, fp: str, nprobe: int, **kwargs) -> Optional["IVFFlatIndex"]:
+        """Load a saved index, or ``None`` if it is missing or built from another corpus."""
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path) as data:
+                if str(data["fingerprint"]) != fp:
+                    logger.info(f"IVF index at {path} is stale; rebuilding")
+                    return None
+                return cls(matrix, data["centroids"], data["list_offsets"], data["list_rows"], nprobe, **kwargs)
+        except Exception as e:
+            logger.warning(f"Failed to load IVF index from {path}: {e}")
+            return None
+
+
+def recall_at_k(index: VectorIndex, reference: VectorIndex, q_vecs: np.ndarray, k: int) -> float:
+    """Fraction of the reference top-k rows that ``index`` also returns."""
+    _, expected = reference.search(q_vecs, k)
+    _, actual = index.search(q_vecs, k)
+    hits = sum(len(set(e) & set(a)) for e, a in zip(expected.tolist(), actual.tolist()))
+    return hits / max(expected.size, 1)
+
+
+def sample_queries(matrix: np.ndarray, n: int, noise: float = 0.5, seed: int = 0) -> np.ndarray:
+    """Corpus rows plus relative Gaussian noise, normalized; stand-ins for real queries."""
+    rng = np.random.default_rng(seed)
+    n_rows, dim = matrix.shape
+    rows = rng.choice(n_rows, min(n, n_rows), replace=False)
+    q = np.asarray(matrix[np.sort(rows)]) + noise / np.sqrt(dim) * rng.standard_normal((len(rows), dim))
+    q = q.astype(np.float32)
+    return q / (np.linalg.norm(q, axis=1, keepdims=True) + 1e-8)
+
+
+def build_index(kind: str, matrix: np.ndarray, paper_ids: list[str], path: str,
+                nlist: int = 0, nprobe: int = 8, quantization: str = "none",
+                rescore_factor: int = 4, recall_queries: int = 200,
+                alive: Optional[np.ndarray] = None) -> VectorIndex:
+    """Return the configured index, loading IVF lists from ``path`` when they match the corpus.
+
+    When ``recall_queries`` is set, ``index.report`` records recall@10 against exact
+    float32 search (and, for quantized indexes, the recall of the first pass alone).
+    """
+    quantized = None
+    if quantization != "none":
+        quantized = QuantizedVectors.from_matrix(matrix, quantization)
+        if not isinstance(matrix, np.memmap):
+            logger.warning("Quantized index over an in-RAM matrix: the float32 copy is not paged out")
+    options = {"quantized": quantized, "rescore_factor": rescore_factor, "alive": alive}
+
+    if kind == "exact":
+        index = ExactIndex(matrix, **options)
+    elif kind == "ivf":
+        n = matrix.shape[0]
+        nlist = nlist or max(1, int(4 * np.sqrt(n)))
+        fp = fingerprint(paper_ids, matrix)
+        index = IVFFlatIndex.load(path, matrix, fp, nprobe, **options)
+        if index is None:
+            start = time.perf_counter()
+            index = IVFFlatIndex.build(matrix, nlist, nprobe, **options)
+            logger.info(f"Built IVF index: {n} rows, {len(index.centroids)} lists in {time.perf_counter() - start:.2f}s")
+            index.save(path, fp)
+    else:
+        raise ValueError(f"Unknown local index type: {kind}")
+
+    index.report = {"kind": kind, "quantization": quantization,
+                    "index_bytes": index.nbytes, "float32_bytes": int(matrix.nbytes)}
+    if recall_queries and (kind != "exact" or quantized is not None):
+        index.report.update(evaluate_recall(index, matrix, sample_queries(matrix, recall_queries)))
+        logger.info(f"Local index report: {index.report}")
+    return index
+
+
+def index_from_arrays(kind: str, matrix: np.ndarray, arrays: dict[str, np.ndarray], nprobe: int = 8,
+                      quantization: str = "none", rescore_factor: int = 4,
+                      alive: Optional[np.ndarray] = None) -> VectorIndex:
+    """Rebuild an index around arrays another process built (see ``VectorIndex.arrays``)."""
+    quantized = None
+    if quantization != "none":
+        quantized = QuantizedVectors(quantization, arrays["codes"], arrays.get("scale"))
+    options = {"quantized": quantized, "rescore_factor": rescore_factor, "alive": alive}
+    if kind == "exact":
+        return ExactIndex(matrix, **options)
+    if kind == "ivf":
+        return IVFFlatIndex(matrix, arrays["centroids"], arrays["list_offsets"], arrays["list_rows"],
+                            nprobe, **options)
+    raise ValueError(f"Unknown local index type: {kind}")
+
+
+def evaluate_recall(index: VectorIndex, matrix: np.ndarray, q_vecs: np.ndarray, k: int = 10) -> dict:
+    """Recall@k of ``index`` against exact float32 search, with and without re-scoring."""
+    reference = ExactIndex(matrix, alive=index.alive)
+    report = {"recall": recall_at_k(index, reference, q_vecs, k)}
+    if index.quantized is not None:
+        factor = index.rescore_factor
+        index.rescore_factor = 1
+        try:
+            report["first_pass_recall"] = recall_at_k(index, reference, q_vecs, k)
+        finally:
+            index.rescore_factor = factor
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from services.api.config import Config
+    from shared.embedding_store import EmbeddingStore
+
+    parser = argparse.ArgumentParser(description="Recall/latency sweep of local indexes against exact search")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--nlist", type=int, default=Config.IVF_NLIST)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--quantization", choices=["none", "int8", "float16"], default=Config.INDEX_QUANTIZATION)
+    parser.add_argument("--rescore-factor", type=int, default=Config.RESCORE_FACTOR)
+    args = parser.parse_args()
+
+    ids, mat = EmbeddingStore(Config.EMBEDDINGS_DIR).open()
+    if not ids:
+        raise SystemExit(f"No embeddings found in {Config.EMBEDDINGS_DIR}")
+    queries = sample_queries(mat, args.queries)
+    options = {"rescore_factor": args.rescore_factor, "quantized": None}
+    if args.quantization != "none":
+        options["quantized"] = QuantizedVectors.from_matrix(mat, args.quantization)
+
+    def _report(name: str, index: VectorIndex) -> None:
+        t0 = time.perf_counter()
+        index.search(queries, args.k)
+        per_query_ms = (time.perf_counter() - t0) * 1000 / len(queries)
+        recall = evaluate_recall(index, mat, queries, args.k)
+        print(f"{name:<14} {per_query_ms:8.3f}ms/query  {index.nbytes / 2**20:9.1f}MiB  {recall}")
+
+    _report("exact", ExactIndex(mat, **options))
+    ivf = IVFFlatIndex.build(mat, args.nlist or max(1, int(4 * np.sqrt(len(ids)))), nprobe=1, **options)
+    for probe in args.nprobe:
+        ivf.nprobe = max(1, min(probe, len(ivf.centroids)))
+        _report(f"ivf nprobe={ivf.nprobe}", ivf)
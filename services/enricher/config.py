@@ -6,6 +6,9 @@ load_dotenv()
 
 class Config:
     OUTPUT_DIR = os.getenv("ENRICHER_OUTPUT_DIR", "data/enriched_papers")
+    EMBEDDINGS_DIR = os.getenv("EMBEDDINGS_DIR", "data/embeddings")
+    # Compact the embedding store after a run once superseded rows reach this share.
+    EMBEDDINGS_COMPACT_RATIO = float(os.getenv("EMBEDDINGS_COMPACT_RATIO", "0.2"))
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
     OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4.1-mini")
     EMBEDDING_MODEL = "all-MiniLM-L6-v2"
@@ -9,6 +9,7 @@ from services.enricher.config import Config
 from services.enricher.summarizer import summarize_paper, extract_topics
 from services.enricher.embedder import generate_embedding
 from data_contracts.paper import ValidatedPaper, EnrichedPaper, ProcessingStatus
+from shared.embedding_store import EmbeddingStore
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -37,6 +38,8 @@ def _to_search_document(paper: EnrichedPaper) -> dict:
         "abstract": paper.abstract or "",
         "clean_text": paper.clean_text[:32_000],
         "topics": paper.topics,
+        "categories": paper.categories,
+        "published": paper.published,
         "research_question": paper.summary.research_question,
         "methodology": paper.summary.methodology,
         "key_findings": paper.summary.key_findings,
@@ -62,6 +65,8 @@ def enrich_paper(validated: ValidatedPaper) -> EnrichedPaper:
         title=validated.title,
         authors=validated.authors,
         abstract=validated.abstract,
+        categories=validated.categories,
+        published=validated.published,
         clean_text=validated.clean_text,
         summary=summary,
         topics=topics,
@@ -81,6 +86,7 @@ def process_validated_papers(input_dir: str = "data/validated_papers") -> None:
     logger.info(f"Found {len(json_files)} validated papers to enrich")
 
     search_docs = []
+    embedding_store = EmbeddingStore(Config.EMBEDDINGS_DIR)
 
     for json_file in json_files:
         input_path = os.path.join(input_dir, json_file)
@@ -94,15 +100,22 @@ def process_validated_papers(input_dir: str = "data/validated_papers") -> None:
                 continue
 
             result = enrich_paper(validated)
+            # Vector before JSON: the API's directory watcher relies on this order.
+            embedding_store.append(result.paper_id, result.embedding)
             output_path = os.path.join(Config.OUTPUT_DIR, json_file)
-            with open(output_path, "w", encoding="utf-8") as f:
+            with open(output_path + ".tmp", "w", encoding="utf-8") as f:
                 f.write(result.model_dump_json(indent=2))
+            os.replace(output_path + ".tmp", output_path)
             logger.info(f"Saved: {output_path}")
 
             search_docs.append(_to_search_document(result))
         except Exception as e:
             logger.error(f"Failed to enrich {json_file}: {e}")
 
+    # Re-enriched papers leave their old rows behind; drop them once they add up.
+    if embedding_store.exists():
+        embedding_store.compact(Config.EMBEDDINGS_COMPACT_RATIO)
+
     client = _get_search_client()
     if client and search_docs:
         count = client.index_papers(search_docs)
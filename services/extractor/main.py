@@ -50,6 +50,8 @@ def extract_paper(pdf_path: str, paper_id: str, title: str) -> ExtractedPaper:
         title=meta.get("title", title),
         authors=meta.get("authors", []),
         abstract=meta.get("abstract"),
+        categories=meta.get("categories", []),
+        published=meta.get("published") or None,
         raw_text=text,
         extraction_method=method,
         page_count=page_count,
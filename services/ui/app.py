@@ -65,8 +65,8 @@ with tab_search:
         results = fetch(f"/papers/search?q={quote(query)}&top_k={top_k}")
         if results and results.get("results"):
             for r in results["results"]:
-                score_pct = f"{r['score'] * 100:.1f}%"
-                with st.expander(f"**{r['title']}** (relevance: {score_pct})"):
+                # Cosine similarity in vector mode, normalized RRF in hybrid mode, BM25 in keyword mode.
+                with st.expander(f"**{r['title']}** (score: {r['score']:.3f})"):
                     if r.get("topics"):
                         st.caption(" | ".join(r["topics"]))
                     if r.get("authors"):
@@ -43,6 +43,8 @@ def validate_paper(extracted: ExtractedPaper) -> ValidatedPaper:
         title=extracted.title,
         authors=extracted.authors,
         abstract=extracted.abstract,
+        categories=extracted.categories,
+        published=extracted.published,
         clean_text=cleaned,
         validation=ValidationResult(
             is_valid=is_valid,
@@ -0,0 +1,198 @@
+import fcntl
+import json
+import logging
+import os
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+VECTORS_FILE = "vectors.f32"
+IDS_FILE = "paper_ids.txt"
+META_FILE = "meta.json"
+
+
+def latest_rows(paper_ids: list[str]) -> dict[str, int]:
+    """Map each paper_id to the row holding its most recent embedding."""
+    return {pid: row for row, pid in enumerate(paper_ids)}
+
+
+class EmbeddingStore:
+    """Append-only columnar store of L2-normalized float32 embeddings.
+
+    Row ``i`` of ``vectors.f32`` belongs to line ``i`` of ``paper_ids.txt``.
+    A paper that is re-enriched gets a new row; the last row for an id wins.
+    ``meta.json`` records the number of committed rows so appends need not
+    rescan the id table.
+    """
+
+    def __init__(self, directory: str):
+        self._dir = directory
+        self._vectors_path = os.path.join(directory, VECTORS_FILE)
+        self._ids_path = os.path.join(directory, IDS_FILE)
+        self._meta_path = os.path.join(directory, META_FILE)
+        self._lock_path = os.path.join(directory, ".lock")
+
+    @property
+    def directory(self) -> str:
+        return self._dir
+
+    def exists(self) -> bool:
+        return os.path.exists(self._meta_path) and os.path.exists(self._vectors_path)
+
+    def dim(self) -> Optional[int]:
+        meta = self._read_meta()
+        return int(meta["dim"]) if meta is not None else None
+
+    def _read_meta(self) -> Optional[dict]:
+        if not os.path.exists(self._meta_path):
+            return None
+        with open(self._meta_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _write_meta(self, dim: int, rows: int) -> None:
+        tmp = self._meta_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"dim": dim, "dtype": "float32", "rows": rows}, f)
+        os.replace(tmp, self._meta_path)
+
+    def append(self, paper_id: str, vector: list[float] | np.ndarray) -> None:
+        """Normalize and append a single embedding."""
+        self.append_many([paper_id], np.asarray(vector, dtype=np.float32)[None, :])
+
+    def append_many(self, paper_ids: list[str], vectors: np.ndarray) -> None:
+        """Normalize and append a block of embeddings (one row per paper_id)."""
+        if not paper_ids:
+            return
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        if vectors.ndim != 2 or vectors.shape[0] != len(paper_ids):
+            raise ValueError("vectors must be a 2-D array with one row per paper_id")
+
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        vectors = vectors / norms
+
+        os.makedirs(self._dir, exist_ok=True)
+        with open(self._lock_path, "w") as lock:
+            # The enricher and the API's admin ingest may append concurrently.
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            meta = self._read_meta()
+            dim = int(meta["dim"]) if meta is not None else vectors.shape[1]
+            if vectors.shape[1] != dim:
+                raise ValueError(f"Expected {dim}-dim embeddings, got {vectors.shape[1]}")
+
+            # Vectors first, ids second, row count last. A crash in between
+            # leaves the vector file out of step with the recorded count; only
+            # then is the id table counted. Orphan rows, which readers ignore
+            # because they have no id, are dropped so row i keeps matching line i.
+            with open(self._vectors_path, "ab") as f:
+                rows = meta.get("rows") if meta is not None else 0
+                if rows is None or os.fstat(f.fileno()).st_size != rows * dim * 4:
+                    rows = self._count_ids()
+                    f.truncate(rows * dim * 4)
+                f.write(vectors.tobytes())
+            with open(self._ids_path, "a", encoding="utf-8") as f:
+                f.writelines(f"{pid}\n" for pid in paper_ids)
+            self._write_meta(dim, rows + len(paper_ids))
+
+    def _count_ids(self) -> int:
+        if not os.path.exists(self._ids_path):
+            return 0
+        with open(self._ids_path, "rb") as f:
+            return f.read().count(b"\n")
+
+    def read_ids(self) -> list[str]:
+        if not os.path.exists(self._ids_path):
+            return []
+        with open(self._ids_path, "r", encoding="utf-8") as f:
+            return f.read().splitlines()
+
+    def tail_ids(self, offset: int) -> tuple[list[str], int]:
+        """Ids appended after byte ``offset`` of the id table, and the new offset.
+
+        A trailing line without a newline is still being written and is left for
+        the next call.
+        """
+        if not os.path.exists(self._ids_path):
+            return [], offset
+        with open(self._ids_path, "rb") as f:
+            f.seek(offset)
+            chunk = f.read()
+        end = chunk.rfind(b"\n") + 1
+        return chunk[:end].decode("utf-8").splitlines(), offset + end
+
+    def generation(self) -> Optional[int]:
+        """Changes when the store is rewritten (compaction), not when rows are appended."""
+        try:
+            return os.stat(self._ids_path).st_ino
+        except FileNotFoundError:
+            return None
+
+    def matrix(self, rows: int) -> np.ndarray:
+        """Memory-map the first ``rows`` vectors read-only (fewer if not yet written)."""
+        dim = self.dim()
+        if dim is None or not os.path.exists(self._vectors_path):
+            return np.empty((0, dim or 0), dtype=np.float32)
+        rows = min(rows, os.path.getsize(self._vectors_path) // (dim * 4))
+        if rows == 0:
+            return np.empty((0, dim), dtype=np.float32)
+        return np.memmap(self._vectors_path, dtype=np.float32, mode="r", shape=(rows, dim))
+
+    @contextmanager
+    def reading(self) -> Iterator[None]:
+        """Hold the store's shared lock, so no append or compaction lands meanwhile.
+
+        Compaction replaces the vector and id files one after the other; a reader
+        that looked at them in between would pair renumbered rows with old ids.
+        Arrays mapped under the lock stay valid after it is released.
+        """
+        os.makedirs(self._dir, exist_ok=True)
+        with open(self._lock_path, "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_SH)
+            yield
+
+    def open(self) -> tuple[list[str], np.ndarray]:
+        """Return ``(paper_ids, matrix)`` with the matrix memory-mapped read-only."""
+        with self.reading():
+            return self._open()
+
+    def _open(self) -> tuple[list[str], np.ndarray]:
+        ids = self.read_ids()
+        matrix = self.matrix(len(ids))
+        return ids[:matrix.shape[0]], matrix
+
+    def compact(self, min_dead_ratio: float = 0.0) -> int:
+        """Rewrite the store keeping only the latest row per paper. Returns rows dropped.
+
+        Nothing is rewritten unless superseded rows make up at least
+        ``min_dead_ratio`` of the store. Rows are renumbered: running readers see a
+        new ``generation()``, and the exclusive lock keeps them from reading ids and
+        vectors from different sides of the rewrite (see ``reading``).
+        """
+        os.makedirs(self._dir, exist_ok=True)
+        with open(self._lock_path, "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            ids, matrix = self._open()
+            latest = latest_rows(ids)
+            if len(latest) == len(ids) or len(ids) - len(latest) < min_dead_ratio * len(ids):
+                return 0
+
+            rows = sorted(latest.values())
+            tmp_vectors = self._vectors_path + ".tmp"
+            tmp_ids = self._ids_path + ".tmp"
+            with open(tmp_vectors, "wb") as f:
+                f.write(np.ascontiguousarray(matrix[rows]).tobytes())
+            with open(tmp_ids, "w", encoding="utf-8") as f:
+                f.writelines(f"{ids[r]}\n" for r in rows)
+            dim = matrix.shape[1]
+            del matrix
+
+            os.replace(tmp_vectors, self._vectors_path)
+            os.replace(tmp_ids, self._ids_path)
+            self._write_meta(dim, len(rows))
+
+        dropped = len(ids) - len(rows)
+        logger.info(f"Compacted embedding store: dropped {dropped} superseded rows")
+        return dropped
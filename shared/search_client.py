@@ -1,5 +1,6 @@
 import logging
 import os
+import threading
 from typing import Optional
 
 from azure.core.credentials import AzureKeyCredential
@@ -23,9 +24,29 @@ logger = logging.getLogger(__name__)
 INDEX_NAME = "papers"
 VECTOR_DIMENSIONS = 384
 
+SELECT_FIELDS = ["paper_id", "title", "authors", "abstract", "topics", "categories", "published",
+                 "research_question", "methodology", "key_findings", "contributions", "limitations"]
+
+# (endpoint, index) pairs whose index is known to exist in this process.
+_ensured_indexes: set[tuple[str, str]] = set()
+_ensure_lock = threading.Lock()
+
+
+def _vector_query(embedding: list[float], top_k: int) -> VectorizedQuery:
+    return VectorizedQuery(vector=embedding, k_nearest_neighbors=top_k, fields="embedding")
+
+
+def _hit(result: dict) -> dict:
+    return {"score": result["@search.score"], **{k: v for k, v in result.items() if k != "@search.score"}}
+
 
 class SearchClient:
-    """Azure AI Search client for indexing and querying papers."""
+    """Azure AI Search client for indexing and querying papers.
+
+    One underlying client is created per instance and reused for every call, so
+    requests share its pooled keep-alive connections. The index is checked (and
+    created if missing) once per process, not once per instance.
+    """
 
     def __init__(
         self,
@@ -42,17 +63,41 @@ class SearchClient:
 
         self._credential = AzureKeyCredential(self._api_key)
         self._ensure_index()
+        self._client = AzureSearchClient(self._endpoint, self._index_name, self._credential)
 
     def _ensure_index(self) -> None:
-        """Create the search index if it doesn't exist."""
-        index_client = SearchIndexClient(self._endpoint, self._credential)
-        try:
-            index_client.get_index(self._index_name)
-            logger.info(f"Search index '{self._index_name}' exists")
-        except Exception:
-            index = self._build_index_schema()
-            index_client.create_index(index)
-            logger.info(f"Created search index '{self._index_name}'")
+        """Create the search index if it doesn't exist, or add fields it lacks.
+
+        Azure AI Search can add fields to an existing index but not change or
+        remove them, so an index created by an older version gains new fields
+        (e.g. ``categories`` and ``published`` for filters) without a rebuild.
+        Documents indexed before then have those fields empty until re-indexed.
+        """
+        key = (self._endpoint, self._index_name)
+        with _ensure_lock:
+            if key in _ensured_indexes:
+                return
+            with SearchIndexClient(self._endpoint, self._credential) as index_client:
+                schema = self._build_index_schema()
+                try:
+                    existing = index_client.get_index(self._index_name)
+                except Exception:
+                    existing = None
+                if existing is None:
+                    index_client.create_index(schema)
+                    logger.info(f"Created search index '{self._index_name}'")
+                else:
+                    names = {field.name for field in existing.fields}
+                    missing = [field for field in schema.fields if field.name not in names]
+                    if missing:
+                        existing.fields.extend(missing)
+                        existing.vector_search = existing.vector_search or schema.vector_search
+                        index_client.create_or_update_index(existing)
+                        logger.info(f"Added fields {', '.join(f.name for f in missing)} "
+                                    f"to search index '{self._index_name}'")
+                    else:
+                        logger.info(f"Search index '{self._index_name}' exists")
+            _ensured_indexes.add(key)
 
     def _build_index_schema(self) -> SearchIndex:
         fields = [
@@ -62,6 +107,8 @@ class SearchClient:
             SearchableField(name="clean_text", type=SearchFieldDataType.String, analyzer_name="en.lucene"),
             SimpleField(name="authors", type=SearchFieldDataType.Collection(SearchFieldDataType.String), filterable=True),
             SimpleField(name="topics", type=SearchFieldDataType.Collection(SearchFieldDataType.String), filterable=True, facetable=True),
+            SimpleField(name="categories", type=SearchFieldDataType.Collection(SearchFieldDataType.String), filterable=True, facetable=True),
+            SimpleField(name="published", type=SearchFieldDataType.DateTimeOffset, filterable=True, sortable=True),
             SearchableField(name="research_question", type=SearchFieldDataType.String),
             SearchableField(name="methodology", type=SearchFieldDataType.String),
             SearchableField(name="contributions", type=SearchFieldDataType.String),
@@ -85,87 +132,119 @@ class SearchClient:
         return SearchIndex(name=self._index_name, fields=fields, vector_search=vector_search)
 
     def _get_search_client(self) -> AzureSearchClient:
-        return AzureSearchClient(self._endpoint, self._index_name, self._credential)
+        return self._client
+
+    def close(self) -> None:
+        """Close the pooled connections."""
+        self._client.close()
+
+    def async_client(self) -> "AsyncSearchClient":
+        """An asyncio client for the same index; the index check is not repeated."""
+        return AsyncSearchClient(self._endpoint, self._credential, self._index_name)
 
     def index_paper(self, document: dict) -> None:
         """Index or update a single paper document."""
-        client = self._get_search_client()
-        client.upload_documents(documents=[document])
+        self._client.upload_documents(documents=[document])
         logger.info(f"Indexed paper: {document.get('paper_id')}")
 
     def index_papers(self, documents: list[dict]) -> int:
         """Batch-index multiple paper documents. Returns count indexed."""
         if not documents:
             return 0
-        client = self._get_search_client()
-        result = client.upload_documents(documents=documents)
+        result = self._client.upload_documents(documents=documents)
         succeeded = sum(1 for r in result if r.succeeded)
         logger.info(f"Indexed {succeeded}/{len(documents)} papers")
         return succeeded
 
-    def search_text(self, query: str, top_k: int = 5) -> list[dict]:
-        """Full-text search across paper fields."""
-        client = self._get_search_client()
-        results = client.search(
-            search_text=query,
-            select=["paper_id", "title", "authors", "abstract", "topics",
-                    "research_question", "methodology", "key_findings",
-                    "contributions", "limitations"],
-            top=top_k,
-        )
-        return [{"score": r["@search.score"], **{k: v for k, v in r.items() if k != "@search.score"}} for r in results]
-
-    def search_vector(self, embedding: list[float], top_k: int = 5) -> list[dict]:
-        """Vector similarity search using a pre-computed embedding."""
-        client = self._get_search_client()
-        vector_query = VectorizedQuery(
-            vector=embedding,
-            k_nearest_neighbors=top_k,
-            fields="embedding",
-        )
-        results = client.search(
+    def search_text(self, query: str, top_k: int = 5, filter: Optional[str] = None) -> list[dict]:
+        """Full-text search across paper fields, optionally restricted by an OData filter."""
+        results = self._client.search(search_text=query, filter=filter, select=SELECT_FIELDS, top=top_k)
+        return [_hit(r) for r in results]
+
+    def search_vector(self, embedding: list[float], top_k: int = 5, filter: Optional[str] = None) -> list[dict]:
+        """Vector similarity search using a pre-computed embedding.
+
+        ``filter`` is applied before the nearest-neighbour search, so it narrows
+        the candidates instead of trimming the top ``top_k``.
+        """
+        results = self._client.search(
             search_text=None,
-            vector_queries=[vector_query],
-            select=["paper_id", "title", "authors", "abstract", "topics",
-                    "research_question", "methodology", "key_findings",
-                    "contributions", "limitations"],
+            vector_queries=[_vector_query(embedding, top_k)],
+            vector_filter_mode="preFilter",
+            filter=filter,
+            select=SELECT_FIELDS,
             top=top_k,
         )
-        return [{"score": r["@search.score"], **{k: v for k, v in r.items() if k != "@search.score"}} for r in results]
-
-    def search_hybrid(self, query: str, embedding: list[float], top_k: int = 5) -> list[dict]:
-        """Hybrid search combining full-text and vector similarity."""
-        client = self._get_search_client()
-        vector_query = VectorizedQuery(
-            vector=embedding,
-            k_nearest_neighbors=top_k,
-            fields="embedding",
-        )
-        results = client.search(
+        return [_hit(r) for r in results]
+
+    def search_hybrid(self, query: str, embedding: list[float], top_k: int = 5,
+                      filter: Optional[str] = None) -> list[dict]:
+        """Hybrid search combining full-text and vector similarity, optionally pre-filtered."""
+        results = self._client.search(
             search_text=query,
-            vector_queries=[vector_query],
-            select=["paper_id", "title", "authors", "abstract", "topics",
-                    "research_question", "methodology", "key_findings",
-                    "contributions", "limitations"],
+            vector_queries=[_vector_query(embedding, top_k)],
+            vector_filter_mode="preFilter",
+            filter=filter,
+            select=SELECT_FIELDS,
             top=top_k,
         )
-        return [{"score": r["@search.score"], **{k: v for k, v in r.items() if k != "@search.score"}} for r in results]
+        return [_hit(r) for r in results]
 
     def get_document(self, paper_id: str) -> Optional[dict]:
         """Retrieve a single document by paper_id."""
-        client = self._get_search_client()
         try:
-            return client.get_document(key=paper_id)
+            return self._client.get_document(key=paper_id)
         except Exception:
             return None
 
     def delete_document(self, paper_id: str) -> None:
         """Delete a document from the index."""
-        client = self._get_search_client()
-        client.delete_documents(documents=[{"paper_id": paper_id}])
+        self._client.delete_documents(documents=[{"paper_id": paper_id}])
         logger.info(f"Deleted paper from index: {paper_id}")
 
     def get_document_count(self) -> int:
         """Return the number of documents in the index."""
-        client = self._get_search_client()
-        return client.get_document_count()
+        return self._client.get_document_count()
+
+
+class AsyncSearchClient:
+    """Query-side Azure AI Search client for asyncio callers.
+
+    Requests run on the event loop instead of holding a thread for the network
+    round trip. The underlying ``aio`` client (and its connection pool) is
+    created on first use, inside the loop that will drive it.
+    """
+
+    def __init__(self, endpoint: str, credential: AzureKeyCredential, index_name: str = INDEX_NAME):
+        self._endpoint = endpoint
+        self._credential = credential
+        self._index_name = index_name
+        self._client = None
+
+    def _get_search_client(self):
+        if self._client is None:
+            from azure.search.documents.aio import SearchClient as AsyncAzureSearchClient
+            self._client = AsyncAzureSearchClient(self._endpoint, self._index_name, self._credential)
+        return self._client
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+    async def _search(self, **kwargs) -> list[dict]:
+        results = await self._get_search_client().search(select=SELECT_FIELDS, **kwargs)
+        return [_hit(r) async for r in results]
+
+    async def search_text(self, query: str, top_k: int = 5, filter: Optional[str] = None) -> list[dict]:
+        return await self._search(search_text=query, filter=filter, top=top_k)
+
+    async def search_vector(self, embedding: list[float], top_k: int = 5,
+                            filter: Optional[str] = None) -> list[dict]:
+        return await self._search(search_text=None, vector_queries=[_vector_query(embedding, top_k)],
+                                  vector_filter_mode="preFilter", filter=filter, top=top_k)
+
+    async def search_hybrid(self, query: str, embedding: list[float], top_k: int = 5,
+                            filter: Optional[str] = None) -> list[dict]:
+        return await self._search(search_text=query, vector_queries=[_vector_query(embedding, top_k)],
+                                  vector_filter_mode="preFilter", filter=filter, top=top_k)
@@ -0,0 +1,99 @@
+import hashlib
+import os
+
+import numpy as np
+import pytest
+
+from data_contracts.paper import EnrichedPaper, PaperSummary
+from services.api import paper_store
+from services.api.config import Config
+
+DIM = 8
+
+
+class FakeEncoder:
+    """Deterministic stand-in for SentenceTransformer: same text, same vector."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def encode(self, text, **_kwargs):
+        self.calls += 1
+        if isinstance(text, (list, tuple)):
+            return np.stack([self._vector(t) for t in text])
+        return self._vector(text)
+
+    @staticmethod
+    def _vector(text: str) -> np.ndarray:
+        seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+        return np.random.default_rng(seed).standard_normal(DIM).astype(np.float32)
+
+
+def make_paper(paper_id: str, embedding=None, **overrides) -> EnrichedPaper:
+    fields = dict(
+        paper_id=paper_id,
+        title=f"Paper {paper_id}",
+        authors=["Alice"],
+        abstract=f"Abstract of {paper_id}",
+        clean_text=f"Full text of {paper_id}. " * 10,
+        summary=PaperSummary(
+            research_question="q",
+            methodology="m",
+            key_findings=["f"],
+            contributions="c",
+            limitations="l",
+        ),
+        topics=["testing"],
+        embedding=embedding,
+    )
+    fields.update(overrides)
+    return EnrichedPaper(**fields)
+
+
+def write_paper(directory: str, paper: EnrichedPaper) -> str:
+    path = os.path.join(directory, f"{paper.paper_id}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(paper.model_dump_json())
+    return path
+
+
+@pytest.fixture
+def fake_encoder(monkeypatch):
+    encoder = FakeEncoder()
+    monkeypatch.setattr(paper_store, "_load_embedding_model", lambda: encoder)
+    return encoder
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    enriched = tmp_path / "enriched_papers"
+    enriched.mkdir()
+    monkeypatch.setattr(Config, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(Config, "ENRICHED_DIR", str(enriched))
+    monkeypatch.setattr(Config, "EMBEDDINGS_DIR", str(tmp_path / "embeddings"))
+    monkeypatch.setattr(Config, "SNAPSHOT_PATH", str(tmp_path / "catalog.snapshot"))
+    monkeypatch.setattr(Config, "SHARED_DIR", str(tmp_path / "shared"))
+    monkeypatch.setattr(Config, "USE_AZURE_SEARCH", False)
+    return tmp_path
+
+
+def corpus_vectors(n: int, seed: int = 0) -> np.ndarray:
+    return np.random.default_rng(seed).standard_normal((n, DIM)).astype(np.float32)
+
+
+@pytest.fixture
+def api_store(data_dir, fake_encoder, monkeypatch):
+    """A loaded PaperStore with five papers, served by the papers routes."""
+    from services.api.routes import papers as papers_routes
+    from shared.embedding_store import EmbeddingStore
+
+    vectors = corpus_vectors(5)
+    embeddings = EmbeddingStore(Config.EMBEDDINGS_DIR)
+    for i, vector in enumerate(vectors):
+        embeddings.append(f"p{i}", vector)
+        write_paper(Config.ENRICHED_DIR, make_paper(f"p{i}"))
+
+    store = paper_store.PaperStore()
+    store.load_papers()
+    monkeypatch.setattr(papers_routes, "store", store)
+    return store
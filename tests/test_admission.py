@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+
+from services.api.admission import AdmissionLimiter, AdmissionRejected
+
+
+async def _hold(limiter: AdmissionLimiter, release: asyncio.Event, order: list[int], i: int) -> None:
+    async with limiter.slot():
+        order.append(i)
+        await release.wait()
+
+
+class TestAdmissionLimiter:
+    def test_queue_full_is_rejected_immediately(self):
+        async def run():
+            limiter = AdmissionLimiter("test", limit=1, queue_size=1, timeout=5)
+            release, order = asyncio.Event(), []
+            holders = [asyncio.create_task(_hold(limiter, release, order, i)) for i in range(2)]
+            await asyncio.sleep(0)
+            assert (limiter.active, limiter.queued) == (1, 1)
+
+            with pytest.raises(AdmissionRejected) as rejected:
+                async with limiter.slot():
+                    pass
+            release.set()
+            await asyncio.gather(*holders)
+            return rejected.value, order, limiter
+
+        rejected, order, limiter = asyncio.run(run())
+        assert rejected.status_code == 429 and rejected.retry_after >= 1
+        assert order == [0, 1]
+        assert (limiter.active, limiter.queued) == (0, 0)
+
+    def test_waiting_past_the_deadline_is_rejected(self):
+        async def run():
+            limiter = AdmissionLimiter("test", limit=1, queue_size=4, timeout=0.02)
+            release = asyncio.Event()
+            holder = asyncio.create_task(_hold(limiter, release, [], 0))
+            await asyncio.sleep(0)
+            with pytest.raises(AdmissionRejected) as rejected:
+                async with limiter.slot():
+                    pass
+            assert limiter.queued == 0
+            release.set()
+            await holder
+            return rejected.value, limiter
+
+        rejected, limiter = asyncio.run(run())
+        assert rejected.status_code == 503
+        assert limiter.active == 0
+
+    def test_slots_pass_to_waiters_in_arrival_order(self):
+        async def run():
+            limiter = AdmissionLimiter("test", limit=2, queue_size=8, timeout=5)
+            release, order = asyncio.Event(), []
+            holders = []
+            for i in range(6):
+                holders.append(asyncio.create_task(_hold(limiter, release, order, i)))
+                await asyncio.sleep(0)
+            assert (limiter.active, limiter.queued) == (2, 4)
+            release.set()
+            await asyncio.gather(*holders)
+            return order, limiter
+
+        order, limiter = asyncio.run(run())
+        assert order == list(range(6))
+        assert limiter.active == 0
+
+    def test_cancelled_waiter_leaves_the_queue(self):
+        async def run():
+            limiter = AdmissionLimiter("test", limit=1, queue_size=4, timeout=5)
+            release = asyncio.Event()
+            holder = asyncio.create_task(_hold(limiter, release, [], 0))
+            await asyncio.sleep(0)
+            waiter = asyncio.create_task(_hold(limiter, release, [], 1))
+            await asyncio.sleep(0)
+            waiter.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await waiter
+            assert limiter.queued == 0
+            release.set()
+            await holder
+            return limiter
+
+        assert asyncio.run(run()).active == 0
+
+    def test_zero_limit_disables(self):
+        async def run():
+            limiter = AdmissionLimiter("test", limit=0, queue_size=0, timeout=0)
+            async with limiter.slot():
+                async with limiter.slot():
+                    return limiter.active
+
+        assert asyncio.run(run()) == 0
@@ -1,7 +1,19 @@
+import asyncio
+import json
+
+import httpx
 import pytest
 from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from prometheus_client.openmetrics.exposition import generate_latest
 
+from services.api.config import Config
+from services.api.admission import AdmissionLimiter
+from services.api.cluster import ScatterGather
 from services.api.main import app
+from services.api.routes import cluster as cluster_routes
+from services.api.routes import papers as papers_routes
+from tests.conftest import make_paper, write_paper
 
 client = TestClient(app)
 
@@ -13,6 +25,17 @@ class TestHealthEndpoint:
         assert response.json()["status"] == "healthy"
 
 
+class TestReadiness:
+    def test_not_ready_until_warmed_up(self, api_store):
+        assert client.get("/ready").status_code == 503
+        assert client.get("/health").status_code == 200
+
+        api_store.warm_up()
+        response = client.get("/ready")
+        assert response.status_code == 200
+        assert response.json()["papers"] == 5
+
+
 class TestPapersEndpoint:
     def test_list_papers_returns_list(self):
         response = client.get("/papers/")
@@ -33,3 +56,267 @@ class TestPapersEndpoint:
         data = response.json()
         assert "query" in data
         assert "results" in data
+
+
+class TestBatchSearchEndpoint:
+    def test_batch_returns_one_entry_per_query(self):
+        response = client.post("/papers/search/batch", json={"queries": ["a", "b"], "top_k": 3})
+        assert response.status_code == 200
+        data = response.json()
+        assert [entry["query"] for entry in data["results"]] == ["a", "b"]
+
+    def test_rejects_unknown_mode(self):
+        response = client.post("/papers/search/batch", json={"queries": ["a"], "mode": "fuzzy"})
+        assert response.status_code == 422
+
+    def test_batch_requires_queries(self):
+        response = client.post("/papers/search/batch", json={"queries": []})
+        assert response.status_code == 422
+
+    def test_batch_rejects_empty_query(self):
+        response = client.post("/papers/search/batch", json={"queries": ["a", ""]})
+        assert response.status_code == 422
+
+
+class TestFilteredSearchEndpoint:
+    def test_filters_restrict_results(self, api_store):
+        write_paper(Config.ENRICHED_DIR, make_paper("p1", topics=["vision"], published="2024-03-01"))
+        api_store.refresh()
+
+        response = client.get("/papers/search", params={"q": "paper", "topic": ["vision", "speech"],
+                                                        "published_from": "2024-01-01"})
+        assert response.status_code == 200
+        assert [r["paper_id"] for r in response.json()["results"]] == ["p1"]
+
+        response = client.post("/papers/search/batch", json={"queries": ["paper"], "filters": {"topics": ["nope"]}})
+        assert response.json()["results"][0]["results"] == []
+
+    def test_rejects_bad_date(self, api_store):
+        response = client.get("/papers/search", params={"q": "paper", "published_from": "yesterday"})
+        assert response.status_code == 422
+
+
+class TestServerTiming:
+    def test_search_reports_phases(self, api_store):
+        write_paper(Config.ENRICHED_DIR, make_paper("p1"))
+        api_store.refresh()
+
+        response = client.get("/papers/search", params={"q": "paper", "mode": "keyword"})
+        names = [entry.split(";")[0] for entry in response.headers["server-timing"].split(", ")]
+        assert names == ["keyword", "results", "total"]
+
+    def test_other_routes_have_no_header(self, api_store):
+        assert "server-timing" not in client.get("/health").headers
+
+
+class TestSearchAdmission:
+    def test_overload_is_shed_with_retry_after(self, api_store, monkeypatch):
+        search = api_store.search_async
+
+        async def slow_search(*args, **kwargs):
+            await asyncio.sleep(0.05)
+            return await search(*args, **kwargs)
+
+        monkeypatch.setattr(api_store, "search_async", slow_search)
+        monkeypatch.setattr(papers_routes, "search_admission", AdmissionLimiter("search", 1, 1, 5))
+
+        async def burst() -> list[httpx.Response]:
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+                return await asyncio.gather(*(http.get("/papers/search", params={"q": "paper"})
+                                              for _ in range(3)))
+
+        responses = asyncio.run(burst())
+        assert sorted(r.status_code for r in responses) == [200, 200, 429]
+        shed = next(r for r in responses if r.status_code == 429)
+        assert int(shed.headers["retry-after"]) >= 1
+        assert client.get("/papers/p1").status_code == 200
+
+
+class TestClusterSearch:
+    @staticmethod
+    def _coordinator(monkeypatch, status_of: dict[str, int]) -> None:
+        def handler(request: httpx.Request) -> httpx.Response:
+            status = status_of[request.url.host]
+            if status != 200:
+                return httpx.Response(status)
+            result = {"paper_id": request.url.host, "title": "t", "score": 0.5}
+            return httpx.Response(200, json={"query": "q", "results": [result]})
+
+        urls = [f"http://{host}" for host in status_of]
+        monkeypatch.setattr(cluster_routes, "coordinator",
+                            ScatterGather(urls, timeout=1, transport=httpx.MockTransport(handler)))
+
+    def test_disabled_without_shards(self):
+        assert client.get("/cluster/search", params={"q": "x"}).status_code == 404
+
+    def test_partial_results_name_failed_shards(self, monkeypatch):
+        self._coordinator(monkeypatch, {"s0": 200, "s1": 500})
+        response = client.get("/cluster/search", params={"q": "x", "mode": "vector"})
+        assert response.status_code == 200
+        data = response.json()
+        assert [r["paper_id"] for r in data["results"]] == ["s0"]
+        assert data["partial"] and [f["shard"] for f in data["failed_shards"]] == [1]
+
+    def test_no_shard_answering_is_503(self, monkeypatch):
+        self._coordinator(monkeypatch, {"s0": 503})
+        response = client.get("/cluster/search", params={"q": "x"})
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "1"
+
+
+class TestPaperPayloads:
+    def test_detail_is_served_gzipped(self, api_store):
+        write_paper(Config.ENRICHED_DIR, make_paper("p1", clean_text="long text " * 1000))
+        api_store.refresh()
+
+        response = client.get("/papers/p1", headers={"Accept-Encoding": "gzip"})
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["vary"]
+        data = response.json()
+        assert data["clean_text"].startswith("long text")
+        assert "embedding" not in data
+
+    def test_summary_payload(self, api_store):
+        response = client.get("/papers/p2/summary")
+        assert response.status_code == 200
+        assert "content-encoding" not in response.headers
+        assert response.json() == {
+            "paper_id": "p2",
+            "title": "Paper p2",
+            "summary": make_paper("p2").summary.model_dump(),
+        }
+        assert client.get("/papers/missing/summary").status_code == 404
+
+    def test_edited_paper_gets_new_payload(self, api_store):
+        client.get("/papers/p3")
+        write_paper(Config.ENRICHED_DIR, make_paper("p3", title="Renamed"))
+        api_store.refresh()
+        assert client.get("/papers/p3").json()["title"] == "Renamed"
+        assert client.get("/papers/p3/summary").json()["title"] == "Renamed"
+
+
+class TestSimilarEndpoint:
+    def test_returns_neighbours(self, api_store):
+        response = client.get("/papers/p0/similar", params={"top_k": 3})
+        assert response.status_code == 200
+        ids = [r["paper_id"] for r in response.json()["results"]]
+        assert len(ids) == 3 and "p0" not in ids
+
+    def test_unknown_paper(self, api_store):
+        assert client.get("/papers/nope/similar").status_code == 404
+
+
+class TestAdminEndpoints:
+    def test_disabled_without_token(self, monkeypatch):
+        monkeypatch.setattr(Config, "ADMIN_TOKEN", "")
+        response = client.post("/admin/refresh")
+        assert response.status_code == 403
+
+    def test_rejects_wrong_token(self, monkeypatch):
+        monkeypatch.setattr(Config, "ADMIN_TOKEN", "secret")
+        response = client.post("/admin/refresh", headers={"X-Admin-Token": "wrong"})
+        assert response.status_code == 401
+
+    def test_delete_unknown_paper(self, monkeypatch):
+        monkeypatch.setattr(Config, "ADMIN_TOKEN", "secret")
+        response = client.delete("/admin/papers/nope", headers={"X-Admin-Token": "secret"})
+        assert response.status_code == 404
+
+
+class TestRequestMetrics:
+    @staticmethod
+    def _count(endpoint: str, status: str) -> float:
+        labels = {"method": "GET", "endpoint": endpoint, "status": status}
+        return REGISTRY.get_sample_value("api_requests_total", labels) or 0.0
+
+    def test_labels_use_route_templates(self, api_store):
+        before = self._count("/papers/{paper_id}", "200")
+        client.get("/papers/p1")
+        client.get("/papers/p2")
+        assert self._count("/papers/{paper_id}", "200") == before + 2
+        assert self._count("/papers/p1", "200") == 0
+
+    def test_unmatched_paths_share_one_label(self, api_store):
+        before = self._count("<unmatched>", "404")
+        client.get("/no/such/path")
+        client.get("/another/missing/path")
+        assert self._count("<unmatched>", "404") == before + 2
+
+    def test_exemplars_carry_path_params(self, api_store, monkeypatch):
+        monkeypatch.setattr(Config, "METRIC_EXEMPLARS", True)
+        client.get("/papers/p3/summary")
+        exposition = generate_latest(REGISTRY).decode()
+        assert 'endpoint="/papers/{paper_id}/summary"' in exposition
+        assert '# {paper_id="p3"}' in exposition
+
+
+class TestProfilingEndpoints:
+    def test_requires_admin_token(self, monkeypatch):
+        monkeypatch.setattr(Config, "ADMIN_TOKEN", "secret")
+        assert client.post("/admin/profile/cpu", params={"seconds": 0.05}).status_code == 401
+
+    def test_cpu_and_memory_profiles(self, monkeypatch):
+        monkeypatch.setattr(Config, "ADMIN_TOKEN", "secret")
+        headers = {"X-Admin-Token": "secret"}
+
+        response = client.post("/admin/profile/cpu", params={"seconds": 0.05, "format": "top"}, headers=headers)
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert response.text.startswith("  self%")
+
+        response = client.post("/admin/profile/memory", params={"seconds": 0.05}, headers=headers)
+        assert response.status_code == 200
+        assert "size_kib" in response.text
+
+        assert client.post("/admin/profile/cpu", params={"seconds": 500}, headers=headers).status_code == 422
+
+
+class TestExportEndpoint:
+    def test_streams_ndjson(self, api_store):
+        response = client.get("/papers/export", params={"fields": "title", "embeddings": "true"})
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        lines = response.text.splitlines()
+        assert [json.loads(line)["paper_id"] for line in lines] == ["p0", "p1", "p2", "p3", "p4"]
+        assert set(json.loads(lines[0])) == {"paper_id", "title", "embedding"}
+
+    def test_rejects_unknown_fields(self, api_store):
+        assert client.get("/papers/export", params={"fields": "embedding"}).status_code == 400
+
+
+class TestPaperListing:
+    def test_full_listing_without_limit(self, api_store):
+        response = client.get("/papers/")
+        assert response.status_code == 200
+        assert [p["paper_id"] for p in response.json()] == ["p0", "p1", "p2", "p3", "p4"]
+        assert "X-Next-Cursor" not in response.headers
+
+    def test_cursor_pagination(self, api_store):
+        seen, cursor = [], None
+        while True:
+            params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+            response = client.get("/papers/", params=params)
+            seen += [p["paper_id"] for p in response.json()]
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+        assert seen == ["p0", "p1", "p2", "p3", "p4"]
+
+    def test_field_projection(self, api_store):
+        response = client.get("/papers/", params={"fields": "title"})
+        assert response.json()[0] == {"paper_id": "p0", "title": "Paper p0"}
+        assert client.get("/papers/", params={"fields": "clean_text"}).status_code == 400
+
+    def test_etag_not_modified_until_store_changes(self, api_store):
+        etag = client.get("/papers/").headers["ETag"]
+        assert client.get("/papers/", headers={"If-None-Match": etag}).status_code == 304
+
+        api_store.upsert_paper(make_paper("p9"))
+        response = client.get("/papers/", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+
+    def test_invalid_cursor(self, api_store):
+        assert client.get("/papers/", params={"cursor": "%%%"}).status_code == 400
@@ -0,0 +1,102 @@
+import json
+import os
+
+import httpx
+import pytest
+
+from benchmarks.corpus import corpus_size, generate_corpus, sample_queries
+from benchmarks.load_test import parse_mix, summarize
+from benchmarks.search_bench import StubEncoder, latency_ms
+from benchmarks.stub_search_service import StubSearchService, load_documents
+from data_contracts.paper import EnrichedPaper
+from services.api.paper_store import PaperStore
+
+
+class TestSyntheticCorpus:
+    def test_corpus_loads_into_the_store(self, data_dir, fake_encoder):
+        generate_corpus(str(data_dir), 30, dim=16)
+
+        assert corpus_size(str(data_dir)) == 30
+        names = sorted(os.listdir(data_dir / "enriched_papers"))
+        with open(data_dir / "enriched_papers" / names[0], encoding="utf-8") as f:
+            paper = EnrichedPaper(**json.load(f))
+        assert len(paper.embedding) == 16 and paper.topics and paper.published
+
+        store = PaperStore()
+        store.load_papers()
+        assert len(store.papers) == 30
+        assert store.search(sample_queries(1)[0], top_k=5, mode="keyword")
+
+    def test_generation_is_deterministic(self, tmp_path):
+        generate_corpus(str(tmp_path / "a"), 5, dim=8, json_embeddings=False)
+        generate_corpus(str(tmp_path / "b"), 5, dim=8, json_embeddings=False)
+        a = (tmp_path / "a" / "enriched_papers" / "synthetic_paper_0000003.json").read_text()
+        b = (tmp_path / "b" / "enriched_papers" / "synthetic_paper_0000003.json").read_text()
+        assert json.loads(a)["title"] == json.loads(b)["title"]
+        assert json.loads(a)["embedding"] is None
+
+
+class TestHelpers:
+    def test_stub_encoder_is_deterministic(self):
+        encoder = StubEncoder(dim=8)
+        assert (encoder.encode(["a", "b"])[0] == encoder.encode(["a"])[0]).all()
+
+    def test_latency_percentiles(self):
+        stats = latency_ms(lambda _: None, range(20))
+        assert set(stats) == {"p50", "p95", "p99", "mean"}
+
+
+class TestLoadTestHelpers:
+    def test_parse_mix(self):
+        assert parse_mix("list=1,search=3") == {"list": 1.0, "search": 3.0}
+        with pytest.raises(ValueError):
+            parse_mix("export=1")
+
+    def test_summary_counts_errors_per_endpoint(self):
+        summary = summarize({"search": [(0.01, 200), (0.02, 503), (0.03, 0), (0.04, 429), (0.05, 500)],
+                             "list": []}, elapsed=1.0)
+        assert list(summary) == ["search"]
+        assert summary["search"]["errors"] == 2
+        assert summary["search"]["error_rate"] == 0.4
+        assert summary["search"]["shed"] == 2
+        assert summary["search"]["status"] == {"200": 1, "503": 1, "0": 1, "429": 1, "500": 1}
+        assert summary["search"]["rps"] == 5.0
+
+    def test_stub_search_service_answers_searches(self, tmp_path):
+        generate_corpus(str(tmp_path), 10, dim=8)
+        service = StubSearchService(load_documents(str(tmp_path / "enriched_papers"))).start()
+        try:
+            response = httpx.post(f"{service.endpoint}/indexes('papers')/docs/search.post.search",
+                                  json={"search": "x", "top": 3})
+        finally:
+            service.stop()
+        hits = response.json()["value"]
+        assert len(hits) == 3
+        assert hits[0]["paper_id"].startswith("synth-") and "@search.score" in hits[0]
+
+    def test_stub_search_service_accepts_index_updates(self, tmp_path):
+        service = StubSearchService([]).start()
+        try:
+            fields = httpx.get(f"{service.endpoint}/indexes('papers')").json()["fields"]
+            updated = {"name": "papers", "fields": fields + [{"name": "extra", "type": "Edm.String"}]}
+            assert httpx.put(f"{service.endpoint}/indexes('papers')", json=updated).status_code == 200
+            after = httpx.get(f"{service.endpoint}/indexes('papers')").json()
+        finally:
+            service.stop()
+        assert "embedding" in {field["name"] for field in fields}
+        assert after == updated
+
+    def test_search_client_starts_against_the_stub(self, tmp_path):
+        pytest.importorskip("azure.search.documents")
+        from shared.search_client import SearchClient
+
+        generate_corpus(str(tmp_path), 10, dim=8)
+        service = StubSearchService(load_documents(str(tmp_path / "enriched_papers"))).start()
+        try:
+            client = SearchClient(endpoint=service.endpoint, api_key="offline")
+            hits = client.search_text("x", top_k=3)
+            client.close()
+        finally:
+            service.stop()
+        assert len(hits) == 3
+        assert hits[0]["paper_id"].startswith("synth-")
@@ -0,0 +1,97 @@
+import threading
+from concurrent.futures import Future
+import time
+
+import pytest
+
+from services.api.cache import TTLCache
+
+
+class TestTTLCache:
+    def test_lru_eviction(self):
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+
+    def test_entries_expire(self):
+        cache = TTLCache(maxsize=10, ttl=0.01)
+        cache.put("a", 1)
+        time.sleep(0.02)
+        assert cache.get("a") is None
+
+    def test_compute_many_only_computes_misses(self):
+        cache = TTLCache(maxsize=10, ttl=60)
+        cache.put("a", "A")
+        computed = []
+
+        def compute(keys):
+            computed.extend(keys)
+            return [k.upper() for k in keys]
+
+        assert cache.get_or_compute_many(["a", "b", "b", "c"], compute) == ["A", "B", "B", "C"]
+        assert computed == ["b", "c"]
+
+    def test_concurrent_misses_are_coalesced(self):
+        cache = TTLCache(maxsize=10, ttl=60)
+        calls = []
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow():
+            calls.append(1)
+            started.set()
+            release.wait(1)
+            return "value"
+
+        results = []
+        leader = threading.Thread(target=lambda: results.append(cache.get_or_compute("k", slow)))
+        leader.start()
+        started.wait(1)
+        followers = [
+            threading.Thread(target=lambda: results.append(cache.get_or_compute("k", slow)))
+            for _ in range(3)
+        ]
+        for t in followers:
+            t.start()
+        release.set()
+        for t in [leader, *followers]:
+            t.join(1)
+
+        assert results == ["value"] * 4
+        assert len(calls) == 1
+
+    def test_failed_compute_is_not_cached(self):
+        cache = TTLCache(maxsize=10, ttl=60)
+
+        def boom():
+            raise RuntimeError("encode failed")
+
+        with pytest.raises(RuntimeError):
+            cache.get_or_compute("k", boom)
+        assert cache.get_or_compute("k", lambda: 1) == 1
+
+    def test_submit_many_resolves_when_batch_completes(self):
+        cache = TTLCache(maxsize=10, ttl=60)
+        cache.put("a", "A")
+        batch = Future()
+        submitted = []
+
+        def submit(keys):
+            submitted.append(keys)
+            return batch
+
+        futures = cache.get_or_submit_many(["a", "b", "c"], submit)
+        again = cache.get_or_submit_many(["b"], submit)
+        assert futures[0].result() == "A"
+        assert not futures[1].done()
+        assert again[0] is futures[1]
+
+        batch.set_result(["B", "C"])
+        assert [f.result() for f in futures] == ["A", "B", "C"]
+        assert submitted == [["b", "c"]]
+        assert cache.get("c") == "C"
@@ -0,0 +1,99 @@
+import asyncio
+from urllib.parse import parse_qs
+
+import httpx
+import pytest
+from prometheus_client import REGISTRY
+
+from services.api.cluster import ScatterGather, merge_top_k
+from services.api.sharding import shard_of
+
+
+def _result(paper_id: str, score: float) -> dict:
+    return {"paper_id": paper_id, "title": paper_id, "score": score}
+
+
+def _shards(replies: dict[str, object], delay: dict[str, float] = None) -> httpx.MockTransport:
+    """Shards keyed by host; a reply is a result list per mode, or an HTTP status."""
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep((delay or {}).get(request.url.host, 0))
+        reply = replies[request.url.host]
+        if isinstance(reply, int):
+            return httpx.Response(reply)
+        params = parse_qs(request.url.query.decode())
+        results = reply[params["mode"][0]][:int(params["top_k"][0])]
+        return httpx.Response(200, json={"query": params["q"][0], "results": results})
+    return httpx.MockTransport(handler)
+
+
+class TestSharding:
+    def test_shard_of_is_stable_and_spreads_papers(self):
+        assert shard_of("2401.00001", 4) == shard_of("2401.00001", 4)
+        counts = [0] * 4
+        for i in range(4000):
+            counts[shard_of(f"synth.{i:07d}", 4)] += 1
+        assert min(counts) > 900
+
+
+class TestMergeTopK:
+    def test_best_scores_across_shards(self):
+        merged = merge_top_k([[_result("a", 0.9), _result("b", 0.5)], [_result("c", 0.7)], []], 2)
+        assert [r["paper_id"] for r in merged] == ["a", "c"]
+
+    def test_duplicate_keeps_better_score(self):
+        merged = merge_top_k([[_result("a", 0.4)], [_result("a", 0.8), _result("b", 0.6)]], 5)
+        assert [(r["paper_id"], r["score"]) for r in merged] == [("a", 0.8), ("b", 0.6)]
+
+
+class TestScatterGather:
+    def test_merges_shard_top_k(self):
+        transport = _shards({
+            "s0": {"vector": [_result("a", 0.9), _result("b", 0.2)]},
+            "s1": {"vector": [_result("c", 0.8), _result("d", 0.7)]},
+        })
+        coordinator = ScatterGather(["http://s0", "http://s1"], timeout=1, transport=transport)
+        results, failed = asyncio.run(coordinator.search([("q", "x")], 3, "vector", 50, 60))
+        assert [r["paper_id"] for r in results] == ["a", "c", "d"]
+        assert failed == []
+
+    def test_slow_and_failing_shards_are_left_out(self):
+        transport = _shards({
+            "s0": {"vector": [_result("a", 0.9)]},
+            "s1": {"vector": [_result("b", 0.95)]},
+            "s2": 503,
+        }, delay={"s1": 1.0})
+        coordinator = ScatterGather(["http://s0", "http://s1", "http://s2"], timeout=0.1, transport=transport)
+        results, failed = asyncio.run(coordinator.search([("q", "x")], 5, "vector", 50, 60))
+        assert [r["paper_id"] for r in results] == ["a"]
+        assert [(f["shard"], f["error"]) for f in failed] == [(1, "No reply within 0.1s"), (2, "HTTP 503")]
+
+    def test_hybrid_with_slow_and_failing_shards_counts_each_outcome(self):
+        def count(shard: int, outcome: str) -> float:
+            labels = {"shard": str(shard), "outcome": outcome}
+            return REGISTRY.get_sample_value("api_shard_requests_total", labels) or 0.0
+
+        transport = _shards({
+            "s0": {"vector": [_result("a", 0.9)], "keyword": [_result("a", 3.0)]},
+            "s1": {"vector": [_result("b", 0.95)], "keyword": [_result("b", 5.0)]},
+            "s2": 500,
+        }, delay={"s1": 1.0})
+        before = {(s, o): count(s, o) for s in range(3) for o in ("ok", "timeout", "error")}
+        coordinator = ScatterGather(["http://s0", "http://s1", "http://s2"], timeout=0.1, transport=transport)
+        results, failed = asyncio.run(coordinator.search([("q", "x")], 5, "hybrid", 50, 60))
+
+        assert [r["paper_id"] for r in results] == ["a"]
+        assert [(f["shard"], f["error"]) for f in failed] == [(1, "No reply within 0.1s"), (2, "HTTP 500")]
+        # One vector and one keyword request per shard.
+        delta = {key: count(*key) - value for key, value in before.items()}
+        assert {key: n for key, n in delta.items() if n} == {(0, "ok"): 2, (1, "timeout"): 2, (2, "error"): 2}
+
+    def test_hybrid_fuses_global_rankings(self):
+        transport = _shards({
+            "s0": {"vector": [_result("a", 0.9)], "keyword": [_result("b", 12.0)]},
+            "s1": {"vector": [_result("b", 0.8)], "keyword": [_result("c", 9.0)]},
+        })
+        coordinator = ScatterGather(["http://s0", "http://s1"], timeout=1, transport=transport)
+        results, _ = asyncio.run(coordinator.search([("q", "x"), ("mode", "hybrid")], 2, "hybrid", 50, 60))
+        # b is second by vector and first by keyword, so it wins the fusion.
+        assert [r["paper_id"] for r in results] == ["b", "a"]
+        assert results[0]["score"] == pytest.approx((1 / 62 + 1 / 61) / (2 / 61))
@@ -0,0 +1,113 @@
+import os
+import threading
+
+import numpy as np
+import pytest
+
+from data_contracts.paper import PaperSummary, ValidatedPaper, ValidationResult
+from shared.embedding_store import EmbeddingStore, latest_rows
+
+
+class TestEmbeddingStore:
+    def test_append_and_open_normalizes(self, tmp_path):
+        store = EmbeddingStore(str(tmp_path / "emb"))
+        store.append("a", [3.0, 4.0])
+        store.append_many(["b", "c"], np.array([[1.0, 0.0], [0.0, 2.0]]))
+
+        ids, matrix = store.open()
+        assert ids == ["a", "b", "c"]
+        assert isinstance(matrix, np.memmap)
+        np.testing.assert_allclose(matrix[0], [0.6, 0.8], atol=1e-6)
+        np.testing.assert_allclose(np.linalg.norm(matrix, axis=1), 1.0, atol=1e-6)
+
+    def test_open_missing_store_is_empty(self, tmp_path):
+        ids, matrix = EmbeddingStore(str(tmp_path / "missing")).open()
+        assert ids == []
+        assert matrix.shape[0] == 0
+
+    def test_rejects_dimension_mismatch(self, tmp_path):
+        store = EmbeddingStore(str(tmp_path))
+        store.append("a", [1.0, 0.0])
+        with pytest.raises(ValueError):
+            store.append("b", [1.0, 0.0, 0.0])
+
+    def test_latest_row_wins_and_compact(self, tmp_path):
+        store = EmbeddingStore(str(tmp_path))
+        store.append("a", [1.0, 0.0])
+        store.append("b", [0.0, 1.0])
+        store.append("a", [1.0, 1.0])
+        assert latest_rows(store.read_ids()) == {"a": 2, "b": 1}
+
+        assert store.compact() == 1
+        ids, matrix = store.open()
+        assert ids == ["b", "a"]
+        np.testing.assert_allclose(matrix[1], [2 ** -0.5, 2 ** -0.5], atol=1e-6)
+
+    def test_compact_skips_below_dead_ratio(self, tmp_path):
+        store = EmbeddingStore(str(tmp_path))
+        store.append_many(["a", "b", "c", "d"], np.eye(4))
+        store.append("a", [0.0, 1.0, 0.0, 0.0])
+
+        assert store.compact(min_dead_ratio=0.5) == 0
+        assert len(store.read_ids()) == 5
+        assert store.compact(min_dead_ratio=0.2) == 1
+        assert store.read_ids() == ["b", "c", "d", "a"]
+
+    def test_compaction_waits_for_readers(self, tmp_path):
+        store = EmbeddingStore(str(tmp_path))
+        store.append_many(["a", "b"], np.eye(2))
+        store.append("a", [1.0, 1.0])
+
+        with store.reading():
+            compaction = threading.Thread(target=store.compact)
+            compaction.start()
+            compaction.join(0.2)
+            assert compaction.is_alive()
+            assert store.read_ids() == ["a", "b", "a"]
+        compaction.join(5)
+        assert store.read_ids() == ["b", "a"]
+
+    def test_append_drops_orphan_rows(self, tmp_path):
+        store = EmbeddingStore(str(tmp_path))
+        store.append("a", [1.0, 0.0])
+        # A crash after the vectors were written but before the ids were.
+        with open(os.path.join(str(tmp_path), "vectors.f32"), "ab") as f:
+            f.write(np.array([0.0, 1.0], dtype=np.float32).tobytes())
+
+        store.append("b", [0.0, 1.0])
+        store.append("c", [1.0, 1.0])
+        ids, matrix = store.open()
+        assert ids == ["a", "b", "c"]
+        assert os.path.getsize(os.path.join(str(tmp_path), "vectors.f32")) == 3 * 2 * 4
+        np.testing.assert_allclose(matrix[2], [2 ** -0.5, 2 ** -0.5], atol=1e-6)
+
+
+class TestEnricherCompaction:
+    def test_rerunning_the_enricher_leaves_one_row_per_paper(self, tmp_path, monkeypatch):
+        pytest.importorskip("openai")
+        pytest.importorskip("sentence_transformers")
+        from services.enricher import main as enricher
+        from services.enricher.config import Config
+
+        input_dir = tmp_path / "validated"
+        input_dir.mkdir()
+        for i in range(5):
+            paper = ValidatedPaper(
+                paper_id=f"p{i}", title=f"Paper {i}", clean_text=f"Text {i}",
+                validation=ValidationResult(is_valid=True, checks={}),
+            )
+            (input_dir / f"p{i}.json").write_text(paper.model_dump_json(), encoding="utf-8")
+        summary = PaperSummary(research_question="q", methodology="m", key_findings=["f"],
+                               contributions="c", limitations="l")
+        monkeypatch.setattr(enricher, "summarize_paper", lambda text: summary)
+        monkeypatch.setattr(enricher, "extract_topics", lambda text: ["t"])
+        monkeypatch.setattr(enricher, "generate_embedding", lambda text: [1.0, float(len(text))])
+        monkeypatch.setattr(Config, "OUTPUT_DIR", str(tmp_path / "enriched"))
+        monkeypatch.setattr(Config, "EMBEDDINGS_DIR", str(tmp_path / "embeddings"))
+        monkeypatch.setattr(Config, "INDEX_TO_SEARCH", False)
+
+        enricher.process_validated_papers(str(input_dir))
+        enricher.process_validated_papers(str(input_dir))
+
+        ids = EmbeddingStore(str(tmp_path / "embeddings")).read_ids()
+        assert sorted(ids) == [f"p{i}" for i in range(5)]
@@ -0,0 +1,69 @@
+from datetime import date
+
+from data_contracts.paper import SearchFilters
+from services.api.catalog import CatalogEntry
+from services.api.filter_index import FilterIndex, to_odata
+from tests.conftest import make_paper
+
+
+def _entry(paper_id: str, **overrides) -> CatalogEntry:
+    data = make_paper(paper_id, **overrides).model_dump(mode="json")
+    return CatalogEntry.from_dict(data, f"{paper_id}.json", (0, 0))
+
+
+def _catalog() -> dict[str, CatalogEntry]:
+    entries = [
+        _entry("a", topics=["NLP", "retrieval"], authors=["Alice"], categories=["cs.CL"],
+               published="2023-01-15T12:00:00Z"),
+        _entry("b", topics=["vision"], authors=["Bob"], categories=["cs.CV"], published="2023-06-01T00:00:00Z"),
+        _entry("c", topics=["retrieval"], authors=["Alice", "Bob"], categories=["cs.IR"],
+               published="2024-02-29T08:00:00Z"),
+        _entry("d", topics=["vision"], authors=["Carol"]),
+    ]
+    return {e.paper_id: e for e in entries}
+
+
+class TestFilterIndex:
+    def test_fields_combine_with_and_values_with_or(self):
+        index = FilterIndex.build(_catalog().values())
+
+        assert index.matching(SearchFilters(topics=["retrieval"])) == {"a", "c"}
+        assert index.matching(SearchFilters(topics=["Retrieval"], authors=["bob"])) == {"c"}
+        assert index.matching(SearchFilters(categories=["cs.CL", "cs.CV"])) == {"a", "b"}
+        assert index.matching(SearchFilters(topics=["nothing"])) == frozenset()
+
+    def test_published_range_is_inclusive(self):
+        index = FilterIndex.build(_catalog().values())
+
+        assert index.matching(SearchFilters(published_from=date(2023, 6, 1))) == {"b", "c"}
+        assert index.matching(SearchFilters(published_to=date(2023, 6, 1))) == {"a", "b"}
+        assert index.matching(SearchFilters(published_from=date(2023, 2, 1), published_to=date(2023, 12, 31),
+                                            topics=["vision"])) == {"b"}
+
+    def test_updates_move_papers_between_postings(self):
+        papers = _catalog()
+        index = FilterIndex.build(papers.values())
+
+        updated_papers = dict(papers)
+        updated_papers["a"] = _entry("a", topics=["vision"], published="2025-01-01")
+        del updated_papers["b"]
+        updated = index.updated(papers, updated_papers, {"a", "b"})
+
+        assert updated.matching(SearchFilters(topics=["vision"])) == {"a", "d"}
+        assert updated.matching(SearchFilters(topics=["retrieval"])) == {"c"}
+        assert updated.matching(SearchFilters(published_from=date(2024, 6, 1))) == {"a"}
+        # The original index still answers for readers holding it.
+        assert index.matching(SearchFilters(topics=["vision"])) == {"b", "d"}
+
+
+class TestODataFilter:
+    def test_translates_every_field(self):
+        filters = SearchFilters(topics=["NLP", "it's"], authors=["Alice"],
+                                published_from=date(2023, 1, 1), published_to=date(2023, 12, 31))
+        assert to_odata(filters) == (
+            "topics/any(v: v eq 'NLP' or v eq 'it''s') and authors/any(v: v eq 'Alice') and "
+            "published ge 2023-01-01T00:00:00Z and published le 2023-12-31T23:59:59Z"
+        )
+
+    def test_empty_filter(self):
+        assert to_odata(SearchFilters()) is None
@@ -0,0 +1,86 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from services.api.inference import BatchingEncoder, EncoderOverloaded
+from tests.conftest import FakeEncoder
+
+
+class SlowModel(FakeEncoder):
+    """Fake model whose encode costs a fixed time per call, like a real forward pass."""
+
+    def __init__(self, delay: float = 0.01) -> None:
+        super().__init__()
+        self.delay = delay
+        self.batch_sizes: list[int] = []
+
+    def encode(self, text, **kwargs):
+        time.sleep(self.delay)
+        self.batch_sizes.append(len(text))
+        return super().encode(text, **kwargs)
+
+
+class TestBatchingEncoder:
+    def test_returns_normalized_vectors_in_order(self):
+        model = FakeEncoder()
+        encoder = BatchingEncoder(lambda: model, max_wait=0)
+        vectors = encoder.encode(["a", "b"])
+
+        expected = model._vector("b")
+        np.testing.assert_allclose(vectors[1], expected / np.linalg.norm(expected), rtol=1e-5)
+        assert not vectors[0].flags.writeable
+        encoder.close()
+
+    def test_concurrent_requests_share_model_calls(self):
+        model = SlowModel()
+        encoder = BatchingEncoder(lambda: model, max_batch=64, max_wait=0.005)
+        results = {}
+
+        def request(i: int) -> None:
+            results[i] = encoder.encode([f"query {i}"])[0]
+
+        threads = [threading.Thread(target=request, args=(i,)) for i in range(64)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        encoder.close()
+
+        assert len(results) == 64
+        assert sum(model.batch_sizes) == 64
+        assert len(model.batch_sizes) < 16
+        assert max(model.batch_sizes) <= 64
+        expected = model._vector("query 7")
+        np.testing.assert_allclose(results[7], expected / np.linalg.norm(expected), rtol=1e-5)
+
+    def test_full_queue_is_rejected(self):
+        release = threading.Event()
+
+        class Blocked(FakeEncoder):
+            def encode(self, text, **kwargs):
+                release.wait()
+                return super().encode(text, **kwargs)
+
+        encoder = BatchingEncoder(lambda: Blocked(), max_batch=1, max_wait=0, queue_size=1)
+        first = encoder.submit(["a"])
+        deadline = time.monotonic() + 1
+        while encoder._queue.qsize() and time.monotonic() < deadline:
+            time.sleep(0.001)
+        encoder.submit(["b"])
+        with pytest.raises(EncoderOverloaded):
+            encoder.submit(["c"])
+        release.set()
+        assert len(first.result(timeout=1)) == 1
+        encoder.close()
+
+    def test_model_errors_reach_every_caller(self):
+        class Broken:
+            def encode(self, text, **kwargs):
+                raise RuntimeError("model unavailable")
+
+        encoder = BatchingEncoder(lambda: Broken(), max_wait=0)
+        with pytest.raises(RuntimeError, match="model unavailable"):
+            encoder.encode(["a"])
+        encoder.close()
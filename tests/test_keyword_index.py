@@ -0,0 +1,77 @@
+import pytest
+
+from services.api.catalog import CatalogEntry
+from services.api.keyword_index import KeywordIndex, reciprocal_rank_fusion, tokenize
+from tests.conftest import make_paper
+
+
+def _entry(paper_id: str, **overrides) -> CatalogEntry:
+    data = make_paper(paper_id, **overrides).model_dump(mode="json")
+    return CatalogEntry.from_dict(data, f"{paper_id}.json", (0, 0))
+
+
+def _catalog(*entries: CatalogEntry) -> dict[str, CatalogEntry]:
+    return {e.paper_id: e for e in entries}
+
+
+class TestTokenize:
+    def test_lowercases_and_drops_stopwords(self):
+        assert tokenize("The Transformer of GPU-kernels, 2024") == ["transformer", "gpu", "kernels", "2024"]
+
+
+class TestKeywordIndex:
+    def test_ranks_by_bm25(self):
+        papers = _catalog(
+            _entry("a", title="Graph neural networks for molecules"),
+            _entry("b", title="Molecules molecules molecules everywhere"),
+            _entry("c", title="Protein folding"),
+        )
+        index = KeywordIndex.build(papers.values())
+
+        hits = index.search("molecules", top_k=5)
+        assert [pid for pid, _ in hits] == ["b", "a"]
+        assert hits[0][1] > hits[1][1] > 0
+        assert index.search("zebra", top_k=5) == []
+
+    def test_searches_summary_and_topics(self):
+        papers = _catalog(_entry("a", topics=["quantization"]), _entry("b"))
+        index = KeywordIndex.build(papers.values())
+        assert [pid for pid, _ in index.search("quantization", top_k=5)] == ["a"]
+
+    def test_updates_go_to_delta(self):
+        base = _catalog(*(_entry(f"p{i}", title=f"Paper p{i} about vision") for i in range(5)))
+        index = KeywordIndex.build(base.values())
+
+        papers = dict(base)
+        papers["p1"] = _entry("p1", title="Paper p1 about speech")
+        papers["new"] = _entry("new", title="Speech recognition")
+        del papers["p2"]
+        updated = index.updated(papers, {"p1", "p2", "new"})
+
+        assert updated.base is index.base
+        assert sorted(updated.delta.doc_ids) == ["new", "p1"]
+        assert {pid for pid, _ in updated.search("speech", top_k=10)} == {"p1", "new"}
+        assert {pid for pid, _ in updated.search("vision", top_k=10)} == {"p0", "p3", "p4"}
+        # The original index is untouched for readers still holding it.
+        assert {pid for pid, _ in index.search("vision", top_k=10)} == set(base)
+
+    def test_large_delta_triggers_rebuild(self):
+        base = _catalog(_entry("p0"))
+        index = KeywordIndex.build(base.values())
+        papers = dict(base, **{f"n{i}": _entry(f"n{i}") for i in range(1001)})
+
+        updated = index.updated(papers, set(papers) - {"p0"})
+        assert len(updated.base) == len(papers)
+        assert len(updated.delta) == 0
+
+
+class TestReciprocalRankFusion:
+    def test_fuses_rankings(self):
+        fused = reciprocal_rank_fusion([["a", "b", "c"], ["c", "a"]], k=60)
+        assert [pid for pid, _ in fused] == ["a", "c", "b"]
+        assert fused[0][1] == pytest.approx((1 / 61 + 1 / 62) / (2 / 61))
+
+    def test_first_in_every_list_scores_one(self):
+        fused = reciprocal_rank_fusion([["a", "b"], ["a", "c"]], k=60)
+        assert fused[0] == ("a", pytest.approx(1.0))
+        assert all(0 < score <= 1 for _, score in fused)
@@ -0,0 +1,70 @@
+import numpy as np
+
+from services.api.knn_graph import KnnGraph
+from services.api.vector_index import ExactIndex
+from tests.test_vector_index import _clustered
+
+
+def _brute_force(matrix: np.ndarray, k: int) -> np.ndarray:
+    scores = matrix @ matrix.T
+    np.fill_diagonal(scores, -np.inf)
+    return np.argsort(-scores, axis=1)[:, :k]
+
+
+class TestKnnGraph:
+    def test_build_matches_brute_force(self):
+        matrix = _clustered(300)
+        graph = KnnGraph.build(ExactIndex(matrix), k=5)
+        np.testing.assert_array_equal(graph.neighbors, _brute_force(matrix, 5))
+        assert (np.diff(graph.scores, axis=1) <= 0).all()
+
+    def test_small_corpus_leaves_empty_slots(self):
+        matrix = _clustered(3)
+        graph = KnnGraph.build(ExactIndex(matrix), k=5)
+        assert (graph.neighbors[:, :2] >= 0).all()
+        assert (graph.neighbors[:, 2:] == -1).all()
+
+    def test_appended_rows_update_existing_lists(self):
+        matrix = _clustered(400)
+        graph = KnnGraph.build(ExactIndex(matrix[:380]), k=5)
+        updated = graph.updated(ExactIndex(matrix[:380]).updated(matrix, None))
+
+        assert updated.neighbors.shape == (400, 5)
+        assert graph.neighbors.shape == (380, 5)
+        expected = _brute_force(matrix, 5)
+        np.testing.assert_array_equal(updated.neighbors[380:], expected[380:])
+        recall = np.mean([len(set(a) & set(b)) / 5 for a, b in zip(updated.neighbors, expected)])
+        assert recall >= 0.95
+
+    def test_remapped_rows_keep_their_lists(self):
+        matrix = _clustered(400)
+        graph = KnnGraph.build(ExactIndex(matrix[:380]), k=5)
+        kept = np.array([r for r in range(380) if r % 7])
+        old_rows = np.concatenate([kept, np.full(20, -1)])
+        compacted = np.concatenate([matrix[kept], matrix[380:]])
+
+        remapped = graph.remapped(ExactIndex(compacted), old_rows)
+        assert remapped.neighbors.shape == (len(compacted), 5)
+        # Dropped neighbours leave -inf gaps at the end of a list.
+        assert (remapped.scores[:, :-1] >= remapped.scores[:, 1:]).all()
+        assert ((remapped.neighbors == -1) == np.isneginf(remapped.scores)).all()
+        expected = _brute_force(compacted, 5)
+        np.testing.assert_array_equal(remapped.neighbors[len(kept):], expected[len(kept):])
+        recall = np.mean([len(set(a) & set(b)) / 5 for a, b in zip(remapped.neighbors, expected)])
+        assert recall >= 0.8
+
+    def test_lookup_skips_dead_rows(self):
+        matrix = _clustered(50)
+        graph = KnnGraph.build(ExactIndex(matrix), k=5)
+        alive = np.ones(50, dtype=bool)
+        dead = graph.neighbors[0, 0]
+        alive[dead] = False
+
+        rows, scores = graph.lookup(0, alive)
+        assert dead not in rows
+        assert len(rows) == len(scores) == 4
+
+    def test_large_append_asks_for_a_rebuild(self):
+        matrix = _clustered(3000)
+        graph = KnnGraph.build(ExactIndex(matrix[:1000]), k=5)
+        assert graph.updated(ExactIndex(matrix)) is None
@@ -0,0 +1,742 @@
+import asyncio
+import base64
+import json
+import os
+import threading
+from datetime import date
+
+import numpy as np
+import pytest
+
+from data_contracts.paper import SearchFilters
+from services.api import paper_store
+from services.api.config import Config
+from services.api.knn_graph import KnnGraph
+from services.api.paper_store import PaperStore
+from shared.embedding_store import EmbeddingStore
+from tests.conftest import corpus_vectors, make_paper, write_paper
+
+
+def _write_corpus(data_dir, n: int, use_store: bool = True) -> np.ndarray:
+    vectors = corpus_vectors(n)
+    store = EmbeddingStore(Config.EMBEDDINGS_DIR)
+    for i in range(n):
+        pid = f"p{i}"
+        write_paper(Config.ENRICHED_DIR, make_paper(pid, embedding=vectors[i].tolist()))
+        if use_store:
+            store.append(pid, vectors[i])
+    return vectors
+
+
+class TestLocalIndex:
+    def test_index_is_memory_mapped_from_store(self, data_dir, fake_encoder):
+        _write_corpus(data_dir, 5)
+        store = PaperStore()
+        store.load_papers()
+
+        index = store._snapshot.index
+        assert isinstance(index.matrix, np.memmap)
+        assert sorted(store._snapshot.row_of) == [f"p{i}" for i in range(5)]
+        assert not hasattr(store.papers["p0"], "embedding")
+
+    def test_falls_back_to_json_embeddings(self, data_dir, fake_encoder):
+        vectors = _write_corpus(data_dir, 4, use_store=False)
+        store = PaperStore()
+        store.load_papers()
+
+        row = store._snapshot.row_of["p2"]
+        expected = vectors[2] / np.linalg.norm(vectors[2])
+        np.testing.assert_allclose(store._snapshot.index.matrix[row], expected, atol=1e-6)
+
+    def test_mixes_store_and_json_embeddings(self, data_dir, fake_encoder):
+        _write_corpus(data_dir, 3)
+        legacy = fake_encoder.encode("legacy")
+        write_paper(Config.ENRICHED_DIR, make_paper("legacy", embedding=legacy.tolist()))
+        store = PaperStore()
+        store.load_papers()
+
+        assert len(store._snapshot.row_of) == 4
+        assert store.search("legacy", top_k=1)[0].paper_id == "legacy"
+
+    def test_search_ranks_exact_match_first(self, data_dir, fake_encoder):
+        _write_corpus(data_dir, 6)
+        query_vec = fake_encoder.encode("needle")
+        EmbeddingStore(Config.EMBEDDINGS_DIR).append("needle", query_vec)
+        write_paper(Config.ENRICHED_DIR, make_paper("needle"))
+        store = PaperStore()
+        store.load_papers()
+
+        results = store.search("needle", top_k=3, mode="vector")
+        assert results[0].paper_id == "needle"
+        assert results[0].score > 0.99
+
+
+class TestCatalog:
+    def test_catalog_holds_no_text(self, data_dir, fake_encoder):
+        _write_corpus(data_dir, 3)
+        store = PaperStore()
+        store.load_papers()
+
+        entry = store.get_entry("p1")
+        assert entry.title == "Paper p1"
+        assert not hasattr(entry, "clean_text")
+        assert not hasattr(entry, "__dict__")
+
+    def test_full_record_is_loaded_lazily_and_cached(self, data_dir, fake_encoder, monkeypatch):
+        _write_corpus(data_dir, 3)
+        store = PaperStore()
+        store.load_papers()
+
+        reads = []
+        original = paper_store.load_record
+        monkeypatch.setattr(paper_store, "load_record", lambda e: reads.append(e.paper_id) or original(e))
+
+        assert store.get_paper("p1").clean_text.startswith("Full text of p1")
+        store.get_paper("p1")
+        assert reads == ["p1"]
+        assert store.get_paper("missing") is None
+
+    def test_edited_paper_is_reloaded(self, data_dir, fake_encoder):
+        _write_corpus(data_dir, 2)
+        store = PaperStore()
+        store.load_papers()
+        store.get_paper("p0")
+
+        write_paper(Config.ENRICHED_DIR, make_paper("p0", clean_text="rewritten body"))
+        store.refresh()
+        assert store.get_paper("p0").clean_text == "rewritten body"
+
+
+class TestBatchSearch:
+    def test_batch_matches_single_queries(self, data_dir, fake_encoder):
+        _write_corpus(data_dir, 20)
+        store = PaperStore()
+        store.load_papers()
+
+        queries = ["graph neural networks", "protein folding", "retrieval"]
+        batch = store.search_batch(queries, top_k=4)
+
+        # A second store, so single queries cannot be served from the batch's cached results.
+        fresh = PaperStore()
+        fresh.load_papers()
+        assert len(batch) == len(queries)
+        for query, results in zip(queries, batch):
+            single = fresh.search(query, top_k=4)
+            assert [r.paper_id for r in results] == [r.paper_id for r in single]
+            assert [r.score for r in results] == pytest.approx([r.score for r in single])
+            scores = [r.score for r in results]
+            assert scores == sorted(scores, reverse=True)
+
+    def test_top_k_larger_than_corpus(self, data_dir, fake_encoder):
+        _write_corpus(data_dir, 3)
+        store = PaperStore()
+        store.load_papers()
+
+        assert len(store.search_batch(["anything"], top_k=10)[0]) == 3
+
+    def test_empty_store_returns_empty_lists(self, data_dir, fake_encoder):
+        store = PaperStore()
+        store.load_papers()
+        assert store.search_batch(["a", "b"]) == [[], []]
+
+
+class TestHybridSearch:
+    def test_keyword_mode_matches_text(self, data_dir, fake_encoder):
+        _write_corpus(data_dir, 10)
+        write_paper(Config.ENRICHED_DIR, make_paper("gnn", title="Graph neural networks for chemistry"))
+        store = PaperStore()
+        store.load_papers()
+
+        results = store.search("graph chemistry", top_k=3, mode="keyword")
+        assert [r.paper_id for r in results] == ["gnn"]
+        assert fake_encoder.calls == 0
+
+    def test_hybrid_fuses_both_rankings(self, data_dir, fake_encoder):
+        _write_corpus(data_dir, 10)
+        EmbeddingStore(Config.EMBEDDINGS_DIR).append("vec", fake_encoder.encode("graph chemistry"))
+        write_paper(Config.ENRICHED_DIR, make_paper("vec"))
+        write_paper(Config.ENRICHED_DIR, make_paper("gnn", title="Graph neural networks for chemistry"))
+        store = PaperStore()
+        store.load_papers()
+
+        ids = [r.paper_id for r in store.search("graph chemistry", top_k=3, mode="hybrid")]
+        assert ids[:2] == ["vec", "gnn"] or ids[:2] == ["gnn", "vec"]
+        assert store.search_batch(["graph chemistry"], top_k=3, mode="hybrid")[0][0].paper_id == ids[0]
+
+    def test_keyword_index_follows_updates(self, data_dir, fake_encoder):
+        _write_corpus(data_dir, 5)
+        store = PaperStore()
+        store.load_papers()
+        assert store.search("photonics", mode="keyword") == []
+
+        write_paper(Config.ENRICHED_DIR, make_paper("p1", title="Silicon photonics"))
+        store.refresh()
+        assert [r.paper_id for r in store.search("photonics", mode="keyword")] == ["p1"]
+
+        os.remove(os.path.join(Config.ENRICHED_DIR, "p1.json"))
+        store.refresh()
+        assert store.search("photonics", mode="keyword") == []
+
+    def test_rejects_unknown_mode(self, data_dir, fake_encoder):
+        store = PaperStore()
+        store.load_papers()
+        with pytest.raises(ValueError):
+            store.search("x", mode="fuzzy")
+
+
+class TestFilteredSearch:
+    def _store(self, data_dir, fake_encoder) -> PaperStore:
+        _write_corpus(data_dir, 20)
+        for i, topic in enumerate(["vision", "speech"]):
+            pid = f"f{i}"
+            EmbeddingStore(Config.EMBEDDINGS_DIR).append(pid, fake_encoder.encode(f"paper {pid}"))
+            write_paper(Config.ENRICHED_DIR, make_paper(pid, topics=[topic], categories=["cs.LG"],
+                                                        published=f"2024-0{i + 1}-01T00:00:00Z"))
+        store = PaperStore()
+        store.load_papers()
+        return store
+
+    def test_only_matching_papers_are_returned(self, data_dir, fake_encoder):
+        store = self._store(data_dir, fake_encoder)
+
+        for mode in ("vector", "keyword", "hybrid"):
+            results = store.search("paper", top_k=10, mode=mode, filters=SearchFilters(topics=["vision"]))
+            assert [r.paper_id for r in results] == ["f0"], mode
+        results = store.search("paper", top_k=10, filters=SearchFilters(categories=["cs.LG"]))
+        assert {r.paper_id for r in results} == {"f0", "f1"}
+        assert results[0].categories == ["cs.LG"]
+
+    def test_date_filter_and_empty_match(self, data_dir, fake_encoder):
+        store = self._store(data_dir, fake_encoder)
+
+        results = store.search_batch(["a", "b"], top_k=5, filters=SearchFilters(published_from=date(2024, 2, 1)))
+        assert [[r.paper_id for r in batch] for batch in results] == [["f1"], ["f1"]]
+        assert store.search("x", filters=SearchFilters(authors=["Nobody"])) == []
+
+    def test_filters_follow_updates(self, data_dir, fake_encoder):
+        store = self._store(data_dir, fake_encoder)
+
+        write_paper(Config.ENRICHED_DIR, make_paper("f1", topics=["vision"]))
+        store.refresh()
+        results = store.search("paper", top_k=10, mode="vector", filters=SearchFilters(topics=["vision"]))
+        assert {r.paper_id for r in results} == {"f0", "f1"}
+
+
+class TestQueryEmbeddingCache:
+    def test_repeated_queries_encode_once(self, data_dir, fake_encoder):
+        _write_corpus(data_dir, 5)
+        store = PaperStore()
+        store.load_papers()
+
+        first = store.search("Deep  Learning", top_k=2)
+        second = store.search("deep learning", top_k=2)
+        store.search_batch(["deep learning", "DEEP LEARNING"], top_k=2)
+
+        assert fake_encoder.calls == 1
+        assert [r.paper_id for r in first] == [r.paper_id for r in second]
+
+
+class TestSearchResultCache:
+    @staticmethod
+    def _counting(store, monkeypatch) -> list:
+        calls = []
+        search = store._search
+
+        def counted(queries, *args):
+            calls.append(list(queries))
+            return search(queries, *args)
+
+        monkeypatch.setattr(store, "_search", counted)
+        return calls
+
+    def test_repeated_searches_hit_the_cache(self, data_dir, fake_encoder, monkeypatch):
+        _write_corpus(data_dir, 5)
+        store = PaperStore()
+        store.load_papers()
+        calls = self._counting(store, monkeypatch)
+
+        first = store.search("Paper p1", top_k=2)
+        assert store.search("paper  P1", top_k=2) == first
+        store.search_batch(["paper p1", "paper p2"], top_k=2)
+        assert calls == [["paper p1"], ["paper p2"]]
+
+        store.search("paper p1", top_k=3)
+        store.search("paper p1", top_k=2, mode="keyword")
+        store.search("paper p1", top_k=2, filters=SearchFilters(topics=["testing"]))
+        assert len(calls) == 5
+
+    def test_updates_invalidate_results(self, data_dir, fake_encoder, monkeypatch):
+        _write_corpus(data_dir, 5)
+        store = PaperStore()
+        store.load_papers()
+        calls = self._counting(store, monkeypatch)
+
+        store.search("paper p1", top_k=2, mode="keyword")
+        write_paper(Config.ENRICHED_DIR, make_paper("p9", title="Paper p1 revisited"))
+        store.refresh()
+        results = store.search("paper p1", top_k=2, mode="keyword")
+
+        assert len(calls) == 2
+        assert "p9" in [r.paper_id for r in results]
+
+    def test_async_search_shares_the_cache(self, data_dir, fake_encoder, monkeypatch):
+        _write_corpus(data_dir, 5)
+        store = PaperStore()
+        store.load_papers()
+        expected = store.search("paper p1", top_k=2)
+        monkeypatch.setattr(store, "_search_async", None)  # any miss would fail
+
+        assert asyncio.run(store.search_async("Paper p1", top_k=2)) == expected
+
+
+class TestColdStart:
+    def _count_reads(self, monkeypatch) -> list[str]:
+        read = []
+        original = paper_store.read_entries
+
+        def counting(items, known_ids, workers):
+            read.extend(path for path, _ in items)
+            return original(items, known_ids, workers)
+
+        monkeypatch.setattr(paper_store, "read_entries", counting)
+        return read
+
+    def test_restart_restores_catalog_from_snapshot(self, data_dir, fake_encoder, monkeypatch):
+        _write_corpus(data_dir, 5)
+        first = PaperStore()
+        first.load_papers()
+        assert os.path.exists(Config.SNAPSHOT_PATH)
+
+        write_paper(Config.ENRICHED_DIR, make_paper("p1", title="Edited"))
+        read = self._count_reads(monkeypatch)
+        second = PaperStore()
+        second.load_papers()
+
+        assert [os.path.basename(path) for path in read] == ["p1.json"]
+        assert set(second.papers) == set(first.papers)
+        assert second.get_entry("p1").title == "Edited"
+        assert second.search("anything", top_k=5, mode="vector")
+        assert second.summary_payload("p2") is not None
+
+    def test_stale_snapshot_layout_is_ignored(self, data_dir, fake_encoder, monkeypatch):
+        _write_corpus(data_dir, 3)
+        PaperStore().load_papers()
+        other = data_dir / "other"
+        other.mkdir()
+        monkeypatch.setattr(Config, "ENRICHED_DIR", str(other))
+        write_paper(str(other), make_paper("x"))
+
+        store = PaperStore()
+        store.load_papers()
+        assert set(store.papers) == {"x"}
+
+    def test_parallel_parse_matches_sequential(self, data_dir, fake_encoder, monkeypatch):
+        from services.api import catalog
+
+        _write_corpus(data_dir, 6)
+        monkeypatch.setattr(Config, "SNAPSHOT_PATH", "")
+        monkeypatch.setattr(Config, "LOAD_WORKERS", 2)
+        monkeypatch.setattr(catalog, "_PARALLEL_MIN_FILES", 2)
+        store = PaperStore()
+        store.load_papers()
+
+        assert set(store.papers) == {f"p{i}" for i in range(6)}
+        assert store.get_entry("p3").title == "Paper p3"
+
+    def test_ready_after_warm_up(self, data_dir, fake_encoder):
+        _write_corpus(data_dir, 3)
+        store = PaperStore()
+        store.load_papers()
+        assert not store.ready
+
+        store.warm_up()
+        assert store.ready
+        assert fake_encoder.calls == 1
+        store.close()
+
+
+class TestSimilarPapers:
+    def test_uses_stored_vectors_without_the_model(self, data_dir, fake_encoder):
+        vectors = _write_corpus(data_dir, 20)
+        store = PaperStore()
+        store.load_papers()
+
+        results = store.similar("p3", top_k=4)
+        normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+        expected = [f"p{i}" for i in np.argsort(-(normalized @ normalized[3]))[1:5]]
+        assert [r.paper_id for r in results] == expected
+        assert fake_encoder.calls == 0
+        assert store.similar("missing") is None
+
+    def test_graph_is_built_in_the_background_and_persisted(self, data_dir, fake_encoder, monkeypatch):
+        _write_corpus(data_dir, 20)
+        built = threading.Event()
+        release = threading.Event()
+        build = KnnGraph.build
+
+        def slow_build(index, k):
+            built.set()
+            release.wait(5)
+            return build(index, k)
+
+        monkeypatch.setattr(paper_store.KnnGraph, "build", slow_build)
+        store = PaperStore()
+        store.load_papers()
+        assert built.wait(5)
+        assert store._snapshot.similar is None
+        expected = [r.paper_id for r in store.similar("p3", top_k=4)]
+
+        release.set()
+        store._graph_builder.join()
+        assert store._snapshot.similar is not None
+        assert [r.paper_id for r in store.similar("p3", top_k=4)] == expected
+
+        def fail(*_args, **_kwargs):
+            raise AssertionError("graph rebuilt on restart")
+
+        monkeypatch.setattr(paper_store.KnnGraph, "build", fail)
+        restarted = PaperStore()
+        restarted.load_papers()
+        assert isinstance(restarted._snapshot.similar.neighbors, np.memmap)
+
+    def test_follows_updates(self, data_dir, fake_encoder):
+        vectors = _write_corpus(data_dir, 10)
+        store = PaperStore()
+        store.load_papers()
+
+        twin = vectors[4] + 0.01
+        EmbeddingStore(Config.EMBEDDINGS_DIR).append("twin", twin)
+        write_paper(Config.ENRICHED_DIR, make_paper("twin"))
+        store.refresh()
+        assert store.similar("p4", top_k=1)[0].paper_id == "twin"
+        assert store.similar("twin", top_k=1)[0].paper_id == "p4"
+
+        os.remove(os.path.join(Config.ENRICHED_DIR, "twin.json"))
+        store.refresh()
+        assert "twin" not in [r.paper_id for r in store.similar("p4", top_k=9)]
+        assert len(store.similar("p4", top_k=9)) == 9
+
+
+class TestExport:
+    @staticmethod
+    def _lines(chunks) -> list[dict]:
+        return [json.loads(line) for line in b"".join(chunks).splitlines()]
+
+    def test_streams_every_paper_in_id_order(self, data_dir, fake_encoder, monkeypatch):
+        _write_corpus(data_dir, 12)
+        store = PaperStore()
+        store.load_papers()
+
+        def fail(*_args):
+            raise AssertionError("export built a listing")
+
+        monkeypatch.setattr(paper_store, "Listing", fail)
+
+        rows = self._lines(store.export(("paper_id", "title", "clean_text")))
+        assert [r["paper_id"] for r in rows] == sorted(f"p{i}" for i in range(12))
+        assert rows[0] == {"paper_id": "p0", "title": "Paper p0", "clean_text": "Full text of p0. " * 10}
+
+    def test_embeddings_are_normalized_base64_float32(self, data_dir, fake_encoder):
+        vectors = _write_corpus(data_dir, 6)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        store = PaperStore()
+        store.load_papers()
+
+        for row in self._lines(store.export(("paper_id",), embeddings=True)):
+            vector = np.frombuffer(base64.b64decode(row["embedding"]), dtype="<f4")
+            np.testing.assert_allclose(vector, vectors[int(row["paper_id"][1:])], rtol=1e-6)
+
+    def test_export_is_chunked_and_pinned_to_one_version(self, data_dir, fake_encoder, monkeypatch):
+        _write_corpus(data_dir, 50)
+        store = PaperStore()
+        store.load_papers()
+        monkeypatch.setattr("services.api.export.CHUNK_BYTES", 256)
+
+        chunks = store.export(("paper_id", "title"))
+        first = next(chunks)
+        assert len(first) < 1024
+        store.delete_paper("p49")
+        rows = self._lines([first, *chunks])
+        assert len(rows) == 50
+
+
+class TestSharding:
+    def test_shards_partition_papers_and_vectors(self, data_dir, fake_encoder, monkeypatch):
+        vectors = _write_corpus(data_dir, 40)
+        single = PaperStore()
+        single.load_papers()
+        expected = single.search("query", top_k=5, mode="vector")
+
+        monkeypatch.setattr(Config, "SHARD_COUNT", 2)
+        shards = []
+        for index in range(2):
+            monkeypatch.setattr(Config, "SHARD_INDEX", index)
+            monkeypatch.setattr(Config, "SNAPSHOT_PATH", str(data_dir / f"catalog-shard{index}of2.snapshot"))
+            monkeypatch.setattr(Config, "SHARED_DIR", str(data_dir / f"shared-shard{index}of2"))
+            store = PaperStore()
+            store.load_papers()
+            assert store._snapshot.index.matrix.shape[0] == len(store.papers)
+            shards.append(store)
+
+        ids = [set(store.papers) for store in shards]
+        assert ids[0].isdisjoint(ids[1]) and ids[0] | ids[1] == {f"p{i}" for i in range(40)}
+        owner = next(store for store in shards if "p7" in store.papers)
+        row = owner._snapshot.row_of["p7"]
+        np.testing.assert_allclose(owner._snapshot.index.matrix[row], vectors[7] / np.linalg.norm(vectors[7]),
+                                   rtol=1e-6)
+
+        merged = sorted((r for store in shards for r in store.search("query", top_k=5, mode="vector")),
+                        key=lambda r: -r.score)[:5]
+        assert [r.paper_id for r in merged] == [r.paper_id for r in expected]
+
+
+    def test_shards_split_on_paper_id_not_file_name(self, data_dir, fake_encoder, monkeypatch):
+        # Named like the extractor names them; vectors only in the store, none in JSON.
+        embeddings = EmbeddingStore(Config.EMBEDDINGS_DIR)
+        for i, vector in enumerate(corpus_vectors(30)):
+            embeddings.append(f"p{i}", vector)
+            path = write_paper(Config.ENRICHED_DIR, make_paper(f"p{i}"))
+            os.rename(path, os.path.join(Config.ENRICHED_DIR, f"paper_{29 - i}.json"))
+
+        monkeypatch.setattr(Config, "SHARD_COUNT", 3)
+        found = set()
+        for index in range(3):
+            monkeypatch.setattr(Config, "SHARD_INDEX", index)
+            monkeypatch.setattr(Config, "SNAPSHOT_PATH", str(data_dir / f"catalog-shard{index}of3.snapshot"))
+            monkeypatch.setattr(Config, "SHARED_DIR", str(data_dir / f"shared-shard{index}of3"))
+            store = PaperStore()
+            store.load_papers()
+            assert set(store._snapshot.row_of) == set(store.papers)
+            found |= {r.paper_id for r in store.search("query", top_k=30, mode="vector")}
+        assert found == {f"p{i}" for i in range(30)}
+
+
+class TestSharedWorkers:
+    def test_second_worker_attaches_instead_of_building(self, data_dir, fake_encoder, monkeypatch):
+        monkeypatch.setattr(Config, "LOCAL_INDEX", "ivf")
+        monkeypatch.setattr(Config, "INDEX_QUANTIZATION", "int8")
+        monkeypatch.setattr(Config, "ANN_INDEX_PATH", str(data_dir / "ann_index.npz"))
+        _write_corpus(data_dir, 30)
+        first = PaperStore()
+        first.load_papers()
+        first._graph_builder.join()
+
+        def fail(*_args, **_kwargs):
+            raise AssertionError("worker rebuilt the index")
+
+        monkeypatch.setattr(paper_store, "build_index", fail)
+        monkeypatch.setattr(paper_store.KnnGraph, "build", fail)
+        monkeypatch.setattr(paper_store, "summary_payload", fail)
+        second = PaperStore()
+        second.load_papers()
+
+        index = second._snapshot.index
+        assert isinstance(index.quantized.codes, np.memmap)
+        assert isinstance(index.list_rows, np.memmap)
+        assert isinstance(second._snapshot.similar.neighbors, np.memmap)
+        assert index.report == first._snapshot.index.report
+        assert bytes(second.summary_payload("p1").body) == bytes(first.summary_payload("p1").body)
+        q = first._encode_queries(["Paper p4"])
+        np.testing.assert_array_equal(index.search(q, 5)[1], first._snapshot.index.search(q, 5)[1])
+
+    def test_workers_share_abstracts_and_summaries(self, data_dir, fake_encoder):
+        _write_corpus(data_dir, 5)
+        write_paper(Config.ENRICHED_DIR, make_paper("bare", abstract=None))
+        first = PaperStore()
+        first.load_papers()
+        second = PaperStore()
+        second.load_papers()
+
+        for store in (first, second):
+            entry = store.get_entry("p3")
+            assert entry._abstract is None and entry._summary is None
+            assert isinstance(entry._text._data, np.memmap)
+            assert entry.abstract == "Abstract of p3"
+            assert entry.summary == make_paper("p3").summary
+            assert store.get_entry("bare").abstract is None
+        assert store.search("Abstract of p3", top_k=1, mode="keyword")[0].abstract == "Abstract of p3"
+
+        write_paper(Config.ENRICHED_DIR, make_paper("late"))
+        second.refresh()
+        assert second.get_entry("late")._text is None
+        assert second.get_entry("late").abstract == "Abstract of late"
+
+    def test_attached_store_still_takes_updates(self, data_dir, fake_encoder):
+        vectors = _write_corpus(data_dir, 10)
+        PaperStore().load_papers()
+        store = PaperStore()
+        store.load_papers()
+
+        EmbeddingStore(Config.EMBEDDINGS_DIR).append("twin", vectors[2] + 0.01)
+        write_paper(Config.ENRICHED_DIR, make_paper("twin"))
+        store.refresh()
+        assert store.similar("p2", top_k=1)[0].paper_id == "twin"
+        assert store.summary_payload("twin") is not None
+
+    def test_disabled(self, data_dir, fake_encoder, monkeypatch):
+        monkeypatch.setattr(Config, "SHARED_DIR", "")
+        _write_corpus(data_dir, 5)
+        store = PaperStore()
+        store.load_papers()
+        assert isinstance(store.summary_payload("p1").body, bytes)
+        assert not os.path.exists(data_dir / "shared")
+
+
+class TestAsyncSearch:
+    def test_matches_sync_search(self, data_dir, fake_encoder):
+        _write_corpus(data_dir, 10)
+        store = PaperStore()
+        store.load_papers()
+
+        async def run():
+            return await asyncio.gather(
+                store.search_async("deep learning", top_k=3, mode="vector"),
+                store.search_batch_async(["deep learning", "retrieval"], top_k=3, mode="vector"),
+            )
+
+        single, batch = asyncio.run(run())
+        expected = [r.paper_id for r in store.search("deep learning", top_k=3, mode="vector")]
+        assert [r.paper_id for r in single] == expected
+        assert [r.paper_id for r in batch[0]] == expected
+        assert fake_encoder.calls <= 2
+        store.close()
+
+
+class TestConfiguredIndex:
+    def test_ivf_index_is_built_and_saved(self, data_dir, fake_encoder, monkeypatch):
+        monkeypatch.setattr(Config, "LOCAL_INDEX", "ivf")
+        monkeypatch.setattr(Config, "ANN_INDEX_PATH", str(data_dir / "ann_index.npz"))
+        monkeypatch.setattr(Config, "IVF_NLIST", 4)
+        monkeypatch.setattr(Config, "IVF_NPROBE", 4)
+        _write_corpus(data_dir, 30)
+
+        store = PaperStore()
+        store.load_papers()
+
+        assert store._snapshot.index.kind == "ivf"
+        assert (data_dir / "ann_index.npz").exists()
+        assert len(store.search("query", top_k=5)) == 5
+
+
+class TestLiveUpdates:
+    def _enrich(self, paper_id: str, vector: np.ndarray) -> None:
+        EmbeddingStore(Config.EMBEDDINGS_DIR).append(paper_id, vector)
+        write_paper(Config.ENRICHED_DIR, make_paper(paper_id, embedding=vector.tolist()))
+
+    def test_new_paper_is_appended_without_rebuild(self, data_dir, fake_encoder):
+        _write_corpus(data_dir, 5)
+        store = PaperStore()
+        store.load_papers()
+        before = store._snapshot
+        version = store.version
+
+        self._enrich("fresh", fake_encoder.encode("fresh topic"))
+        assert store.refresh()
+
+        assert store.version == version + 1
+        assert store.search("fresh topic", top_k=1)[0].paper_id == "fresh"
+        assert type(store._snapshot.index) is type(before.index)
+        # Readers holding the previous snapshot keep a consistent view.
+        assert "fresh" not in before.papers
+        assert before.index.matrix.shape[0] == 5
+
+    def test_refresh_without_changes_is_noop(self, data_dir, fake_encoder):
+        _write_corpus(data_dir, 3)
+        store = PaperStore()
+        store.load_papers()
+        assert not store.refresh()
+
+    def test_changed_and_deleted_papers(self, data_dir, fake_encoder):
+        _write_corpus(data_dir, 5)
+        store = PaperStore()
+        store.load_papers()
+
+        self._enrich("p1", fake_encoder.encode("moved"))
+        os.remove(os.path.join(Config.ENRICHED_DIR, "p2.json"))
+        store.refresh()
+
+        assert store.get_paper("p2") is None
+        ids = [r.paper_id for r in store.search("moved", top_k=10)]
+        assert ids[0] == "p1"
+        assert "p2" not in ids
+        assert len(ids) == 4
+
+    def test_compacted_store_is_reloaded(self, data_dir, fake_encoder):
+        _write_corpus(data_dir, 4)
+        store = PaperStore()
+        store.load_papers()
+        self._enrich("p0", fake_encoder.encode("again"))
+        store.refresh()
+
+        EmbeddingStore(Config.EMBEDDINGS_DIR).compact()
+        store.refresh()
+
+        assert store._snapshot.index.matrix.shape[0] == 4
+        assert store.search("again", top_k=1)[0].paper_id == "p0"
+
+    @pytest.mark.parametrize("local_index,quantization", [("exact", "none"), ("ivf", "int8")])
+    def test_compaction_renumbers_rows_without_reparsing(self, data_dir, fake_encoder, monkeypatch,
+                                                        local_index, quantization):
+        monkeypatch.setattr(Config, "LOCAL_INDEX", local_index)
+        monkeypatch.setattr(Config, "ANN_INDEX_PATH", str(data_dir / "ann_index.npz"))
+        monkeypatch.setattr(Config, "IVF_NLIST", 2)
+        monkeypatch.setattr(Config, "IVF_NPROBE", 2)
+        monkeypatch.setattr(Config, "INDEX_QUANTIZATION", quantization)
+        _write_corpus(data_dir, 20)
+        store = PaperStore()
+        store.load_papers()
+        for pid in ("p2", "p11"):
+            self._enrich(pid, fake_encoder.encode(f"{pid} revised"))
+        store.refresh()
+        store._graph_builder.join()
+        queries = ["p2 revised", "p11 revised", "topic 5"]
+        before = [[r.paper_id for r in store.search(q, top_k=5)] for q in queries]
+        similar = [r.paper_id for r in store.similar("p11", top_k=5)]
+
+        EmbeddingStore(Config.EMBEDDINGS_DIR).compact()
+        # Appended after the compaction, before the API noticed it.
+        self._enrich("late", fake_encoder.encode("late arrival"))
+        parsed = []
+        original = paper_store.read_entries
+        monkeypatch.setattr(paper_store, "read_entries",
+                            lambda files, *args: parsed.extend(files) or original(files, *args))
+        assert store.refresh()
+
+        assert [path for path, _ in parsed] == [os.path.join(Config.ENRICHED_DIR, "late.json")]
+        index = store._snapshot.index
+        assert index.matrix.shape[0] == 21
+        assert int(index.alive.sum()) == 21
+        if quantization != "none":
+            assert index.quantized.codes.shape[0] == 21
+        assert [[r.paper_id for r in store.search(q, top_k=5)] for q in queries] == before
+        assert store.search("late arrival", top_k=1)[0].paper_id == "late"
+        assert [r.paper_id for r in store.similar("p11", top_k=5)] == similar
+
+    def test_upsert_and_delete(self, data_dir, fake_encoder):
+        store = PaperStore()
+        store.load_papers()
+
+        vector = fake_encoder.encode("admin")
+        store.upsert_paper(make_paper("admin", embedding=vector.tolist()))
+        assert store.search("admin", top_k=1)[0].paper_id == "admin"
+
+        assert store.delete_paper("admin")
+        assert store.search("admin", top_k=1) == []
+        assert not store.delete_paper("admin")
+
+    def test_ivf_quantized_index_accepts_appends(self, data_dir, fake_encoder, monkeypatch):
+        monkeypatch.setattr(Config, "LOCAL_INDEX", "ivf")
+        monkeypatch.setattr(Config, "ANN_INDEX_PATH", str(data_dir / "ann_index.npz"))
+        monkeypatch.setattr(Config, "IVF_NLIST", 2)
+        monkeypatch.setattr(Config, "IVF_NPROBE", 2)
+        monkeypatch.setattr(Config, "INDEX_QUANTIZATION", "int8")
+        _write_corpus(data_dir, 20)
+        store = PaperStore()
+        store.load_papers()
+
+        self._enrich("late", fake_encoder.encode("late arrival"))
+        store.refresh()
+
+        index = store._snapshot.index
+        assert index.quantized.codes.shape[0] == 21
+        assert store.search("late arrival", top_k=1)[0].paper_id == "late"
@@ -0,0 +1,46 @@
+import gzip
+import json
+
+from services.api.payloads import Payload, accepted_encodings, detail_payload
+from tests.conftest import make_paper
+
+
+class TestAcceptEncoding:
+    def test_parses_q_values(self):
+        assert accepted_encodings("gzip, deflate, br;q=0.5") == {"gzip", "deflate", "br"}
+        assert accepted_encodings("gzip;q=0, identity") == {"identity"}
+        assert accepted_encodings("*, br;q=0") == {"*", "gzip"}
+        assert accepted_encodings(None) == set()
+
+
+class TestPayload:
+    def test_small_bodies_are_not_compressed(self):
+        payload = Payload(b'{"a":1}')
+        assert payload.gzip is None
+        assert payload.select("gzip") == (b'{"a":1}', None)
+
+    def test_large_bodies_served_gzipped_when_accepted(self):
+        body = json.dumps({"text": "lorem ipsum " * 500}).encode()
+        payload = Payload(body)
+
+        compressed, encoding = payload.select("gzip, deflate")
+        assert encoding == "gzip"
+        assert gzip.decompress(compressed) == body
+        assert len(compressed) < len(body) // 10
+        assert payload.select("identity") == (body, None)
+
+    def test_detail_matches_model_dump(self):
+        paper = make_paper("p1", embedding=[0.1, 0.2])
+        body = json.loads(detail_payload(paper).body)
+        assert "embedding" not in body
+        assert body == json.loads(paper.model_dump_json(exclude={"embedding"}))
+
+    def test_detail_is_compressed_lazily_per_encoding(self):
+        payload = detail_payload(make_paper("p1", clean_text="lorem ipsum " * 200))
+        assert payload.gzip is None and payload.br is None
+
+        compressed, encoding = payload.select("gzip")
+        assert encoding == "gzip"
+        assert gzip.decompress(compressed) == payload.body
+        assert payload.br is None
+        assert payload.select("gzip")[0] is compressed
@@ -0,0 +1,70 @@
+import threading
+import time
+
+import pytest
+
+from services.api import profiling
+from services.api.profiling import ProfilerBusy, allocation_snapshot, collapsed, sample_stacks, top_functions
+
+
+def _spin(stop: threading.Event) -> None:
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def _hoard(stop: threading.Event, kept: list) -> None:
+    while not stop.is_set():
+        kept.append(bytearray(10_000))
+        time.sleep(0.001)
+
+
+class _Running:
+    def __init__(self, target, *args):
+        self.stop = threading.Event()
+        self.thread = threading.Thread(target=target, args=(self.stop, *args), name="busy-worker")
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *_exc):
+        self.stop.set()
+        self.thread.join()
+
+
+class TestCpuProfile:
+    def test_samples_busy_thread(self):
+        with _Running(_spin):
+            stacks = sample_stacks(0.2, interval=0.005)
+
+        busy = [stack for stack in stacks if stack[0] == "busy-worker"]
+        assert busy and all(any(frame.startswith("_spin ") for frame in stack) for stack in busy)
+        assert "busy-worker;" in collapsed(stacks)
+        table = top_functions(stacks, limit=5)
+        assert table.splitlines()[0].split()[:2] == ["self%", "total%"]
+
+    def test_idle_threads_are_left_out(self):
+        parked = threading.Event()
+        idle = threading.Thread(target=parked.wait, name="idle-worker")
+        idle.start()
+        with _Running(_spin):
+            stacks = sample_stacks(0.1, interval=0.005)
+        parked.set()
+        idle.join()
+
+        assert any(stack[0] == "busy-worker" for stack in stacks)
+        assert not any(stack[0] == "idle-worker" for stack in stacks)
+
+    def test_one_capture_at_a_time(self):
+        with profiling._busy:
+            with pytest.raises(ProfilerBusy):
+                sample_stacks(0.01)
+
+
+class TestMemoryProfile:
+    def test_reports_allocations_held_at_the_end(self):
+        kept: list = []
+        with _Running(_hoard, kept):
+            report = allocation_snapshot(0.2, limit=5)
+        assert "test_profiling.py" in report.splitlines()[1]
+        assert report.splitlines()[-1].endswith("locations)")
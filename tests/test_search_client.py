@@ -0,0 +1,116 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("azure.search.documents")
+
+from shared import search_client  # noqa: E402
+from shared.search_client import SearchClient  # noqa: E402
+
+HIT = {"@search.score": 0.5, "paper_id": "p1", "title": "Paper p1"}
+INDEX_FIELDS = ["paper_id", "title", "abstract", "clean_text", "authors", "topics", "categories", "published",
+                "research_question", "methodology", "contributions", "limitations", "key_findings",
+                "enriched_at", "embedding"]
+
+
+class _StubSearchService(BaseHTTPRequestHandler):
+    """Just enough of the Azure AI Search REST API: index lookup and document search."""
+
+    protocol_version = "HTTP/1.1"
+    connections = 0
+    index_lookups = 0
+    searches: list[dict] = []
+    fields: list[str] = INDEX_FIELDS
+    index_updates: list[dict] = []
+
+    def setup(self):
+        super().setup()
+        type(self).connections += 1
+
+    def _reply(self, body: dict) -> None:
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _body(self) -> dict:
+        length = int(self.headers.get("Content-Length", 0))
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def do_GET(self):
+        type(self).index_lookups += 1
+        self._reply({"name": "papers", "fields": [{"name": name, "type": "Edm.String"} for name in self.fields]})
+
+    def do_PUT(self):
+        body = self._body()
+        type(self).index_updates.append(body)
+        self._reply(body)
+
+    def do_POST(self):
+        type(self).searches.append(self._body())
+        self._reply({"value": [HIT]})
+
+    def log_message(self, *_args):
+        pass
+
+
+@pytest.fixture
+def stub_service(monkeypatch):
+    monkeypatch.setattr(search_client, "_ensured_indexes", set())
+    _StubSearchService.connections = _StubSearchService.index_lookups = 0
+    _StubSearchService.searches = []
+    _StubSearchService.fields = INDEX_FIELDS
+    _StubSearchService.index_updates = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubSearchService)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+class TestPooledSearchClient:
+    def test_reuses_one_connection_and_checks_index_once(self, stub_service):
+        client = SearchClient(endpoint=stub_service, api_key="key")
+        SearchClient(endpoint=stub_service, api_key="key").close()
+        connections = _StubSearchService.connections
+
+        for _ in range(5):
+            assert client.search_text("graphs", top_k=3) == [{"score": 0.5, "paper_id": "p1", "title": "Paper p1"}]
+        client.close()
+
+        assert _StubSearchService.index_lookups == 1
+        assert _StubSearchService.index_updates == []
+        assert _StubSearchService.connections == connections + 1
+        assert _StubSearchService.searches[0]["top"] == 3
+
+    def test_adds_fields_missing_from_an_existing_index(self, stub_service):
+        _StubSearchService.fields = [f for f in INDEX_FIELDS if f not in ("categories", "published")]
+        SearchClient(endpoint=stub_service, api_key="key").close()
+
+        [update] = _StubSearchService.index_updates
+        names = [field["name"] for field in update["fields"]]
+        assert sorted(names) == sorted(INDEX_FIELDS)
+        assert names[-2:] == ["categories", "published"]
+
+    def test_async_client_matches_sync_results(self, stub_service):
+        client = SearchClient(endpoint=stub_service, api_key="key")
+
+        async def run():
+            aio = client.async_client()
+            try:
+                return await asyncio.gather(
+                    aio.search_text("graphs", top_k=2),
+                    aio.search_vector([0.1] * 4, top_k=2, filter="topics/any(v: v eq 'x')"),
+                )
+            finally:
+                await aio.close()
+
+        text, vector = asyncio.run(run())
+        client.close()
+        assert text == vector == [{"score": 0.5, "paper_id": "p1", "title": "Paper p1"}]
+        assert any(body.get("filter") == "topics/any(v: v eq 'x')" for body in _StubSearchService.searches)
@@ -0,0 +1,35 @@
+import os
+
+import numpy as np
+
+from services.api.shared_arrays import attach, content_key, pack_blobs, publish, unpack_blobs
+
+
+class TestSharedArrays:
+    def test_published_arrays_attach_read_only(self, tmp_path):
+        key = content_key("index", b"corpus")
+        publish(str(tmp_path), key, {"codes": np.arange(6, dtype=np.int8).reshape(2, 3)}, {"kind": "exact"})
+
+        arrays, meta = attach(str(tmp_path), key)
+        assert meta == {"kind": "exact"}
+        assert isinstance(arrays["codes"], np.memmap)
+        assert not arrays["codes"].flags.writeable
+        np.testing.assert_array_equal(arrays["codes"], [[0, 1, 2], [3, 4, 5]])
+
+    def test_missing_set(self, tmp_path):
+        assert attach(str(tmp_path), content_key("index", b"other")) is None
+
+    def test_newer_set_replaces_older_of_same_kind(self, tmp_path):
+        old, new = content_key("index", b"v1"), content_key("index", b"v2")
+        summaries = content_key("summaries", b"v1")
+        for key in (old, summaries, new):
+            publish(str(tmp_path), key, {"a": np.zeros(1)})
+        assert sorted(os.listdir(tmp_path)) == sorted([new, summaries])
+
+    def test_blobs_round_trip_without_copies(self, tmp_path):
+        blobs = [b"first", None, b"", b"third"]
+        key = content_key("summaries", b"x")
+        publish(str(tmp_path), key, pack_blobs(blobs))
+        views = unpack_blobs(attach(str(tmp_path), key)[0])
+        assert [bytes(v) if v is not None else None for v in views] == [b"first", None, None, b"third"]
+        assert isinstance(views[0], memoryview)
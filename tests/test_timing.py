@@ -0,0 +1,37 @@
+import asyncio
+from contextvars import copy_context
+
+from services.api import timing
+from services.api.timing import phase, server_timing, start_request
+
+
+class TestPhases:
+    def test_phases_from_threads_add_up_in_the_request(self):
+        async def request() -> dict[str, float]:
+            phases = start_request()
+
+            def timed(name: str) -> None:
+                with phase(name):
+                    pass
+
+            timed("vector")
+            await asyncio.to_thread(timed, "vector")
+            await asyncio.to_thread(timed, "keyword")
+            return phases
+
+        phases = asyncio.run(request())
+        assert set(phases) == {"vector", "keyword"}
+
+    def test_outside_a_request_nothing_is_collected(self):
+        def run():
+            with phase("encode"):
+                pass
+            return timing._request_phases.get(), start_request()
+
+        outside, started = copy_context().run(run)
+        assert outside is None
+        assert started == {}
+
+    def test_header_format(self):
+        assert server_timing({"encode": 0.0012, "vector": 0.0005}, 0.002) == \
+            "encode;dur=1.20, vector;dur=0.50, total;dur=2.00"
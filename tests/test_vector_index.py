@@ -0,0 +1,177 @@
+import numpy as np
+
+from services.api.vector_index import (
+    ExactIndex,
+    QuantizedVectors,
+    evaluate_recall,
+    IVFFlatIndex,
+    build_index,
+    fingerprint,
+    recall_at_k,
+    sample_queries,
+    top_k_indices,
+)
+
+
+def _clustered(n: int = 2000, dim: int = 16, clusters: int = 20, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim))
+    points = centers[rng.integers(0, clusters, n)] + 0.3 * rng.standard_normal((n, dim))
+    points = points.astype(np.float32)
+    return points / np.linalg.norm(points, axis=1, keepdims=True)
+
+
+class TestTopK:
+    def test_matches_full_sort(self):
+        scores = np.random.default_rng(1).standard_normal((3, 50))
+        expected = np.argsort(-scores, axis=1)[:, :5]
+        np.testing.assert_array_equal(top_k_indices(scores, 5), expected)
+
+
+class TestIVFFlatIndex:
+    def test_recall_against_exact(self):
+        matrix = _clustered()
+        queries = sample_queries(matrix, 100)
+        ivf = IVFFlatIndex.build(matrix, nlist=32, nprobe=8)
+        assert recall_at_k(ivf, ExactIndex(matrix), queries, k=10) >= 0.9
+
+    def test_probing_every_list_is_exact(self):
+        matrix = _clustered(500)
+        queries = sample_queries(matrix, 20)
+        ivf = IVFFlatIndex.build(matrix, nlist=8, nprobe=8)
+        assert recall_at_k(ivf, ExactIndex(matrix), queries, k=5) == 1.0
+
+    def test_remapped_rows_keep_their_lists(self):
+        matrix = _clustered(600)
+        ivf = IVFFlatIndex.build(matrix[:500], nlist=8, nprobe=3,
+                                 quantized=QuantizedVectors.from_matrix(matrix[:500], "int8"))
+        ivf = ivf.updated(matrix[:550], None)
+        # A compaction that dropped every fifth row, followed by fresh appends.
+        kept = np.array([r for r in range(550) if r % 5])
+        old_rows = np.concatenate([kept, np.full(50, -1)])
+        compacted = np.concatenate([matrix[kept], matrix[550:]])
+
+        remapped = ivf.remapped(compacted, old_rows, None)
+        lists = np.empty(len(compacted), dtype=np.int64)
+        lists[remapped.list_rows] = np.repeat(np.arange(8), np.diff(remapped.list_offsets))
+        np.testing.assert_array_equal(lists, IVFFlatIndex._assign(compacted, ivf.centroids))
+        assert len(remapped.extra_rows) == 0
+        np.testing.assert_array_equal(remapped.quantized.codes, ivf.quantized._encode(compacted))
+        assert ivf.matrix.shape[0] == 550
+
+    def test_training_sample_is_capped(self, monkeypatch):
+        matrix = _clustered(2000)
+        assigned = []
+        assign = IVFFlatIndex._assign
+
+        def recording(rows, centroids):
+            assigned.append(rows.shape[0])
+            return assign(rows, centroids)
+
+        monkeypatch.setattr(IVFFlatIndex, "_assign", staticmethod(recording))
+        ivf = IVFFlatIndex.build(matrix, nlist=4, nprobe=4, iterations=2)
+        # Two k-means rounds over 4 lists x 64 rows, then every row once.
+        assert assigned == [256, 256, 2000]
+        assert len(ivf.list_rows) == 2000
+
+    def test_saved_index_is_reused_until_corpus_changes(self, tmp_path):
+        matrix = _clustered(300)
+        ids = [f"p{i}" for i in range(300)]
+        path = str(tmp_path / "ann_index.npz")
+
+        first = build_index("ivf", matrix, ids, path, nlist=8, recall_queries=0)
+        loaded = IVFFlatIndex.load(path, matrix, fingerprint(ids, matrix), nprobe=8)
+        np.testing.assert_array_equal(loaded.list_rows, first.list_rows)
+
+        ids[0] = "changed"
+        assert IVFFlatIndex.load(path, matrix, fingerprint(ids, matrix), nprobe=8) is None
+
+    def test_fingerprint_covers_vectors(self):
+        matrix = _clustered(300)
+        ids = [f"p{i}" for i in range(300)]
+        assert fingerprint(ids, matrix) == fingerprint(ids, matrix.copy())
+        assert fingerprint(ids, matrix) != fingerprint(ids, _clustered(300, seed=1))
+        last = matrix.copy()
+        last[-1] = -last[-1]
+        assert fingerprint(ids, matrix) != fingerprint(ids, last)
+
+
+class TestQuantizedIndex:
+    def test_int8_codes_shrink_memory_4x(self):
+        matrix = _clustered(1000, dim=32)
+        quantized = QuantizedVectors.from_matrix(matrix, "int8")
+        assert quantized.codes.dtype == np.int8
+        assert quantized.nbytes < matrix.nbytes / 3.9
+
+    def test_scores_approximate_float32(self):
+        matrix = _clustered(200, dim=32)
+        queries = sample_queries(matrix, 10)
+        for mode in ("int8", "float16"):
+            approx = QuantizedVectors.from_matrix(matrix, mode).score(queries)
+            np.testing.assert_allclose(approx, queries @ matrix.T, atol=0.02)
+
+    def test_rescored_results_use_exact_scores(self):
+        matrix = _clustered(1000, dim=32)
+        queries = sample_queries(matrix, 50)
+        index = ExactIndex(matrix, quantized=QuantizedVectors.from_matrix(matrix, "int8"))
+
+        scores, rows = index.search(queries, 10)
+        np.testing.assert_allclose(scores, np.take_along_axis(queries @ matrix.T, rows, axis=1), rtol=1e-5)
+
+        report = evaluate_recall(index, matrix, queries)
+        assert report["recall"] >= report["first_pass_recall"]
+        assert report["recall"] >= 0.95
+
+    def test_quantized_ivf(self, tmp_path):
+        matrix = _clustered()
+        ids = [f"p{i}" for i in range(len(matrix))]
+        index = build_index("ivf", matrix, ids, str(tmp_path / "ivf.npz"), nlist=16, nprobe=16,
+                            quantization="float16", recall_queries=100)
+        assert index.report["recall"] >= 0.95
+        assert index.report["index_bytes"] < index.report["float32_bytes"]
+
+
+class TestRestrictedSearch:
+    def _reference(self, matrix, queries, rows, k):
+        scores = queries @ matrix[rows].T
+        return rows[np.argsort(-scores, axis=1)[:, :k]]
+
+    def test_exact_index_only_returns_given_rows(self):
+        matrix = _clustered(500)
+        queries = sample_queries(matrix, 10)
+        rows = np.arange(0, 500, 7)
+        _, found = ExactIndex(matrix).search(queries, 5, rows)
+        np.testing.assert_array_equal(found, self._reference(matrix, queries, rows, 5))
+
+    def test_fewer_rows_than_k(self):
+        matrix = _clustered(100)
+        scores, found = ExactIndex(matrix).search(sample_queries(matrix, 2), 5, np.array([3, 9]))
+        assert set(found[0, :2]) == {3, 9}
+        assert (found[:, 2:] == -1).all() and np.isneginf(scores[:, 2:]).all()
+
+    def test_ivf_narrow_and_wide_filters(self):
+        matrix = _clustered()
+        queries = sample_queries(matrix, 20)
+        ivf = IVFFlatIndex.build(matrix, nlist=32, nprobe=8)
+
+        # Fewer rows than the probes would scan: brute-forced, so exact.
+        narrow = np.arange(0, 2000, 50)
+        _, found = ivf.search(queries, 5, narrow)
+        np.testing.assert_array_equal(found, self._reference(matrix, queries, narrow, 5))
+
+        # Wider filters mask the probed lists.
+        wide = np.arange(0, 2000, 2)
+        _, found = ivf.search(queries, 5, wide)
+        assert np.isin(found, wide).all()
+        expected = self._reference(matrix, queries, wide, 5)
+        recall = np.mean([len(set(f) & set(e)) / 5 for f, e in zip(found, expected)])
+        assert recall >= 0.9
+
+    def test_quantized_rows_are_rescored(self):
+        matrix = _clustered(500)
+        queries = sample_queries(matrix, 10)
+        rows = np.arange(1, 500, 3)
+        index = ExactIndex(matrix, quantized=QuantizedVectors.from_matrix(matrix, "int8"))
+        scores, found = index.search(queries, 5, rows)
+        assert np.isin(found, rows).all()
+        np.testing.assert_allclose(scores, np.take_along_axis(queries @ matrix.T, found, axis=1), rtol=1e-5)